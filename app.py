@@ -1,12 +1,29 @@
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, request, jsonify, send_from_directory, send_file, make_response
 from flask_cors import CORS
 import os
 import tempfile
 import logging
 from datetime import datetime
 from pdf2json.identify_document import analyze_document_by_type
-from config import HOST, PORT, MAX_CONTENT_LENGTH
+from pdf2json.serialization import (
+    dumps, splice_fields, msgpack_dumps, arrow_stream, parquet_bytes, binary_formats_available,
+    JSON_MIMETYPE, ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE
+)
+from pdf2json.tables import document_tables, to_record_batch
+from pdf2json.columnar import FORMATS, COLUMNAR, convert, to_columnar
+from pdf2json.page_cache import create_page_cache
+from config import (
+    HOST, PORT, MAX_CONTENT_LENGTH, DOCUMENT_FILE_MAX_AGE,
+    DOCUMENT_CACHE_SIZE, DOCUMENT_CACHE_TTL, DOCUMENT_CACHE_REDIS_URL,
+    WRITE_BEHIND_ENABLED, WRITE_BEHIND_DIR, WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_POLL_INTERVAL, WRITE_BEHIND_MAX_BACKOFF, WRITE_BEHIND_MAX_ATTEMPTS, WRITE_BEHIND_LEASE_SECONDS,
+    EXPORT_ARRAYSIZE, PARSE_WORKERS,
+    COORDINATE_PARSER_BACKEND, LINE_PARSER_BACKEND, PAGE_CACHE_SIZE, PAGE_CACHE_REDIS_URL, COLUMN_CALIBRATION
+)
 from db.oracle_connection import OracleManager
+from db.write_behind import WriteBehindQueue
+from db.document_cache import create_document_cache
+from db.exports import EXPORT_QUERIES, EXPORT_MIMETYPES, ENCODERS, export_formats, stream_export
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -18,6 +35,35 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Set up by init_services() in the serving process only: parse worker processes
+# (spawn) re-import this module as __mp_main__ and must not build caches or drain the queue
+
+# Cache of serialized GET /documents/<id> responses
+document_cache = None
+
+# Cache of parsed pages, so re-issued statements only parse changed pages
+page_cache = None
+
+# Optional write-behind queue for Oracle inserts
+write_behind_queue = None
+
+def init_services():
+    """Creates the document and page caches and starts the write-behind queue when enabled"""
+    global document_cache, page_cache, write_behind_queue
+    document_cache = create_document_cache(DOCUMENT_CACHE_SIZE, DOCUMENT_CACHE_TTL, DOCUMENT_CACHE_REDIS_URL)
+    page_cache = create_page_cache(PAGE_CACHE_SIZE, PAGE_CACHE_REDIS_URL)
+    if WRITE_BEHIND_ENABLED:
+        write_behind_queue = WriteBehindQueue(
+            OracleManager(),
+            WRITE_BEHIND_DIR,
+            batch_size=WRITE_BEHIND_BATCH_SIZE,
+            poll_interval=WRITE_BEHIND_POLL_INTERVAL,
+            max_backoff=WRITE_BEHIND_MAX_BACKOFF,
+            max_attempts=WRITE_BEHIND_MAX_ATTEMPTS,
+            lease_seconds=WRITE_BEHIND_LEASE_SECONDS
+        )
+        write_behind_queue.start()
+
 @app.route('/')
 def index():
     return send_file('static/index.html')
@@ -46,47 +92,183 @@ def oracle_info():
 
 @app.route('/documents/<int:document_id>/<filename>')
 def serve_document(document_id, filename):
-    """Serves stored PDF file"""
+    """Serves stored PDF file with ETag, conditional and range support"""
     try:
-        file_path = os.path.join('documents', str(document_id), filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
-        else:
+        oracle_manager = OracleManager()
+        file_info = oracle_manager.get_document_file_info(document_id)
+        if not file_info:
+            return jsonify({"error": "File not found"}), 404
+        
+        document_filename, document_path = file_info
+        if filename not in (document_filename, os.path.basename(document_path)):
             return jsonify({"error": "File not found"}), 404
+        
+        # Resolve through the document store (flat, sharded or S3; compressed or not)
+        store = oracle_manager.store
+        file_path = store.resolve(document_path)
+        if not file_path:
+            return jsonify({"error": "File not found"}), 404
+        
+        # Stored files never change, so the content hash is a strong validator
+        etag = store.content_hash(file_path)
+        if request.if_none_match.star_tag or request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+        else:
+            local_path = store.local_file(file_path)
+            if local_path:
+                source, length = os.path.abspath(local_path), None
+            else:
+                # Compressed or remote: streamed; the original length lets Range requests skip ahead
+                length = store.content_length(file_path)
+                source = store.open(file_path)
+            
+            response = send_file(
+                source,
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=document_filename,
+                conditional=length is None,
+                etag=etag,
+                max_age=DOCUMENT_FILE_MAX_AGE
+            )
+            if length is not None:
+                response.content_length = length
+                try:
+                    response = response.make_conditional(request, accept_ranges=True, complete_length=length)
+                except Exception:
+                    response.close()
+                    raise
+            response.accept_ranges = 'bytes'
+        
+        response.cache_control.public = True
+        response.cache_control.max_age = DOCUMENT_FILE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def date_range_args():
+    """Parses ?date_from=&date_to= (ISO dates, upper bound exclusive); raises ValueError"""
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    date_from = datetime.fromisoformat(date_from) if date_from else None
+    date_to = datetime.fromisoformat(date_to) if date_to else None
+    return date_from, date_to
+
 @app.route('/documents', methods=['GET'])
 def list_documents():
-    """Lists all processed documents"""
+    """Lists processed documents, optionally filtered by ?date_from=&date_to=&document_type="""
+    try:
+        date_from, date_to = date_range_args()
+        limit = request.args.get('limit', 50, type=int)
+    except ValueError:
+        return jsonify({"error": "Dates must be in ISO format (YYYY-MM-DD)"}), 400
+    
     try:
         oracle_manager = OracleManager()
-        documents = oracle_manager.get_all_documents()
+        documents = oracle_manager.get_all_documents(
+            limit=limit,
+            date_from=date_from,
+            date_to=date_to,
+            document_type=request.args.get('document_type')
+        )
         return jsonify({"documents": documents})
     except Exception as e:
         logging.error(f"Error listing documents: {e}")
         return jsonify({"error": "Error listing documents"}), 500
 
+def json_bytes_response(body, status=200):
+    """Builds JSON response from already serialized bytes"""
+    return app.response_class(body + b'\n', status=status, mimetype=JSON_MIMETYPE)
+
+def cached_response(cached, mimetype=JSON_MIMETYPE):
+    """Builds response from cache entry, honoring If-None-Match"""
+    if request.if_none_match.star_tag or request.if_none_match.contains_weak(cached.etag):
+        response = make_response('', 304)
+    else:
+        response = app.response_class(cached.body, mimetype=mimetype)
+    response.set_etag(cached.etag)
+    # Documents can be deleted, so clients revalidate (cheap 304s)
+    response.cache_control.no_cache = True
+    # Representation depends on the Accept header
+    response.vary.add('Accept')
+    return response
+
 @app.route('/documents/<int:document_id>', methods=['GET'])
 def get_document(document_id):
-    """Gets specific document by ID"""
+    """
+    Gets specific document by ID (?format=rows|columnar converts the content).
+    Accept selects JSON (default), MessagePack, or one flattened table
+    (?table=) as an Arrow stream or Parquet file.
+    """
+    output_format = request.args.get('format')
+    if output_format is not None and output_format not in FORMATS:
+        return jsonify({"error": f"Format must be one of: {', '.join(FORMATS)}"}), 400
+    
+    mimetype = request.accept_mimetypes.best_match([JSON_MIMETYPE] + binary_formats_available(), JSON_MIMETYPE)
+    table = request.args.get('table')
+    
     try:
-        oracle_manager = OracleManager()
-        document = oracle_manager.get_document_by_id(document_id)
-        if document:
-            return jsonify(document)
-        else:
-            return jsonify({"error": "Document not found"}), 404
+        variant = output_format or 'json'
+        if mimetype != JSON_MIMETYPE:
+            variant = f"{variant}:{mimetype}:{table or ''}"
+        cached = document_cache.get(document_id, variant)
+        if cached is None:
+            oracle_manager = OracleManager()
+            document = oracle_manager.get_document_by_id(document_id)
+            if not document:
+                return jsonify({"error": "Document not found"}), 404
+            if output_format:
+                document = dict(document, content=convert(document['content'], output_format))
+            
+            if mimetype == JSON_MIMETYPE:
+                body = dumps(document) + b'\n'
+            elif mimetype == MSGPACK_MIMETYPE:
+                body = msgpack_dumps(document)
+            else:
+                tables = document_tables(document['content'])
+                table = table or (tables[0] if tables else None)
+                if table not in tables:
+                    return jsonify({"error": "Table not available for this document", "tables": tables}), 400
+                batch = to_record_batch(document['content'], table, document_id)
+                body = arrow_stream(batch) if mimetype == ARROW_STREAM_MIMETYPE else parquet_bytes(batch)
+            cached = document_cache.set(document_id, body, variant)
+        return cached_response(cached, mimetype)
     except Exception as e:
         logging.error(f"Error getting document: {e}")
         return jsonify({"error": "Error getting document"}), 500
 
+@app.route('/documents', methods=['DELETE'])
+def purge_documents():
+    """Bulk removes documents created before ?before=YYYY-MM-DD (optionally of one document_type)"""
+    before = request.args.get('before')
+    if not before:
+        return jsonify({"error": "Parameter 'before' is required"}), 400
+    try:
+        cutoff = datetime.fromisoformat(before)
+    except ValueError:
+        return jsonify({"error": "Dates must be in ISO format (YYYY-MM-DD)"}), 400
+    
+    try:
+        oracle_manager = OracleManager()
+        result = oracle_manager.delete_documents_before(cutoff, request.args.get('document_type'))
+        document_cache.invalidate_many(result['ids'])
+        return jsonify({
+            "deleted": len(result['ids']),
+            "files_removed": result['files_removed']
+        })
+    except Exception as e:
+        logging.error(f"Error purging documents: {e}")
+        return jsonify({"error": "Error purging documents"}), 500
+
 @app.route('/documents/<int:document_id>', methods=['DELETE'])
 def delete_document(document_id):
     """Removes document from database and file from disk"""
     try:
         oracle_manager = OracleManager()
         success = oracle_manager.delete_document(document_id)
+        document_cache.invalidate(document_id)
         if success:
             return jsonify({"message": "Document deleted successfully"})
         else:
@@ -110,6 +292,10 @@ def analyze_document():
     if not file.filename.lower().endswith('.pdf'):
         return jsonify({"error": "File must be a PDF"}), 400
     
+    output_format = request.args.get('format', 'rows')
+    if output_format not in FORMATS:
+        return jsonify({"error": f"Format must be one of: {', '.join(FORMATS)}"}), 400
+    
     temp_file_path = None
     try:
         # Save temporary file
@@ -119,7 +305,11 @@ def analyze_document():
         
         # Process document
         logging.info(f"Processing document: {file.filename}")
-        result = analyze_document_by_type(temp_file_path)
+        result = analyze_document_by_type(
+            temp_file_path, PARSE_WORKERS,
+            coordinate_backend=COORDINATE_PARSER_BACKEND, line_backend=LINE_PARSER_BACKEND,
+            page_cache=page_cache, calibrate=COLUMN_CALIBRATION
+        )
         
         # Check if there was an error in processing
         if "error" in result:
@@ -129,28 +319,60 @@ def analyze_document():
         # Extract document type from result
         document_type = result.get("document_type", "UNKNOWN")
         
+        # Columnar results are stored and returned compact
+        if output_format == COLUMNAR:
+            result = to_columnar(result)
+        
+        # Serialize once: the same bytes go to Oracle and to the response
+        body = dumps(result)
+        content = body.decode('utf-8')
+        
+        # Queue for background insert when write-behind is enabled
+        if write_behind_queue:
+            try:
+                queue_id = write_behind_queue.enqueue(
+                    document_type=document_type,
+                    filename=file.filename,
+                    json_content=content,
+                    temp_file_path=temp_file_path
+                )
+                
+                metadata = {
+                    "queue_id": queue_id,
+                    "storage_status": "queued",
+                    "queued_at": datetime.now().isoformat()
+                }
+                
+            except Exception as queue_error:
+                logging.error(f"Error queueing document: {queue_error}")
+                metadata = {"database_warning": "Document processed but could not be queued for database"}
+            
+            return json_bytes_response(splice_fields(body, metadata))
+        
         # Insert into Oracle and save file
         try:
             record_id, file_path = oracle_manager.insert_pdf_document(
                 document_type=document_type,
                 filename=file.filename,
-                json_content=result,
+                json_content=content,
                 temp_file_path=temp_file_path
             )
             
             # Add database information to response
-            result["database_id"] = record_id
-            result["file_path"] = file_path
-            result["stored_at"] = datetime.now().isoformat()
+            metadata = {
+                "database_id": record_id,
+                "file_path": file_path,
+                "stored_at": datetime.now().isoformat()
+            }
             
             logging.info(f"Document {file.filename} processed and stored with ID: {record_id}")
             
         except Exception as db_error:
             logging.error(f"Error saving to database/disk: {db_error}")
             # Continue returning JSON even if there's a database error
-            result["database_warning"] = "Document processed but could not be saved to database"
+            metadata = {"database_warning": "Document processed but could not be saved to database"}
         
-        return jsonify(result)
+        return json_bytes_response(splice_fields(body, metadata))
     
     except Exception as e:
         logging.error(f"Error processing document: {e}")
@@ -164,6 +386,59 @@ def analyze_document():
             except:
                 pass
         
+@app.route('/exports/<name>', methods=['GET'])
+def export_documents(name):
+    """
+    Streams flattened rows of all stored documents (fields: container lines,
+    lotes: line-parser lots) as ?format=ndjson|csv|parquet, filtered by
+    ?date_from=&date_to=&document_type=
+    """
+    if name not in EXPORT_QUERIES:
+        return jsonify({"error": "Export not found", "exports": list(EXPORT_QUERIES)}), 404
+    
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in export_formats():
+        return jsonify({"error": f"Format must be one of: {', '.join(export_formats())}"}), 400
+    
+    try:
+        date_from, date_to = date_range_args()
+    except ValueError:
+        return jsonify({"error": "Dates must be in ISO format (YYYY-MM-DD)"}), 400
+    
+    try:
+        rows = stream_export(
+            OracleManager(),
+            name,
+            EXPORT_ARRAYSIZE,
+            date_from=date_from,
+            date_to=date_to,
+            document_type=request.args.get('document_type')
+        )
+        # Run the query before streaming so errors still get a status code
+        description = next(rows)
+    except Exception as e:
+        logging.error(f"Error exporting {name}: {e}")
+        return jsonify({"error": "Error exporting documents"}), 500
+    
+    response = app.response_class(ENCODERS[output_format](description, rows), mimetype=EXPORT_MIMETYPES[output_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{output_format}"'
+    return response
+
+@app.route('/queue/<queue_id>', methods=['GET'])
+def queue_status(queue_id):
+    """Gets write-behind status of a queued document"""
+    if not write_behind_queue:
+        return jsonify({"error": "Write-behind queue is disabled"}), 404
+    try:
+        status = write_behind_queue.get_status(queue_id)
+        if status:
+            return jsonify(status)
+        else:
+            return jsonify({"error": "Queue entry not found"}), 404
+    except Exception as e:
+        logging.error(f"Error getting queue status: {e}")
+        return jsonify({"error": "Error getting queue status"}), 500
+
 @app.route('/test-oracle', methods=['GET'])
 def test_oracle():
     """Endpoint to test Oracle connection"""
@@ -177,4 +452,5 @@ def test_oracle():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 if __name__ == '__main__':
+    init_services()
     app.run(host=HOST, port=PORT, debug=False)
@@ -17,4 +17,72 @@ ORACLE_CONFIG = {
     'host': os.getenv('ORACLE_HOST'),
     'port': int(os.getenv('ORACLE_PORT')),
     'service_name': os.getenv('ORACLE_SERVICE_NAME')
-} 
\ No newline at end of file
+} 
+
+# Write-behind persistence queue (Oracle inserts drained in background)
+WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+WRITE_BEHIND_DIR = os.getenv('WRITE_BEHIND_DIR', os.path.join('documents', '.queue'))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 20))
+WRITE_BEHIND_POLL_INTERVAL = float(os.getenv('WRITE_BEHIND_POLL_INTERVAL', 1.0))
+WRITE_BEHIND_MAX_BACKOFF = float(os.getenv('WRITE_BEHIND_MAX_BACKOFF', 60.0))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', 10))
+WRITE_BEHIND_LEASE_SECONDS = float(os.getenv('WRITE_BEHIND_LEASE_SECONDS', 300.0))
+
+# Storage compression
+# PDF_COMPRESSION: 'none' or 'zstd' (requires zstandard)
+PDF_COMPRESSION = os.getenv('PDF_COMPRESSION', 'none').lower()
+PDF_COMPRESSION_LEVEL = int(os.getenv('PDF_COMPRESSION_LEVEL', 3))
+# CONTENT_LOB_COMPRESSION: SecureFile compression for CONTENT ('NONE', 'LOW', 'MEDIUM', 'HIGH')
+CONTENT_LOB_COMPRESSION = os.getenv('CONTENT_LOB_COMPRESSION', 'NONE').upper()
+
+# Document storage
+# STORAGE_BACKEND: 'flat' (documents/<id>/<file>), 'sharded' (documents/ab/cd/<sha256>.pdf)
+# or 's3' (S3-compatible service such as MinIO)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'flat').lower()
+DOCUMENTS_PATH = os.getenv('DOCUMENTS_PATH', 'documents')
+S3_CONFIG = {
+    'bucket': os.getenv('S3_BUCKET', 'pdftojson'),
+    'prefix': os.getenv('S3_PREFIX', ''),
+    'endpoint_url': os.getenv('S3_ENDPOINT_URL'),
+    'access_key': os.getenv('S3_ACCESS_KEY'),
+    'secret_key': os.getenv('S3_SECRET_KEY'),
+    'region': os.getenv('S3_REGION')
+}
+
+# Cache lifetime (seconds) for stored PDF downloads; files are immutable
+DOCUMENT_FILE_MAX_AGE = int(os.getenv('DOCUMENT_FILE_MAX_AGE', 31536000))
+
+# Response cache for GET /documents/<id>
+DOCUMENT_CACHE_SIZE = int(os.getenv('DOCUMENT_CACHE_SIZE', 512))
+DOCUMENT_CACHE_TTL = int(os.getenv('DOCUMENT_CACHE_TTL', 300))
+DOCUMENT_CACHE_REDIS_URL = os.getenv('DOCUMENT_CACHE_REDIS_URL')
+
+# Bulk deletes (DELETE /documents?before=, scripts/retention.py)
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 1000))
+PURGE_WORKERS = int(os.getenv('PURGE_WORKERS', 8))
+
+# Shared (content-addressed) files stored or reused by an upload within this many seconds
+# are not removed, as the uploading insert may not be committed yet
+SHARED_FILE_GRACE_SECONDS = int(os.getenv('SHARED_FILE_GRACE_SECONDS', 3600))
+
+# Oracle array fetch: rows per round trip for unbounded reads (paged reads use the page size)
+ORACLE_ARRAYSIZE = int(os.getenv('ORACLE_ARRAYSIZE', 500))
+ORACLE_PREFETCH_ROWS = int(os.getenv('ORACLE_PREFETCH_ROWS', ORACLE_ARRAYSIZE + 1))
+
+# Rows per fetch for streaming exports (GET /exports/<name>)
+EXPORT_ARRAYSIZE = int(os.getenv('EXPORT_ARRAYSIZE', 5000))
+
+# Worker processes for parsing one large coordinate document by page ranges (1 = serial)
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 1))
+
+# PDF extraction backend per parser: pdfplumber (default) or pdfium
+COORDINATE_PARSER_BACKEND = os.getenv('COORDINATE_PARSER_BACKEND', 'pdfplumber')
+LINE_PARSER_BACKEND = os.getenv('LINE_PARSER_BACKEND', 'pdfplumber')
+
+# Parsed page cache keyed on page content, for re-issued statements (opt-in, 0 = disabled);
+# fingerprinting parses every upload once more with PyPDF2
+PAGE_CACHE_SIZE = int(os.getenv('PAGE_CACHE_SIZE', 0))
+PAGE_CACHE_REDIS_URL = os.getenv('PAGE_CACHE_REDIS_URL')
+
+# Coordinate parser columns follow the English header labels of each section (opt-in)
+COLUMN_CALIBRATION = os.getenv('COLUMN_CALIBRATION', 'false').lower() == 'true'
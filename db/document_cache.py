@@ -0,0 +1,158 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Optional dependency, only needed for the shared cache
+    redis = None
+
+
+class CachedResponse:
+    """Serialized response body with its ETag"""
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.etag = etag or hashlib.sha256(body).hexdigest()
+
+
+class DocumentCache:
+    """
+    Two-level cache for serialized document responses.
+
+    A bounded in-process LRU (with TTL, so replicas converge after deletes)
+    sits in front of an optional shared cache such as Redis. Documents are
+    immutable after insert, so entries only need invalidating on delete.
+    The shared cache keeps a set of the cached variant keys of each document,
+    so invalidation deletes known keys instead of scanning the keyspace.
+    """
+
+    KEY_PREFIX = 'pdftojson:document:'
+    VARIANTS_PREFIX = 'pdftojson:document-variants:'
+    # Documents whose variant sets are read per round trip on bulk invalidation
+    INVALIDATE_CHUNK = 1000
+
+    def __init__(self, max_entries=512, ttl=300, shared_client=None, shared_ttl=86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_client = shared_client
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, document_id, variant):
+        return f"{self.KEY_PREFIX}{int(document_id)}:{variant}"
+
+    def _variants_key(self, document_id):
+        return f"{self.VARIANTS_PREFIX}{int(document_id)}"
+
+    def get(self, document_id, variant='json'):
+        """Return CachedResponse or None"""
+        key = self._key(document_id, variant)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return response
+                del self._entries[key]
+
+        if self.shared_client is None:
+            return None
+
+        try:
+            value = self.shared_client.get(key)
+        except Exception as e:
+            logging.error(f"Shared cache read error: {e}")
+            return None
+        if value is None:
+            return None
+
+        etag, _, body = value.partition(b'\n')
+        response = CachedResponse(body, etag.decode('ascii'))
+        self._store_local(key, response, now)
+        return response
+
+    def set(self, document_id, body, variant='json'):
+        """Cache a serialized body and return its CachedResponse"""
+        key = self._key(document_id, variant)
+        response = CachedResponse(body)
+        self._store_local(key, response, time.monotonic())
+
+        if self.shared_client is not None:
+            variants_key = self._variants_key(document_id)
+            try:
+                pipeline = self.shared_client.pipeline(transaction=False)
+                pipeline.set(key, response.etag.encode('ascii') + b'\n' + body, ex=self.shared_ttl)
+                pipeline.sadd(variants_key, key)
+                pipeline.expire(variants_key, self.shared_ttl)
+                pipeline.execute()
+            except Exception as e:
+                logging.error(f"Shared cache write error: {e}")
+        return response
+
+    def _store_local(self, key, response, now):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (now + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, document_id):
+        """Drop every cached variant of a document"""
+        self.invalidate_many([document_id])
+
+    def invalidate_many(self, document_ids):
+        """Drop every cached variant of many documents (bulk deletes)"""
+        document_ids = sorted({int(document_id) for document_id in document_ids})
+        if not document_ids:
+            return
+        wanted = {str(document_id) for document_id in document_ids}
+        prefix_length = len(self.KEY_PREFIX)
+        with self._lock:
+            for key in [key for key in self._entries if key[prefix_length:].partition(':')[0] in wanted]:
+                del self._entries[key]
+
+        if self.shared_client is not None:
+            try:
+                for start in range(0, len(document_ids), self.INVALIDATE_CHUNK):
+                    self._invalidate_shared(document_ids[start:start + self.INVALIDATE_CHUNK])
+            except Exception as e:
+                logging.error(f"Shared cache invalidation error: {e}")
+
+    def _invalidate_shared(self, document_ids):
+        """Unlink the tracked variant keys (and the default variant) of a chunk of documents"""
+        variants_keys = [self._variants_key(document_id) for document_id in document_ids]
+        pipeline = self.shared_client.pipeline(transaction=False)
+        for variants_key in variants_keys:
+            pipeline.smembers(variants_key)
+        keys = set(variants_keys)
+        # The default variant is also removed when its set is missing (e.g. entries cached before tracking)
+        keys.update(self._key(document_id, 'json') for document_id in document_ids)
+        for members in pipeline.execute():
+            keys.update(members)
+        self.shared_client.unlink(*keys)
+
+    def clear(self):
+        """Drop all local entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+def create_document_cache(max_entries=512, ttl=300, redis_url=None):
+    """Build document cache, connecting to Redis when a URL is configured"""
+    shared_client = None
+    if redis_url:
+        if redis is None:
+            logging.warning("redis not installed, using in-process document cache only")
+        else:
+            shared_client = redis.Redis.from_url(redis_url)
+    return DocumentCache(max_entries=max_entries, ttl=ttl, shared_client=shared_client)
@@ -0,0 +1,225 @@
+import io
+import csv
+import logging
+from datetime import date, datetime
+
+import oracledb
+
+from pdf2json.serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for Parquet exports
+    pa = pq = None
+
+# Container line columns of VW_PDFTOJSON_FIELDS: (name, type, row object path, columnar row path)
+FIELD_COLUMNS = [
+    ('Data_Inicial', 'VARCHAR2(20)', '$."Data Inicial (Start Time)"', '$[0]'),
+    ('Data_Final', 'VARCHAR2(20)', '$."Data Final (End Time)"', '$[1]'),
+    ('Container', 'VARCHAR2(30)', '$."Container (Equipment ID)"', '$[2]'),
+    ('Categoria', 'VARCHAR2(20)', '$."Categoria (Category)"', '$[3]'),
+    ('Armador', 'VARCHAR2(100)', '$."Armador (Line)"', '$[4]'),
+    ('Importador', 'VARCHAR2(255)', '$."Importador/Exportador (Consignee / Shipper)"', '$[6]'),
+    ('CNPJ_CPF', 'VARCHAR2(20)', '$."CNPJ / CPF (ID)"', '$[7]'),
+    ('Valor', 'VARCHAR2(20)', '$."Valor (Unit Value)"', '$[15]'),
+    ('Moeda', 'VARCHAR2(10)', '$."Moeda (Currency)"', '$[14]'),
+]
+
+
+def fields_query(columnar):
+    """
+    Container lines of row-object or columnar documents. Same rows as VW_PDFTOJSON_FIELDS,
+    but JSON_TABLE reads the CONTENT CLOB itself: the view goes through get_json_varchar,
+    which truncates documents larger than 32 KB
+    """
+    names = ', '.join(f"f.{name}" for name, _, _, _ in FIELD_COLUMNS)
+    columns = ',\n                    '.join(
+        f"{name} {sql_type} PATH '{columnar_path if columnar else path}' NULL ON EMPTY"
+        for name, sql_type, path, columnar_path in FIELD_COLUMNS
+    )
+    return f"""
+        SELECT d.DOCUMENT_TYPE, d.DOCUMENT_FILENAME, d.DATE_CREATED, d.ID, f.SECTION_INDEX, f.FIELD_INDEX, {names}
+        FROM PDFTOJSON d,
+        JSON_TABLE(
+            d.CONTENT FORMAT JSON,
+            '$.sections[*]'
+            COLUMNS (
+                SECTION_INDEX FOR ORDINALITY,
+                NESTED PATH '{'$.rows[*]' if columnar else '$.fields[*]'}'
+                COLUMNS (
+                    FIELD_INDEX FOR ORDINALITY,
+                    {columns}
+                )
+            )
+        ) f
+        WHERE {'' if columnar else 'NOT '}JSON_EXISTS(d.CONTENT, '$?(@.format == "columnar")')
+        AND f.FIELD_INDEX IS NOT NULL {{where}}
+    """
+
+
+# Export name -> query over PDFTOJSON or the flattening views; {where} receives the filters
+EXPORT_QUERIES = {
+    'fields': fields_query(columnar=False) + "    UNION ALL" + fields_query(columnar=True) + """
+        ORDER BY ID, SECTION_INDEX, FIELD_INDEX
+    """,
+    'lotes': """
+        SELECT v.*
+        FROM vw_pdftojson_full v
+        JOIN PDFTOJSON d ON d.ID = v.ID
+        WHERE 1 = 1 {where}
+        ORDER BY v.ID, v.arm_idx, v.ops_idx
+    """,
+}
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Unconstrained NUMBER columns of the exports that only hold integers (identity IDs and
+# FOR ORDINALITY indexes); other unconstrained NUMBERs may be fractional amounts
+INTEGER_COLUMNS = {'ID', 'SECTION_INDEX', 'FIELD_INDEX', 'ARM_IDX', 'OPS_IDX'}
+
+
+def export_filters(date_from=None, date_to=None, document_type=None):
+    """SQL conditions (on PDFTOJSON d) and binds; date bounds prune partitions"""
+    conditions = []
+    params = {}
+    if date_from is not None:
+        conditions.append("d.DATE_CREATED >= :date_from")
+        params['date_from'] = date_from
+    if date_to is not None:
+        conditions.append("d.DATE_CREATED < :date_to")
+        params['date_to'] = date_to
+    if document_type is not None:
+        conditions.append("d.DOCUMENT_TYPE = :document_type")
+        params['document_type'] = document_type
+    where = ''.join(f" AND {condition}" for condition in conditions)
+    return where, params
+
+
+def stream_export(oracle_manager, name, arraysize, date_from=None, date_to=None, document_type=None):
+    """
+    Yields the cursor description, then lists of up to arraysize rows.
+    The connection stays open only while the generator is consumed.
+    """
+    where, params = export_filters(date_from, date_to, document_type)
+    connection = oracle_manager.get_connection()
+    if not connection:
+        raise RuntimeError("Failed to connect to Oracle")
+    try:
+        cursor = oracle_manager.read_cursor(connection)
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = arraysize + 1
+        cursor.execute(EXPORT_QUERIES[name].format(where=where), params)
+        yield cursor.description
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield rows
+    except Exception as e:
+        logging.error(f"Error exporting {name}: {e}")
+        raise
+    finally:
+        connection.close()
+
+
+def _json_value(value):
+    """Values JSON cannot encode natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(description, batches):
+    """One JSON object per row"""
+    names = [column[0].lower() for column in description]
+    for rows in batches:
+        yield b''.join(
+            dumps({name: _json_value(value) for name, value in zip(names, row)}) + b'\n'
+            for row in rows
+        )
+
+
+def encode_csv(description, batches):
+    """CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column[0].lower() for column in description])
+    for rows in batches:
+        writer.writerows([_json_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def parquet_schema(description):
+    """Arrow schema from an Oracle cursor description"""
+    fields = []
+    for name, type_code, _, _, precision, scale, _ in description:
+        if type_code is oracledb.DB_TYPE_NUMBER:
+            arrow_type = pa.int64() if scale == 0 or name.upper() in INTEGER_COLUMNS else pa.float64()
+        elif type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP):
+            arrow_type = pa.timestamp('us')
+        else:
+            arrow_type = pa.string()
+        fields.append((name.lower(), arrow_type))
+    return pa.schema(fields)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting bytes to be yielded as response chunks"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def encode_parquet(description, batches):
+    """Parquet file written one row group per fetched batch"""
+    if pq is None:
+        raise RuntimeError("pyarrow is required for Parquet exports")
+    schema = parquet_schema(description)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    try:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'ndjson': encode_ndjson,
+    'parquet': encode_parquet,
+}
+
+
+def export_formats():
+    """Formats whose optional encoders are installed"""
+    return [name for name in ENCODERS if name != 'parquet' or pq is not None]
@@ -1,10 +1,22 @@
 import oracledb
-import json
 import os
-import shutil
+import re
 from datetime import datetime
-from config import ORACLE_CONFIG
+from config import (
+    ORACLE_CONFIG, DOCUMENTS_PATH, STORAGE_BACKEND, S3_CONFIG,
+    PDF_COMPRESSION, PDF_COMPRESSION_LEVEL, PURGE_BATCH_SIZE, PURGE_WORKERS,
+    ORACLE_ARRAYSIZE, ORACLE_PREFETCH_ROWS, SHARED_FILE_GRACE_SECONDS
+)
+from storage.backends import create_document_store
+from pdf2json.serialization import dumps, loads
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum bind variables per reference check query
+REFERENCE_CHECK_CHUNK = 500
+
+# Upper bound of a DATE_CREATED range partition as stored in USER_TAB_PARTITIONS.HIGH_VALUE
+PARTITION_HIGH_VALUE = re.compile(r"TIMESTAMP'\s*(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
 
 def get_oracle_connection():
     """
@@ -41,10 +53,39 @@ def get_oracle_connection():
         logging.error(f"Error connecting to Oracle: {e}")
         return None
 
+def fetch_lobs_as_strings(cursor, metadata):
+    """Output type handler: fetch CLOB/BLOB columns inline instead of as LOB locators"""
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+def parse_content(value):
+    """CONTENT as a dict, whether fetched as text, bytes or native JSON"""
+    if isinstance(value, (str, bytes)):
+        return loads(value)
+    return value
+
+_document_store = None
+
+def get_document_store():
+    """Return shared document store built from configuration"""
+    global _document_store
+    if _document_store is None:
+        _document_store = create_document_store(
+            STORAGE_BACKEND,
+            DOCUMENTS_PATH,
+            PDF_COMPRESSION,
+            PDF_COMPRESSION_LEVEL,
+            S3_CONFIG
+        )
+    return _document_store
+
 class OracleManager:
     def __init__(self):
         self.config = ORACLE_CONFIG
-        self.documents_path = "documents"
+        self.documents_path = DOCUMENTS_PATH
+        self.store = get_document_store()
         
     def get_connection(self):
         """Create Oracle TCP connection"""
@@ -75,47 +116,147 @@ class OracleManager:
             logging.error(f"Error connecting to Oracle: {e}")
             return None
     
+    def read_cursor(self, connection, rows=None):
+        """
+        Cursor for read paths: LOBs fetched as strings and array fetch sized to
+        the expected number of rows (prefetch one extra to detect the end in the
+        same round trip).
+        """
+        cursor = connection.cursor()
+        cursor.outputtypehandler = fetch_lobs_as_strings
+        if rows is None:
+            cursor.arraysize = ORACLE_ARRAYSIZE
+            cursor.prefetchrows = ORACLE_PREFETCH_ROWS
+        else:
+            cursor.arraysize = max(1, min(rows, ORACLE_ARRAYSIZE))
+            cursor.prefetchrows = cursor.arraysize + 1
+        return cursor
+    
     def ensure_documents_directory(self):
         """Ensure documents folder exists"""
-        if not os.path.exists(self.documents_path):
-            os.makedirs(self.documents_path)
-            logging.info(f"Folder {self.documents_path} created")
-    
-    def create_document_directory(self, document_id):
-        """Create specific directory for document"""
-        # Convert to integer to avoid folders with .0
-        document_id_int = int(document_id)
-        document_dir = os.path.join(self.documents_path, str(document_id_int))
-        if not os.path.exists(document_dir):
-            os.makedirs(document_dir)
-            logging.info(f"Directory created: {document_dir}")
-        return document_dir
+        self.store.ensure_root()
     
     def save_pdf_file(self, document_id, filename, temp_file_path):
-        """Save PDF file to specific directory"""
+        """Save PDF file through the configured document store"""
         try:
-            # Create directory for document
-            document_dir = self.create_document_directory(document_id)
-            
-            # Final file path
-            final_path = os.path.join(document_dir, filename)
-            
-            # Copy temporary file to final destination
-            shutil.copy2(temp_file_path, final_path)
-            
-            # Return relative path to save in database
-            # Convert to integer to avoid folders with .0
-            document_id_int = int(document_id)
-            relative_path = os.path.join(str(document_id_int), filename)
-            relative_path = os.path.join(self.documents_path, relative_path)
-            
-            logging.info(f"File saved: {final_path}")
-            return relative_path
-            
+            return self.store.save(document_id, filename, temp_file_path)
         except Exception as e:
             logging.error(f"Error saving file: {e}")
             raise
-            
+    
+    def referenced_paths(self, cursor, file_paths):
+        """Subset of file_paths still referenced by some row, checked in chunks of IN binds"""
+        referenced = set()
+        for start in range(0, len(file_paths), REFERENCE_CHECK_CHUNK):
+            chunk = file_paths[start:start + REFERENCE_CHECK_CHUNK]
+            binds = {f"p{i}": path for i, path in enumerate(chunk)}
+            placeholders = ', '.join(f":{name}" for name in binds)
+            cursor.execute(
+                f"SELECT DISTINCT DOCUMENT_PATH FROM PDFTOJSON WHERE DOCUMENT_PATH IN ({placeholders})",
+                binds
+            )
+            referenced.update(row[0] for row in cursor.fetchall())
+        return referenced
+    
+    def _delete_file(self, file_path):
+        """
+        Remove a stored file, logging failures; returns True if removed.
+        Shared (content-addressed) files reused within SHARED_FILE_GRACE_SECONDS are
+        kept: an insert deduplicated onto them may not be committed yet
+        """
+        try:
+            return self.store.delete(file_path, SHARED_FILE_GRACE_SECONDS)
+        except Exception as e:
+            logging.error(f"Error removing file {file_path}: {e}")
+            return False
+    
+    def remove_unreferenced_files(self, cursor, file_paths, workers=1):
+        """
+        Remove stored files no longer referenced by any row (files may be shared).
+        Returns number of files removed; with workers > 1 files are unlinked in parallel.
+        """
+        candidates = sorted({path for path in file_paths if path and path != 'temp'})
+        if not candidates:
+            return 0
+        
+        referenced = self.referenced_paths(cursor, candidates)
+        orphans = [path for path in candidates if path not in referenced]
+        
+        if workers > 1 and len(orphans) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return sum(executor.map(self._delete_file, orphans))
+        return sum(self._delete_file(path) for path in orphans)
+            
+    def stored_queue_entries(self, cursor, queue_ids):
+        """Return {QUEUE_ID: (ID, path)} of write-behind entries that already have a row"""
+        queue_ids = [queue_id for queue_id in queue_ids if queue_id]
+        if not queue_ids:
+            return {}
+        binds = {f"q{i}": queue_id for i, queue_id in enumerate(queue_ids)}
+        placeholders = ', '.join(f":{name}" for name in binds)
+        cursor.execute(
+            f"SELECT QUEUE_ID, ID, DOCUMENT_PATH FROM PDFTOJSON WHERE QUEUE_ID IN ({placeholders})",
+            binds
+        )
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            
+    def _insert_document_row(self, cursor, document_type, filename, json_content, temp_file_path, queue_id=None):
+        """Insert one document row, save its file and return (ID, path)"""
+        # Insert record in database first to get ID
+        sql = """
+            INSERT INTO PDFTOJSON (DOCUMENT_TYPE, DOCUMENT_FILENAME, DOCUMENT_PATH, CONTENT)
+            VALUES (:document_type, :filename, :path, :content)
+            RETURNING ID INTO :id
+        """
+        binds = {}
+        if queue_id:
+            # Unique QUEUE_ID: a retried write-behind entry can never be inserted twice
+            sql = """
+                INSERT INTO PDFTOJSON (DOCUMENT_TYPE, DOCUMENT_FILENAME, DOCUMENT_PATH, CONTENT, QUEUE_ID)
+                VALUES (:document_type, :filename, :path, :content, :queue_id)
+                RETURNING ID INTO :id
+            """
+            binds['queue_id'] = queue_id
+        
+        # Variable to capture returned ID
+        id_var = cursor.var(oracledb.NUMBER)
+        
+        # Content may arrive already serialized (e.g. from the write-behind queue)
+        if isinstance(json_content, str):
+            content = json_content
+        else:
+            content = dumps(json_content).decode('utf-8')
+        
+        # Insert with temporary path
+        cursor.execute(sql, {
+            'document_type': document_type,
+            'filename': filename,
+            'path': 'temp',  # Temporary, will be updated
+            'content': content,
+            'id': id_var,
+            **binds
+        })
+        
+        # Get ID of inserted record
+        record_id = id_var.getvalue()[0]
+        
+        # Save PDF file using ID
+        file_path = self.save_pdf_file(record_id, filename, temp_file_path)
+        
+        # Update path in database
+        update_sql = """
+            UPDATE PDFTOJSON 
+            SET DOCUMENT_PATH = :path 
+            WHERE ID = :id
+        """
+        
+        cursor.execute(update_sql, {
+            'path': file_path,
+            'id': record_id
+        })
+        
+        return record_id, file_path
+    
     def insert_pdf_document(self, document_type, filename, json_content, temp_file_path):
         """Insert processed document in database and save file"""
         connection = None
@@ -126,52 +267,71 @@ class OracleManager:
             connection = self.get_connection()
             cursor = connection.cursor()
             
-            # Insert record in database first to get ID
-            sql = """
-                INSERT INTO PDFTOJSON (DOCUMENT_TYPE, DOCUMENT_FILENAME, DOCUMENT_PATH, CONTENT)
-                VALUES (:document_type, :filename, :path, :content)
-                RETURNING ID INTO :id
-            """
-            
-            # Variable to capture returned ID
-            id_var = cursor.var(oracledb.NUMBER)
-            
-            # Insert with temporary path
-            cursor.execute(sql, {
-                'document_type': document_type,
-                'filename': filename,
-                'path': 'temp',  # Temporary, will be updated
-                'content': json.dumps(json_content, ensure_ascii=False),
-                'id': id_var
-            })
+            record_id, file_path = self._insert_document_row(
+                cursor, document_type, filename, json_content, temp_file_path
+            )
             
-            # Get ID of inserted record
-            record_id = id_var.getvalue()[0]
+            connection.commit()
             
-            # Save PDF file using ID
-            file_path = self.save_pdf_file(record_id, filename, temp_file_path)
+            logging.info(f"Document '{filename}' inserted with ID: {record_id}")
+            return record_id, file_path
             
-            # Update path in database
-            update_sql = """
-                UPDATE PDFTOJSON 
-                SET DOCUMENT_PATH = :path 
-                WHERE ID = :id
-            """
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            logging.error(f"Error inserting document: {e}")
+            raise
+        finally:
+            if connection:
+                connection.close()
+    
+    def insert_pdf_documents(self, documents):
+        """
+        Insert a batch of documents in a single transaction.
+        Each item has document_type, filename, json_content and temp_file_path,
+        and optionally the write-behind queue_id: entries already stored by an
+        earlier attempt are returned instead of inserted again.
+        Returns list of (ID, path) in input order.
+        """
+        connection = None
+        stored = []
+        saved_paths = []
+        try:
+            self.ensure_documents_directory()
             
-            cursor.execute(update_sql, {
-                'path': file_path,
-                'id': record_id
-            })
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            existing = self.stored_queue_entries(cursor, [document.get('queue_id') for document in documents])
+            
+            for document in documents:
+                if document.get('queue_id') in existing:
+                    stored.append(existing[document['queue_id']])
+                    continue
+                record_id, file_path = self._insert_document_row(
+                    cursor,
+                    document['document_type'],
+                    document['filename'],
+                    document['json_content'],
+                    document['temp_file_path'],
+                    document.get('queue_id')
+                )
+                stored.append((record_id, file_path))
+                saved_paths.append(file_path)
             
             connection.commit()
             
-            logging.info(f"Document '{filename}' inserted with ID: {record_id}")
-            return record_id, file_path
+            logging.info(f"Batch of {len(saved_paths)} document(s) inserted")
+            return stored
             
         except Exception as e:
             if connection:
                 connection.rollback()
-            logging.error(f"Error inserting document: {e}")
+                # Files saved before the failure belong to rolled back rows
+                try:
+                    self.remove_unreferenced_files(connection.cursor(), saved_paths)
+                except Exception as cleanup_error:
+                    logging.error(f"Error cleaning up batch files: {cleanup_error}")
+            logging.error(f"Error inserting document batch: {e}")
             raise
         finally:
             if connection:
@@ -182,7 +342,7 @@ class OracleManager:
         connection = None
         try:
             connection = self.get_connection()
-            cursor = connection.cursor()
+            cursor = self.read_cursor(connection, rows=1)
             
             sql = """
                 SELECT ID, DOCUMENT_TYPE, DOCUMENT_FILENAME, DOCUMENT_PATH, CONTENT, DATE_CREATED
@@ -199,7 +359,7 @@ class OracleManager:
                     'document_type': row[1],
                     'document_filename': row[2],
                     'document_path': row[3],
-                    'content': json.loads(row[4]),
+                    'content': parse_content(row[4]),
                     'date_created': row[5].isoformat()
                 }
             return None
@@ -211,21 +371,36 @@ class OracleManager:
             if connection:
                 connection.close()
                 
-    def get_all_documents(self, limit=50):
-        """List all documents (with limit)"""
+    def get_all_documents(self, limit=50, date_from=None, date_to=None, document_type=None):
+        """List documents (with limit), optionally filtered by creation date range and type"""
         connection = None
         try:
             connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            sql = """
+            cursor = self.read_cursor(connection, rows=limit)
+            
+            # Bounds on DATE_CREATED let Oracle prune monthly partitions
+            conditions = []
+            params = {'limit': limit}
+            if date_from is not None:
+                conditions.append("DATE_CREATED >= :date_from")
+                params['date_from'] = date_from
+            if date_to is not None:
+                conditions.append("DATE_CREATED < :date_to")
+                params['date_to'] = date_to
+            if document_type is not None:
+                conditions.append("DOCUMENT_TYPE = :document_type")
+                params['document_type'] = document_type
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            sql = f"""
                 SELECT ID, DOCUMENT_TYPE, DOCUMENT_FILENAME, DOCUMENT_PATH, DATE_CREATED
                 FROM PDFTOJSON
+                {where}
                 ORDER BY DATE_CREATED DESC
                 FETCH FIRST :limit ROWS ONLY
             """
             
-            cursor.execute(sql, {'limit': limit})
+            cursor.execute(sql, params)
             rows = cursor.fetchall()
             
             documents = []
@@ -247,6 +422,71 @@ class OracleManager:
             if connection:
                 connection.close()
                 
+    def get_expired_partitions(self, cursor, cutoff):
+        """Partitions of PDFTOJSON whose rows are all older than cutoff: [(name, high_value)]"""
+        cursor.execute("""
+            SELECT PARTITION_NAME, HIGH_VALUE
+            FROM USER_TAB_PARTITIONS
+            WHERE TABLE_NAME = 'PDFTOJSON'
+            ORDER BY PARTITION_POSITION
+        """)
+        expired = []
+        for partition_name, high_value in cursor.fetchall():
+            # HIGH_VALUE is a LONG holding e.g. TIMESTAMP' 2024-02-01 00:00:00'
+            match = PARTITION_HIGH_VALUE.search(high_value or '')
+            if not match:
+                continue
+            upper_bound = datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S')
+            if upper_bound <= cutoff:
+                expired.append((partition_name, upper_bound))
+        return expired
+    
+    def drop_partitions_before(self, cutoff):
+        """
+        Retention: drop monthly partitions entirely older than cutoff.
+        Returns {'partitions': count, 'ids': dropped document IDs, 'paths': their file paths,
+        'files_removed': count}; files left unreferenced are removed, callers invalidate cached IDs.
+        """
+        connection = None
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            
+            dropped = 0
+            dropped_ids = []
+            dropped_paths = []
+            files_removed = 0
+            for partition_name, upper_bound in self.get_expired_partitions(cursor, cutoff):
+                cursor.execute(
+                    f'SELECT ID, DOCUMENT_PATH FROM PDFTOJSON PARTITION ("{partition_name}")'
+                )
+                rows = cursor.fetchall()
+                file_paths = [row[1] for row in rows]
+                try:
+                    cursor.execute(
+                        f'ALTER TABLE PDFTOJSON DROP PARTITION "{partition_name}" UPDATE GLOBAL INDEXES'
+                    )
+                except oracledb.DatabaseError as e:
+                    error, = e.args
+                    if error.code == 14758:  # Last partition in the range section cannot be dropped
+                        logging.info(f"Keeping range partition {partition_name}, rows are purged by delete_documents_before")
+                        continue
+                    raise
+                dropped += 1
+                dropped_ids.extend(row[0] for row in rows)
+                dropped_paths.extend(file_paths)
+                logging.info(f"Partition {partition_name} (< {upper_bound}) dropped")
+                files_removed += self.remove_unreferenced_files(cursor, file_paths, PURGE_WORKERS)
+            
+            return {'partitions': dropped, 'ids': dropped_ids, 'paths': dropped_paths, 'files_removed': files_removed}
+            
+        except Exception as e:
+            logging.error(f"Error dropping partitions: {e}")
+            raise
+        finally:
+            if connection:
+                connection.close()
+                
     def get_document_file_path(self, document_id):
         """Return complete PDF file path"""
         connection = None
@@ -274,34 +514,52 @@ class OracleManager:
             if connection:
                 connection.close()
                 
+    def get_document_file_info(self, document_id):
+        """Return (filename, stored path) of a document's PDF"""
+        connection = None
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            
+            sql = """
+                SELECT DOCUMENT_FILENAME, DOCUMENT_PATH 
+                FROM PDFTOJSON 
+                WHERE ID = :id
+            """
+            
+            cursor.execute(sql, {'id': document_id})
+            row = cursor.fetchone()
+            
+            if row:
+                return row[0], row[1]
+            return None
+            
+        except Exception as e:
+            logging.error(f"Error getting file info: {e}")
+            raise
+        finally:
+            if connection:
+                connection.close()
+                
     def delete_document(self, document_id):
         """Remove document from database and file from disk"""
         connection = None
         try:
-            # Get file path before deleting
-            file_path = self.get_document_file_path(document_id)
-            
             connection = self.get_connection()
             cursor = connection.cursor()
             
-            # Delete from database
-            sql = "DELETE FROM PDFTOJSON WHERE ID = :id"
-            cursor.execute(sql, {'id': document_id})
+            # Delete from database, returning the file path in the same round trip
+            path_var = cursor.var(str)
+            sql = "DELETE FROM PDFTOJSON WHERE ID = :id RETURNING DOCUMENT_PATH INTO :path"
+            cursor.execute(sql, {'id': document_id, 'path': path_var})
+            
+            if cursor.rowcount == 0:
+                return False
             
             connection.commit()
             
-            # Delete file from disk if exists
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
-                logging.info(f"File removed: {file_path}")
-                
-                # Try to remove directory if empty
-                dir_path = os.path.dirname(file_path)
-                try:
-                    os.rmdir(dir_path)
-                    logging.info(f"Directory removed: {dir_path}")
-                except OSError:
-                    pass  # Directory not empty
+            # Delete file unless another document shares it
+            self.remove_unreferenced_files(cursor, path_var.getvalue())
             
             logging.info(f"Document ID {document_id} removed")
             return True
@@ -315,6 +573,57 @@ class OracleManager:
             if connection:
                 connection.close()
                 
+    def delete_documents_before(self, cutoff, document_type=None, batch_size=PURGE_BATCH_SIZE,
+                                workers=PURGE_WORKERS):
+        """
+        Bulk delete documents created before cutoff, in committed batches.
+        Returns {'ids': deleted IDs, 'files_removed': count}.
+        """
+        connection = None
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            
+            conditions = "DATE_CREATED < :cutoff"
+            if document_type is not None:
+                conditions += " AND DOCUMENT_TYPE = :document_type"
+            sql = f"""
+                DELETE FROM PDFTOJSON
+                WHERE {conditions} AND ROWNUM <= :batch_size
+                RETURNING ID, DOCUMENT_PATH INTO :ids, :paths
+            """
+            
+            deleted_ids = []
+            files_removed = 0
+            while True:
+                ids_var = cursor.var(int, arraysize=batch_size)
+                paths_var = cursor.var(str, arraysize=batch_size)
+                params = {'cutoff': cutoff, 'batch_size': batch_size, 'ids': ids_var, 'paths': paths_var}
+                if document_type is not None:
+                    params['document_type'] = document_type
+                cursor.execute(sql, params)
+                deleted = cursor.rowcount
+                if deleted == 0:
+                    break
+                connection.commit()
+                
+                deleted_ids.extend(ids_var.getvalue())
+                files_removed += self.remove_unreferenced_files(cursor, paths_var.getvalue(), workers)
+                logging.info(f"Purged {deleted} documents created before {cutoff}")
+                if deleted < batch_size:
+                    break
+            
+            return {'ids': deleted_ids, 'files_removed': files_removed}
+            
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            logging.error(f"Error purging documents: {e}")
+            raise
+        finally:
+            if connection:
+                connection.close()
+                
     def get_status(self):
         """Get connection status"""
         try:
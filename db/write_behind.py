@@ -0,0 +1,355 @@
+import os
+import time
+import uuid
+import shutil
+import socket
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pdf2json.serialization import dumps
+
+
+class WriteBehindQueue:
+    """
+    Durable local queue that decouples /document from Oracle latency.
+
+    Parse results and a copy of the PDF are written to a SQLite journal under
+    the documents folder; a background thread drains them to PDFTOJSON in
+    batches, retrying with exponential backoff while the database is unavailable.
+    Entries of a failed batch are retried one at a time, so one bad document does
+    not hold back the others, and are marked 'failed' after max_attempts.
+    Claimed batches carry the owner and a lease, renewed while the insert runs,
+    so several processes can share the queue and only batches of an owner whose
+    lease expired are recovered. Inserts carry the queue ID, so an entry stored
+    by an earlier attempt is not inserted again.
+    """
+
+    def __init__(self, oracle_manager, queue_dir, batch_size=20, poll_interval=1.0,
+                 max_backoff=60.0, retention_seconds=86400, max_attempts=10, lease_seconds=300.0):
+        self.oracle_manager = oracle_manager
+        self.queue_dir = queue_dir
+        self.spool_dir = os.path.join(queue_dir, 'spool')
+        self.db_path = os.path.join(queue_dir, 'queue.sqlite3')
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._init_db()
+
+    def _connect(self):
+        """Open SQLite connection with durable settings"""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def _init_db(self):
+        """Create queue table if it doesn't exist"""
+        connection = self._connect()
+        try:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS write_queue (
+                    queue_id TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    document_type TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    spool_path TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    record_id INTEGER,
+                    file_path TEXT,
+                    created_at REAL NOT NULL,
+                    stored_at REAL,
+                    claimed_by TEXT,
+                    lease_expires_at REAL
+                )
+            """)
+            # Queues created before claim leases
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(write_queue)")}
+            for column, column_type in (('claimed_by', 'TEXT'), ('lease_expires_at', 'REAL')):
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE write_queue ADD COLUMN {column} {column_type}")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_write_queue_ready ON write_queue(status, next_attempt_at, seq)"
+            )
+        finally:
+            connection.close()
+
+    def enqueue(self, document_type, filename, json_content, temp_file_path):
+        """Durably record a parse result and its PDF; returns the queue ID"""
+        queue_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, f"{queue_id}.pdf")
+
+        # Copy PDF to spool and flush it to disk before recording the entry
+        shutil.copyfile(temp_file_path, spool_path)
+        with open(spool_path, 'rb') as spool_file:
+            os.fsync(spool_file.fileno())
+
+        if isinstance(json_content, str):
+            content = json_content
+        else:
+            content = dumps(json_content).decode('utf-8')
+
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("""
+                INSERT INTO write_queue (queue_id, seq, status, document_type, filename,
+                                         content, spool_path, next_attempt_at, created_at)
+                VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM write_queue), 'pending', ?, ?, ?, ?, ?, ?)
+            """, (queue_id, document_type, filename, content, spool_path, now, now))
+        except Exception:
+            os.remove(spool_path)
+            raise
+        finally:
+            connection.close()
+
+        logging.info(f"Document '{filename}' queued with queue ID: {queue_id}")
+        self._wake_event.set()
+        return queue_id
+
+    def get_status(self, queue_id):
+        """Return queue entry status or None if unknown"""
+        connection = self._connect()
+        try:
+            row = connection.execute("""
+                SELECT queue_id, status, document_type, filename, attempts, last_error,
+                       record_id, file_path, created_at, stored_at
+                FROM write_queue
+                WHERE queue_id = ?
+            """, (queue_id,)).fetchone()
+        finally:
+            connection.close()
+
+        if not row:
+            return None
+        return {
+            'queue_id': row[0],
+            'status': row[1],
+            'document_type': row[2],
+            'document_filename': row[3],
+            'attempts': row[4],
+            'last_error': row[5],
+            'database_id': row[6],
+            'file_path': row[7],
+            'queued_at': datetime.fromtimestamp(row[8]).isoformat(),
+            'stored_at': datetime.fromtimestamp(row[9]).isoformat() if row[9] else None
+        }
+
+    def pending_count(self):
+        """Number of entries not yet stored in Oracle"""
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT COUNT(*) FROM write_queue WHERE status IN ('pending', 'inflight')"
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    def _claim_batch(self, connection):
+        """
+        Mark next ready batch as in flight under this owner's lease and return it.
+        Entries that already failed are claimed alone; new entries are batched
+        up to the first retried one.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            rows = connection.execute("""
+                SELECT queue_id, document_type, filename, content, spool_path, attempts
+                FROM write_queue
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY seq
+                LIMIT ?
+            """, (now, self.batch_size)).fetchall()
+            if rows and rows[0][5] > 0:
+                rows = rows[:1]
+            else:
+                retried = next((i for i, row in enumerate(rows) if row[5] > 0), len(rows))
+                rows = rows[:retried]
+            connection.executemany(
+                "UPDATE write_queue SET status = 'inflight', claimed_by = ?, lease_expires_at = ? WHERE queue_id = ?",
+                [(self.owner, now + self.lease_seconds, row[0]) for row in rows]
+            )
+            connection.execute("COMMIT")
+            return rows
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _lease_heartbeat(self, queue_ids):
+        """Renew this owner's lease on queue_ids until the block exits"""
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.lease_seconds / 3):
+                connection = self._connect()
+                try:
+                    expires_at = time.time() + self.lease_seconds
+                    connection.executemany(
+                        "UPDATE write_queue SET lease_expires_at = ? WHERE queue_id = ? AND claimed_by = ?",
+                        [(expires_at, queue_id, self.owner) for queue_id in queue_ids]
+                    )
+                except Exception as e:
+                    logging.warning(f"Write-behind lease renewal failed: {e}")
+                finally:
+                    connection.close()
+
+        thread = threading.Thread(target=renew, name='write-behind-lease', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def drain_once(self):
+        """Drain one batch to Oracle; returns number of documents stored"""
+        connection = self._connect()
+        try:
+            rows = self._claim_batch(connection)
+            if not rows:
+                return 0
+
+            documents = [{
+                'document_type': row[1],
+                'filename': row[2],
+                'json_content': row[3],
+                'temp_file_path': row[4],
+                'queue_id': row[0]
+            } for row in rows]
+
+            try:
+                with self._lease_heartbeat([row[0] for row in rows]):
+                    stored = self.oracle_manager.insert_pdf_documents(documents)
+            except Exception as e:
+                logging.error(f"Write-behind batch of {len(rows)} failed: {e}")
+                now = time.time()
+                failures = []
+                for row in rows:
+                    attempts = row[5] + 1
+                    status = 'failed' if attempts >= self.max_attempts else 'pending'
+                    if status == 'failed':
+                        logging.error(f"Write-behind entry {row[0]} failed after {attempts} attempts")
+                    failures.append((status, attempts, now + self._backoff(attempts), str(e), row[0], self.owner))
+                # Entries whose lease was taken over belong to the new owner
+                connection.executemany("""
+                    UPDATE write_queue
+                    SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?,
+                        claimed_by = NULL, lease_expires_at = NULL
+                    WHERE queue_id = ? AND claimed_by = ?
+                """, failures)
+                return 0
+
+            now = time.time()
+            finished = []
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for row, (record_id, file_path) in zip(rows, stored):
+                    # An entry whose lease was taken over is finished by its new owner,
+                    # which finds the row by queue ID instead of inserting it again
+                    if connection.execute("""
+                        UPDATE write_queue
+                        SET status = 'stored', record_id = ?, file_path = ?, content = '', spool_path = NULL,
+                            last_error = NULL, stored_at = ?, claimed_by = NULL, lease_expires_at = NULL
+                        WHERE queue_id = ? AND claimed_by = ?
+                    """, (int(record_id), file_path, now, row[0], self.owner)).rowcount:
+                        finished.append(row)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            for row in finished:
+                try:
+                    os.remove(row[4])
+                except OSError:
+                    pass
+
+            logging.info(f"Write-behind stored {len(rows)} document(s) in Oracle")
+            return len(rows)
+        finally:
+            connection.close()
+
+    def _backoff(self, attempts):
+        """Exponential backoff delay in seconds"""
+        return min(self.max_backoff, self.poll_interval * (2 ** attempts))
+
+    def purge_stored(self):
+        """Remove stored entries older than the retention window"""
+        connection = self._connect()
+        try:
+            connection.execute(
+                "DELETE FROM write_queue WHERE status = 'stored' AND stored_at < ?",
+                (time.time() - self.retention_seconds,)
+            )
+        finally:
+            connection.close()
+
+    def recover_inflight(self):
+        """Return entries whose claim lease expired (owner stopped or crashed) to pending"""
+        connection = self._connect()
+        try:
+            connection.execute("""
+                UPDATE write_queue
+                SET status = 'pending', claimed_by = NULL, lease_expires_at = NULL
+                WHERE status = 'inflight' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            """, (time.time(),))
+        finally:
+            connection.close()
+
+    def requeue_failed(self):
+        """Return entries marked 'failed' to pending with a fresh attempt count; returns how many"""
+        connection = self._connect()
+        try:
+            return connection.execute("""
+                UPDATE write_queue
+                SET status = 'pending', attempts = 0, next_attempt_at = ?
+                WHERE status = 'failed'
+            """, (time.time(),)).rowcount
+        finally:
+            connection.close()
+
+    def _run(self):
+        """Background drain loop"""
+        while not self._stop_event.is_set():
+            try:
+                while self.drain_once():
+                    pass
+                self.purge_stored()
+                self.recover_inflight()
+            except Exception as e:
+                logging.error(f"Write-behind drain error: {e}")
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+
+    def start(self):
+        """Start background drain thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.recover_inflight()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        logging.info(f"Write-behind queue started: {self.db_path}")
+
+    def stop(self, timeout=None):
+        """Stop background drain thread"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -1,2 +1,16 @@
 # -*- coding: utf-8 -*-
-"""Módulo pdf2json: extração de PDF para JSON."""
\ No newline at end of file
+"""Módulo pdf2json: extração de PDF para JSON.
+
+API de biblioteca (ver `pdf2json.api`): `parse`, `parse_many`, `ParseResult`,
+`ParseError` e `UnsupportedDocumentError`.
+"""
+
+__all__ = ['parse', 'parse_many', 'ParseResult', 'ParseError', 'UnsupportedDocumentError']
+
+
+def __getattr__(name):
+    # Imported on first use, so `pdf2json.serialization` (used by db/) does not load the parsers
+    if name in __all__:
+        from . import api
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
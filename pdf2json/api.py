@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+API de biblioteca: parse de demonstrativos dentro do próprio processo.
+
+`parse` aceita um caminho, bytes ou arquivo binário, identifica o tipo do
+documento pelo título da primeira página e devolve um `ParseResult`. Ao
+contrário da rota HTTP e de `analyze_document_by_type`, erros são levantados
+como `ParseError` (ou `UnsupportedDocumentError`) em vez de virarem um dict.
+
+`parse_many` processa vários documentos e devolve os resultados na ordem de
+entrada, sob demanda; com `workers > 1` os documentos são distribuídos entre
+processos (contexto `spawn`), com no máximo `2 * workers` em andamento:
+
+    from pdf2json import parse, parse_many
+
+    result = parse('demonstrativo.pdf')
+    result.document_type, result.header
+
+    for result in parse_many(paths, workers=4):
+        carregar(result.to_dict())
+"""
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional, Union
+
+from .backends import DEFAULT_BACKEND
+from .document_001 import extract_data_with_header_mapping, extract_header_info
+from .document_002 import PDFLineParser
+from .identify_document import COORDINATE_DOCUMENT, document_type_for_title, read_document_title
+from .serialization import dumps
+from .tables import document_tables, iter_rows
+
+# Documents in flight per worker process in parse_many
+PARSE_MANY_PREFETCH = 2
+
+
+class ParseError(Exception):
+    """A document could not be parsed; source is the path or input index"""
+
+    def __init__(self, message, source=None):
+        super().__init__(message)
+        self.source = source
+
+    def __reduce__(self):
+        # Keeps source when the error comes back from a worker process
+        return type(self), (str(self), self.source)
+
+
+class UnsupportedDocumentError(ParseError):
+    """The document title is not one of the supported types"""
+
+
+@dataclass(slots=True)
+class ParseResult:
+    """Parsed document: type, parser output and the source it came from"""
+
+    document_type: str
+    content: dict
+    source: Optional[Union[str, int]] = None
+
+    @property
+    def header(self):
+        return self.content.get('header', {})
+
+    @property
+    def sections(self):
+        """Coordinate parser sections (empty for line parser documents)"""
+        return self.content.get('sections', [])
+
+    def tables(self):
+        """Table names available for iter_rows / Arrow export"""
+        return document_tables(self.content)
+
+    def rows(self, table, document_id=None):
+        """Typed rows of a table as tuples in TABLE_SCHEMAS column order"""
+        return iter_rows(self.content, table, document_id)
+
+    def to_dict(self):
+        """Parser output with document_type, as returned by the HTTP API"""
+        return dict(self.content, document_type=self.document_type)
+
+    def to_json(self):
+        """JSON bytes of to_dict()"""
+        return dumps(self.to_dict())
+
+
+def _open_source(source):
+    """Path, or seekable binary stream of a bytes/file source"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    if hasattr(source, 'read'):
+        if hasattr(source, 'seekable') and source.seekable():
+            source.seek(0)
+            return source
+        return BytesIO(source.read())
+    raise TypeError(f"Expected a path, bytes or binary file, got {type(source).__name__}")
+
+
+def _rewind(stream):
+    if not isinstance(stream, str):
+        stream.seek(0)
+
+
+def parse(source, workers=1, coordinate_backend=DEFAULT_BACKEND, line_backend=DEFAULT_BACKEND, page_cache=None,
+          calibrate=False, *, label=None):
+    """
+    Parses a PDF given as a path, bytes or binary file.
+    workers > 1 parses the pages of large coordinate documents across processes;
+    calibrate moves coordinate parser columns with the English header labels.
+    Raises UnsupportedDocumentError for unknown titles and ParseError for other failures.
+    """
+    stream = _open_source(source)
+    if label is None and isinstance(stream, str):
+        label = stream
+    try:
+        title = read_document_title(stream, coordinate_backend)
+    except Exception as e:
+        raise ParseError(f"Could not extract document title: {e}", label) from e
+    if title is None:
+        raise UnsupportedDocumentError("Could not extract document title", label)
+    document_type = document_type_for_title(title)
+    if document_type is None:
+        raise UnsupportedDocumentError(f"Document type not recognized: {title}", label)
+
+    try:
+        _rewind(stream)
+        if document_type == COORDINATE_DOCUMENT:
+            header_info = extract_header_info(stream, coordinate_backend)
+            _rewind(stream)
+            content = {
+                "header": header_info["header"],
+                "sections": extract_data_with_header_mapping(stream, workers, coordinate_backend, page_cache,
+                                                             calibrate)
+            }
+        else:
+            content = PDFLineParser(line_backend, page_cache).parse_pdf(stream)
+    except Exception as e:
+        raise ParseError(f"Could not parse {document_type}: {e}", label) from e
+    return ParseResult(document_type, content, label)
+
+
+def _parse_job(source, label, coordinate_backend, line_backend, calibrate, return_exceptions):
+    """parse() in a worker process; errors come back as values when requested"""
+    try:
+        return parse(source, 1, coordinate_backend, line_backend, calibrate=calibrate, label=label)
+    except ParseError as e:
+        if return_exceptions:
+            return e
+        raise
+
+
+def parse_many(sources, workers=1, coordinate_backend=DEFAULT_BACKEND, line_backend=DEFAULT_BACKEND,
+               page_cache=None, calibrate=False, return_exceptions=False):
+    """
+    Yields a ParseResult per source (path, bytes or binary file), in input order.
+    Results without a path carry their input index as source. With return_exceptions,
+    failed documents yield their ParseError instead of stopping the iteration.
+    workers > 1 parses documents in spawned processes; the page cache is in-process only.
+    """
+    if workers <= 1:
+        for index, source in enumerate(sources):
+            label = None if isinstance(source, (str, os.PathLike)) else index
+            try:
+                yield parse(source, 1, coordinate_backend, line_backend, page_cache, calibrate, label=label)
+            except ParseError as e:
+                if not return_exceptions:
+                    raise
+                yield e
+        return
+
+    if page_cache is not None:
+        raise ValueError("page_cache is in-process only; use workers=1 to parse with a page cache")
+
+    pending = deque()
+    # spawn: callers may run threads, which forked workers must not inherit
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        for index, source in enumerate(sources):
+            if isinstance(source, (str, os.PathLike)):
+                source = label = os.fspath(source)
+            else:
+                label = index
+                if hasattr(source, 'read'):
+                    # File objects do not cross process boundaries
+                    source = _open_source(source).read()
+            pending.append(executor.submit(_parse_job, source, label, coordinate_backend, line_backend,
+                                           calibrate, return_exceptions))
+            if len(pending) >= workers * PARSE_MANY_PREFETCH:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
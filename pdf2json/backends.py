@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+Backends de extração de PDF.
+
+Os parsers leem `pdf.pages` e, de cada página, `chars`, `lines`, `rects` e
+`extract_text()` no formato do pdfplumber. O backend `pdfplumber` (padrão) usa o
+pdfminer.six; o backend `pdfium` lê os mesmos dados com o PDFium (pypdfium2,
+já instalado como dependência do pdfplumber), sem a análise de layout do pdfminer.
+
+Equivalência do backend `pdfium`: caracteres com o mesmo texto, `x0`/`x1` e
+`top`/`bottom` calculados como no pdfminer (descida da fonte pelas métricas AFM
+das 14 fontes padrão ou pelo descritor da fonte); retângulos e linhas de caminhos
+retos; cores como RGB com três casas decimais; texto extraído pelo mesmo
+algoritmo do pdfplumber.
+"""
+
+import ctypes
+from collections import namedtuple
+
+import pdfplumber
+from pdfplumber.utils import chars_to_textmap
+from pdfminer.fontmetrics import FONT_METRICS
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # Optional dependency, only needed for the pdfium backend
+    pdfium = pdfium_c = None
+
+PDFPLUMBER = 'pdfplumber'
+PDFIUM = 'pdfium'
+DEFAULT_BACKEND = PDFPLUMBER
+
+
+def _open_pdfplumber(source):
+    return pdfplumber.open(source)
+
+
+def _open_pdfium(source):
+    if pdfium is None:
+        raise RuntimeError("pypdfium2 is required for the pdfium backend")
+    return PdfiumDocument(source)
+
+
+BACKENDS = {
+    PDFPLUMBER: _open_pdfplumber,
+    PDFIUM: _open_pdfium,
+}
+
+
+def open_pdf(source, backend=DEFAULT_BACKEND):
+    """Opens a PDF (path, bytes or binary file) with the named backend"""
+    try:
+        opener = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    return opener(source)
+
+
+# Objects of a page region: chars, lines and rects as pdfplumber dicts
+PageObjects = namedtuple('PageObjects', ['chars', 'lines', 'rects'])
+
+
+def _within(obj, bbox):
+    """Object x0 in [x0, x1] and top in [top, bottom) of a (x0, top, x1, bottom) bbox"""
+    x0, top, x1, bottom = bbox
+    return x0 <= obj['x0'] <= x1 and top <= obj['top'] < bottom
+
+
+def crop_objects(page, char_bbox, shape_bbox):
+    """
+    Chars inside char_bbox and lines/rects inside shape_bbox of a page.
+    The pdfium backend skips objects outside the regions while extracting them;
+    other pages are filtered after extraction.
+    """
+    if isinstance(page, PdfiumPage):
+        return page.objects_within(char_bbox, shape_bbox)
+    return PageObjects(
+        [char for char in page.chars if _within(char, char_bbox)],
+        [line for line in page.lines if _within(line, shape_bbox)],
+        [rect for rect in page.rects if _within(rect, shape_bbox)]
+    )
+
+
+def _color(red, green, blue):
+    """PDFium 0-255 RGB as the 0-1 tuple written in the content stream"""
+    return (round(red.value / 255, 3), round(green.value / 255, 3), round(blue.value / 255, 3))
+
+
+def _multiply(first, second):
+    """Product of two (a, b, c, d, e, f) matrices: first applied, then second"""
+    a1, b1, c1, d1, e1, f1 = first
+    a2, b2, c2, d2, e2, f2 = second
+    return (
+        a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2
+    )
+
+
+class PdfiumDocument:
+    """PDF opened with PDFium, exposing pdfplumber-like pages"""
+
+    def __init__(self, source):
+        if hasattr(source, 'read') and not hasattr(source, 'readinto'):
+            source = source.read()
+        self._document = pdfium.PdfDocument(source)
+        self.pages = []
+        doctop = 0
+        for index in range(len(self._document)):
+            width, height = self._document.get_page_size(index)
+            self.pages.append(PdfiumPage(self._document, index, width, height, doctop))
+            doctop += height
+
+    def close(self):
+        for page in self.pages:
+            page.close()
+        self._document.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PdfiumPage:
+    """One page; chars, lines and rects are extracted on first access"""
+
+    def __init__(self, document, index, width, height, doctop):
+        self._document = document
+        self._page = None
+        self.page_number = index + 1
+        self.width = width
+        self.height = height
+        self.doctop = doctop
+        self._chars = None
+        self._shapes = None
+        self._fonts = {}
+
+    def _load(self):
+        if self._page is None:
+            self._page = self._document[self.page_number - 1]
+        return self._page
+
+    def close(self):
+        if self._page is not None:
+            self._page.close()
+            self._page = None
+
+    @property
+    def chars(self):
+        if self._chars is None:
+            self._chars = self._extract_chars()
+        return self._chars
+
+    @property
+    def rects(self):
+        if self._shapes is None:
+            self._shapes = self._extract_shapes()
+        return self._shapes['rect']
+
+    @property
+    def lines(self):
+        if self._shapes is None:
+            self._shapes = self._extract_shapes()
+        return self._shapes['line']
+
+    def objects_within(self, char_bbox, shape_bbox):
+        """PageObjects of the regions; objects outside them are never built"""
+        if self._chars is not None:
+            chars = [char for char in self._chars if _within(char, char_bbox)]
+        else:
+            chars = self._extract_chars(char_bbox)
+        shapes = self._shapes if self._shapes is not None else self._extract_shapes(shape_bbox)
+        return PageObjects(
+            chars,
+            [line for line in shapes['line'] if _within(line, shape_bbox)],
+            [rect for rect in shapes['rect'] if _within(rect, shape_bbox)]
+        )
+
+    def extract_text(self, **kwargs):
+        """Page text, same algorithm and defaults as pdfplumber's Page.extract_text"""
+        options = dict(x_shift=0, y_shift=0, layout_width=self.width, layout_height=self.height)
+        options.update(kwargs)
+        return chars_to_textmap(self.chars, **options).as_string
+
+    def _font(self, text_object):
+        """(font, font name, descent per unit of font size) as pdfminer computes them"""
+        font = pdfium_c.FPDFTextObj_GetFont(text_object)
+        key = ctypes.cast(font, ctypes.c_void_p).value
+        if key not in self._fonts:
+            buffer = ctypes.create_string_buffer(256)
+            pdfium_c.FPDFFont_GetBaseFontName(font, buffer, len(buffer))
+            name = buffer.value.decode('latin-1')
+            if name in FONT_METRICS:
+                descent = FONT_METRICS[name][0].get('Descent', 0) / 1000
+            else:
+                value = ctypes.c_float()
+                pdfium_c.FPDFFont_GetDescent(font, ctypes.c_float(1.0), ctypes.byref(value))
+                descent = value.value
+            self._fonts[key] = (font, name, -abs(descent))
+        return self._fonts[key]
+
+    def _extract_chars(self, bbox=None):
+        textpage = self._load().get_textpage()
+        try:
+            raw = textpage.raw
+            count = pdfium_c.FPDFText_CountChars(raw)
+            # Page text in one call; room for surrogate pairs, which break the
+            # one-unit-per-char-index alignment (then read chars one by one)
+            buffer = ctypes.create_string_buffer((count * 2 + 1) * 2)
+            written = pdfium_c.FPDFText_GetText(raw, 0, count, ctypes.cast(buffer, ctypes.POINTER(ctypes.c_ushort)))
+            if written == count + 1:
+                units = buffer.raw[:count * 2].decode('utf-16-le', errors='surrogatepass')
+            else:
+                units = [chr(pdfium_c.FPDFText_GetUnicode(raw, index)) for index in range(count)]
+
+            chars = []
+            origin_x, origin_y = ctypes.c_double(), ctypes.c_double()
+            advance = ctypes.c_float()
+            box = pdfium_c.FS_RECTF()
+            matrix = pdfium_c.FS_MATRIX()
+            text_object_key = None
+            for index, text in enumerate(units):
+                if pdfium_c.FPDFText_IsGenerated(raw, index):
+                    continue
+                # Font, size and matrix only change with the text object
+                text_object = pdfium_c.FPDFText_GetTextObject(raw, index)
+                key = ctypes.cast(text_object, ctypes.c_void_p).value
+                if key != text_object_key:
+                    text_object_key = key
+                    font, fontname, descent = self._font(text_object)
+                    fontsize = pdfium_c.FPDFText_GetFontSize(raw, index)
+                    pdfium_c.FPDFText_GetMatrix(raw, index, matrix)
+                    a, b, c, d = matrix.a, matrix.b, matrix.c, matrix.d
+                    upright = 0 < a * d and b * c <= 0
+                    simple = upright and b == 0 and c == 0
+                    size = round(fontsize * d, 4)
+                    font_size = ctypes.c_float(fontsize)
+
+                if simple:
+                    # pdfminer's box: origin to advance width, font descent to descent + size
+                    pdfium_c.FPDFText_GetCharOrigin(raw, index, origin_x, origin_y)
+                    pdfium_c.FPDFFont_GetGlyphWidth(font, ord(text), font_size, advance)
+                    x0 = round(origin_x.value, 4)
+                    x1 = x0 + round(advance.value * a, 4)
+                    y0 = round(origin_y.value, 4) + descent * size
+                    y1 = y0 + size
+                    char_size = size
+                else:
+                    pdfium_c.FPDFText_GetLooseCharBox(raw, index, box)
+                    x0, x1 = round(box.left, 4), round(box.right, 4)
+                    y0, y1 = round(box.bottom, 4), round(box.top, 4)
+                    char_size = y1 - y0 if upright else x1 - x0
+                top = self.height - y1
+                if bbox is not None and not (bbox[0] <= x0 <= bbox[2] and bbox[1] <= top < bbox[3]):
+                    continue
+                chars.append({
+                    'text': text,
+                    'fontname': fontname,
+                    'size': char_size,
+                    'upright': upright,
+                    'x0': x0,
+                    'x1': x1,
+                    'y0': y0,
+                    'y1': y1,
+                    'top': top,
+                    'bottom': self.height - y0,
+                    'doctop': self.doctop + top,
+                    'width': x1 - x0,
+                    'height': y1 - y0,
+                    'page_number': self.page_number,
+                    'object_type': 'char',
+                })
+            return chars
+        finally:
+            textpage.close()
+
+    def _extract_shapes(self, bbox=None):
+        shapes = {'rect': [], 'line': []}
+        page = self._load().raw
+        for index in range(pdfium_c.FPDFPage_CountObjects(page)):
+            self._add_shapes(pdfium_c.FPDFPage_GetObject(page, index), (1, 0, 0, 1, 0, 0), shapes, bbox)
+        return shapes
+
+    def _add_shapes(self, page_object, parent_matrix, shapes, bbox=None):
+        """Rects and lines of a path object, recursing into form XObjects"""
+        object_type = pdfium_c.FPDFPageObj_GetType(page_object)
+        if object_type not in (pdfium_c.FPDF_PAGEOBJ_PATH, pdfium_c.FPDF_PAGEOBJ_FORM):
+            return
+        raw_matrix = pdfium_c.FS_MATRIX()
+        pdfium_c.FPDFPageObj_GetMatrix(page_object, raw_matrix)
+        matrix = _multiply(
+            (raw_matrix.a, raw_matrix.b, raw_matrix.c, raw_matrix.d, raw_matrix.e, raw_matrix.f),
+            parent_matrix
+        )
+        if object_type == pdfium_c.FPDF_PAGEOBJ_FORM:
+            for index in range(pdfium_c.FPDFFormObj_CountObjects(page_object)):
+                self._add_shapes(pdfium_c.FPDFFormObj_GetObject(page_object, index), matrix, shapes, bbox)
+            return
+
+        fill_mode, stroke = ctypes.c_int(), ctypes.c_int()
+        pdfium_c.FPDFPath_GetDrawMode(page_object, fill_mode, stroke)
+        red, green, blue, alpha = ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint()
+        pdfium_c.FPDFPageObj_GetFillColor(page_object, red, green, blue, alpha)
+        non_stroking_color = _color(red, green, blue)
+        pdfium_c.FPDFPageObj_GetStrokeColor(page_object, red, green, blue, alpha)
+        stroking_color = _color(red, green, blue)
+        style = {
+            'fill': fill_mode.value != pdfium_c.FPDF_FILLMODE_NONE,
+            'stroke': bool(stroke.value),
+            'non_stroking_color': non_stroking_color,
+            'stroking_color': stroking_color,
+        }
+
+        for points in self._subpaths(page_object, matrix):
+            kind = self._shape_kind(points)
+            if not kind:
+                continue
+            if bbox is not None:
+                x0 = min(x for x, _ in points)
+                top = self.height - max(y for _, y in points)
+                if not (bbox[0] <= x0 <= bbox[2] and bbox[1] <= top < bbox[3]):
+                    continue
+            shapes[kind].append(self._shape(kind, points, style))
+
+    def _subpaths(self, path, matrix):
+        """Point lists of the straight subpaths of a path, in page coordinates"""
+        a, b, c, d, e, f = matrix
+        x, y = ctypes.c_float(), ctypes.c_float()
+        subpaths = []
+        points = None
+        for index in range(pdfium_c.FPDFPath_CountSegments(path)):
+            segment = pdfium_c.FPDFPath_GetPathSegment(path, index)
+            segment_type = pdfium_c.FPDFPathSegment_GetType(segment)
+            pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+            point = (round(a * x.value + c * y.value + e, 4), round(b * x.value + d * y.value + f, 4))
+            if segment_type == pdfium_c.FPDF_SEGMENT_MOVETO:
+                points = [point]
+                subpaths.append(points)
+            elif segment_type == pdfium_c.FPDF_SEGMENT_LINETO and points is not None:
+                points.append(point)
+            elif points is not None:
+                # Curves are not rects or lines
+                subpaths.remove(points)
+                points = None
+        return subpaths
+
+    @staticmethod
+    def _shape_kind(points):
+        """'line' for two points, 'rect' for an axis-aligned quadrilateral, else None"""
+        if len(points) == 2:
+            return 'line'
+        if len(points) == 5 and points[0] == points[4]:
+            points = points[:4]
+        if len(points) == 4:
+            (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+            if (x0 == x1 and y1 == y2 and x2 == x3 and y3 == y0) or (y0 == y1 and x1 == x2 and y2 == y3 and x3 == x0):
+                return 'rect'
+        return None
+
+    def _shape(self, kind, points, style):
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+        top = self.height - y1
+        shape = {
+            'object_type': kind,
+            'x0': x0,
+            'x1': x1,
+            'y0': y0,
+            'y1': y1,
+            'top': top,
+            'bottom': self.height - y0,
+            'doctop': self.doctop + top,
+            'width': x1 - x0,
+            'height': y1 - y0,
+            'pts': [(x, self.height - y) for x, y in points],
+            'page_number': self.page_number,
+        }
+        shape.update(style)
+        return shape
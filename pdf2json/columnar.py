@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Formato colunar compacto para as linhas das seções.
+
+Em vez de repetir as chaves de HEADER_MAPPING em cada linha de `sections[*].fields`,
+cada seção traz os nomes das colunas uma única vez (`columns`) e as linhas como
+listas de valores (`rows`). O documento é marcado com `"format": "columnar"`.
+"""
+
+from .records import Record
+
+FORMAT_KEY = 'format'
+COLUMNAR = 'columnar'
+ROWS = 'rows'
+FORMATS = (ROWS, COLUMNAR)
+
+
+def is_columnar(document):
+    """Whether a parse result is in columnar format"""
+    return isinstance(document, dict) and document.get(FORMAT_KEY) == COLUMNAR
+
+
+def record_type(fields):
+    """Record class shared by all rows of a section (fresh parser output), else None"""
+    first = type(fields[0]) if fields else None
+    if first is not None and issubclass(first, Record) and all(type(row) is first for row in fields):
+        return first
+    return None
+
+
+def section_columns(fields):
+    """Column names in first-seen order (the parser emits HEADER_MAPPING order)"""
+    kind = record_type(fields)
+    if kind is not None:
+        return list(kind.KEYS)
+    columns = {}
+    for row in fields:
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def to_columnar(document):
+    """Returns a copy of the parse result with section rows as column/row arrays"""
+    if is_columnar(document) or not isinstance(document.get('sections'), list):
+        return document
+
+    sections = []
+    for section in document['sections']:
+        fields = section.get('fields') if isinstance(section, dict) else None
+        if not isinstance(fields, list):
+            sections.append(section)
+            continue
+        columns = section_columns(fields)
+        compact = {key: value for key, value in section.items() if key != 'fields'}
+        compact['columns'] = columns
+        if record_type(fields) is not None:
+            # Record values are already in column order
+            compact['rows'] = [list(row.values()) for row in fields]
+        else:
+            compact['rows'] = [[row.get(column) for column in columns] for row in fields]
+        sections.append(compact)
+
+    result = dict(document)
+    result['sections'] = sections
+    result[FORMAT_KEY] = COLUMNAR
+    return result
+
+
+def to_rows(document):
+    """Returns a copy of a columnar parse result with one object per row"""
+    if not is_columnar(document):
+        return document
+
+    sections = []
+    for section in document.get('sections', []):
+        if not isinstance(section, dict) or 'columns' not in section:
+            sections.append(section)
+            continue
+        columns = section['columns']
+        expanded = {key: value for key, value in section.items() if key not in ('columns', 'rows')}
+        expanded['fields'] = [dict(zip(columns, row)) for row in section.get('rows', [])]
+        sections.append(expanded)
+
+    result = {key: value for key, value in document.items() if key != FORMAT_KEY}
+    result['sections'] = sections
+    return result
+
+
+def convert(document, output_format):
+    """Converts a parse result to 'rows' or 'columnar'"""
+    if output_format == COLUMNAR:
+        return to_columnar(document)
+    if output_format == ROWS:
+        return to_rows(document)
+    raise ValueError(f"Unknown format: {output_format}")
@@ -1,12 +1,39 @@
+import os
 import re
-import pdfplumber
+import threading
+import multiprocessing
+from io import BytesIO
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
 from PyPDF2 import PdfReader
 
+from .backends import DEFAULT_BACKEND, crop_objects, open_pdf
+from .page_cache import page_fingerprints
+from .records import ContainerRow
+
 # Constants for coordinates and configurations
 PAGE1_START_Y = 159.0
 OTHER_PAGES_START_Y = 67.5
 FOOTER_Y_MIN = 515.0
 BLUE_COLOR = "(0.098, 0.098, 0.439)"
+# Distance between a section row and its blue line/rectangle
+BLUE_LINE_TOLERANCE = 5
+
+# Bump when the sections extracted from a page change, so cached pages are re-parsed
+PARSER_VERSION = 4
+
+# Smallest page range worth a worker process (each worker reopens the PDF)
+PARALLEL_MIN_PAGES_PER_WORKER = 10
+
+# Long-lived page range pool shared by all requests (see page_pool)
+_page_pool = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
 
 # Header column mapping
 HEADER_MAPPING = {
@@ -28,8 +55,39 @@ HEADER_MAPPING = {
     'Valor (Unit Value)': {'x0': 788.0, 'x1': 831.0}
 }
 
+# x0 of the first word of each English header label on the reference template that
+# HEADER_MAPPING was tuned on (columns without an English label are left out).
+# Labels need not start at their column x0: calibration measures moves against these
+REFERENCE_LABEL_X = {
+    'Data Inicial (Start Time)': 7.2,
+    'Data Final (End Time)': 47.0,
+    'Container (Equipment ID)': 86.1,
+    'Categoria (Category)': 134.9,
+    'Armador (Line)': 169.4,
+    'Importador/Exportador (Consignee / Shipper)': 250.8,
+    'CNPJ / CPF (ID)': 335.0,
+    'Referência (Reference)': 540.5,
+    'DIAS (Days)': 579.9,
+    'Observacoes (Notes)': 600.0,
+    'Moeda (Currency)': 751.3,
+    'Valor (Unit Value)': 788.0
+}
+
+# Column calibration (opt-in): a column moves with its English header label when the
+# label starts within CALIBRATION_MAX_SHIFT of its reference position (smaller moves are ignored)
+CALIBRATION_MAX_SHIFT = 25.0
+CALIBRATION_TOLERANCE = 1.0
+# Distinct template header rows whose calibrated columns are kept
+LAYOUT_CACHE_SIZE = 256
+
 # Fields that can be multi-line - ALL fields can be multi-line
 MULTI_LINE_FIELDS = list(HEADER_MAPPING.keys())
+MULTI_LINE_COLUMNS = [list(HEADER_MAPPING).index(field_name) for field_name in MULTI_LINE_FIELDS]
+
+# Row values are lists in HEADER_MAPPING order
+START_TIME_COLUMN = list(HEADER_MAPPING).index('Data Inicial (Start Time)')
+CONTAINER_COLUMN = list(HEADER_MAPPING).index('Container (Equipment ID)')
+CNPJ_COLUMN = list(HEADER_MAPPING).index('CNPJ / CPF (ID)')
 
 # Keywords to identify valid sections
 VALID_SECTIONS = ['Armazenagem', 'Cadastro', 'Handling', 'Presenca', 'Repasse', 'Scanner']
@@ -46,11 +104,28 @@ ENGLISH_HEADER_KEYWORDS = [
     'Manifest', 'Consignee', 'Shipper', 'Notes'
 ]
 
-def extract_header_info(stream):
+def keyword_pattern(keywords):
+    """Alternation matching any of the keywords literally"""
+    return '|'.join(re.escape(keyword) for keyword in keywords)
+
+# Classifies a line in one match: each optional lookahead captures whether the line
+# contains a Portuguese/English header keyword (case-sensitive) or a header/summary
+# keyword (case-insensitive), and 'AmountTotal', which is not a header
+LINE_PATTERN = re.compile(
+    rf'(?=.*?(?P<amount_total>(?-i:AmountTotal)))?'
+    rf'(?=.*?(?P<header_pt>(?-i:{keyword_pattern(PORTUGUESE_HEADER_KEYWORDS)})))?'
+    rf'(?=.*?(?P<header_en>(?-i:{keyword_pattern(ENGLISH_HEADER_KEYWORDS)})))?'
+    rf'(?=.*?(?P<header>{keyword_pattern(PORTUGUESE_HEADER_KEYWORDS + ENGLISH_HEADER_KEYWORDS + ["Quantity", "Total"])}))?',
+    re.IGNORECASE | re.ASCII | re.DOTALL
+)
+
+SECTION_PATTERN = re.compile(keyword_pattern(VALID_SECTIONS))
+
+def extract_header_info(stream, backend=DEFAULT_BACKEND):
     """
     Extracts header data from the report (client, cnpj, vessel, berth, draft, gross value, currency).
     """
-    with pdfplumber.open(stream) as pdf:
+    with open_pdf(stream, backend) as pdf:
         first_page = pdf.pages[0]
         text = first_page.extract_text()
 
@@ -97,47 +172,219 @@ def extract_header_info(stream):
     header["Moeda"] = "BRL"
     return {"header": header}
 
-def is_blue_line(y_coord, lines, rects):
-    """Checks if a Y coordinate has a blue line/rectangle"""
-    # Check lines
-    for line in lines:
-        if abs(line['top'] - y_coord) < 5:
-            if 'stroking_color' in line and str(line['stroking_color']) == BLUE_COLOR:
-                return True
-            elif 'non_stroking_color' in line and str(line['non_stroking_color']) == BLUE_COLOR:
-                return True
-    
-    # Check rectangles
-    for rect in rects:
-        if abs(rect['top'] - y_coord) < 5:
-            if 'non_stroking_color' in rect and str(rect['non_stroking_color']) == BLUE_COLOR:
-                return True
-            elif 'stroking_color' in rect and str(rect['stroking_color']) == BLUE_COLOR:
-                return True
+def blue_line_tops(lines, rects):
+    """Top coordinates of the blue lines/rectangles of a page"""
+    tops = []
+    for shape in list(lines) + list(rects):
+        for color_key in ('stroking_color', 'non_stroking_color'):
+            if color_key in shape and str(shape[color_key]) == BLUE_COLOR:
+                tops.append(shape['top'])
+                break
+    return np.array(tops, dtype=float)
+
+def round_tenths(values):
+    """round(value, 1) for an array, exact for ties such as 0.35"""
+    scaled = values * 10
+    rounded = np.round(scaled) / 10
+    # Halfway cases after scaling may round differently than Python's round
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties.tolist():
+        rounded[i] = round(float(values[i]), 1)
+    return rounded
+
+# One text line of a page: chars [start, end) of PageChars, already in x0 order,
+# with the line text and its LINE_PATTERN classification
+CharLine = namedtuple('CharLine', ['y', 'start', 'end', 'text', 'header_pt', 'header_en', 'header'])
+
+def classify_line(text):
+    """(header_pt, header_en, header) flags of a line text"""
+    match = LINE_PATTERN.match(text)
+    return (
+        match['header_pt'] is not None,
+        match['header_en'] is not None,
+        match['header'] is not None and match['amount_total'] is None
+    )
+
+class PageChars:
+    """
+    Characters of a page as NumPy columns, built once per page.
+
+    Lines are the characters sharing round(top, 1); characters are sorted by line
+    and then by x0 (stable, so ties keep page order), so each line is a contiguous
+    slice and a column of a line is a binary search on x0. Each line is
+    materialized once as a CharLine with its text.
+    """
+
+    def __init__(self, chars):
+        count = len(chars)
+        tops = round_tenths(np.fromiter(map(itemgetter('top'), chars), dtype=float, count=count))
+        x0 = np.fromiter(map(itemgetter('x0'), chars), dtype=float, count=count)
+        order = np.lexsort((x0, tops))
+        self._chars = chars
+        self._order = order
+        self.x0 = x0[order]
+        self.text = [chars[i]['text'] for i in order]
+        self.y, starts = np.unique(tops[order], return_index=True)
+        starts = starts.tolist()
+        lines = []
+        for y, start, end in zip(self.y.tolist(), starts, starts[1:] + [count]):
+            text = ''.join(self.text[start:end])
+            lines.append(CharLine(y, start, end, text, *classify_line(text)))
+        self.lines = tuple(lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def first_line_after(self, y_coord):
+        """Index of the first line below y_coord"""
+        return int(np.searchsorted(self.y, y_coord, side='right'))
+
+    def first_line_from(self, y_coord):
+        """Index of the first line at or below y_coord"""
+        return int(np.searchsorted(self.y, y_coord, side='left'))
+
+    def blue_lines(self, first, last, blue_tops):
+        """Indexes of lines in [first, last) within 5pt of a blue line/rectangle"""
+        if first >= last or not len(blue_tops):
+            return []
+        near = np.abs(self.y[first:last, None] - blue_tops[None, :]) < BLUE_LINE_TOLERANCE
+        return (np.flatnonzero(near.any(axis=1)) + first).tolist()
+
+    def line_x0s(self, index):
+        """x0 of each character of a line's text"""
+        line = self.lines[index]
+        xs = self.x0[line.start:line.end].tolist()
+        if len(line.text) != len(xs):
+            # Chars with multi-character text (ligatures) span several positions
+            xs = [x for x, text in zip(xs, self.text[line.start:line.end]) for _ in text]
+        return xs
+
+    def line_fonts(self, index):
+        """Font names of the characters of a line"""
+        line = self.lines[index]
+        return frozenset(self._chars[i].get('fontname') for i in self._order[line.start:line.end].tolist())
+
+    def text_between(self, index, x0, x1):
+        """Text of the characters of a line with x0 <= char x0 <= x1"""
+        return self.texts_between(index, [x0], [x1])[0]
+
+    def texts_between(self, index, lefts, rights):
+        """Text of a line for several X ranges at once"""
+        line = self.lines[index]
+        start, end = line.start, line.end
+        xs = self.x0[start:end]
+        lows = np.searchsorted(xs, lefts, side='left') + start
+        highs = np.searchsorted(xs, rights, side='right') + start
+        return [''.join(self.text[low:high]).strip() for low, high in zip(lows.tolist(), highs.tolist())]
+
+HEADER_X0 = np.array([coords['x0'] for coords in HEADER_MAPPING.values()])
+HEADER_X1 = np.array([coords['x1'] for coords in HEADER_MAPPING.values()])
+
+# Column X ranges of a template, aligned with HEADER_MAPPING
+ColumnLayout = namedtuple('ColumnLayout', ['x0', 'x1'])
+DEFAULT_LAYOUT = ColumnLayout(HEADER_X0, HEADER_X1)
+
+# First word of the English label of each column, e.g. 'Start' for 'Data Inicial (Start Time)'
+COLUMN_LABEL_PATTERNS = [
+    re.compile(rf'\b{re.escape(label.group(1).split()[0])}\b') if label else None
+    for label in (re.search(r'\(([^)]*)\)', field_name) for field_name in HEADER_MAPPING)
+]
+
+# Reference label positions aligned with HEADER_MAPPING (None: no English label)
+REFERENCE_LABELS = tuple(REFERENCE_LABEL_X.get(field_name) for field_name in HEADER_MAPPING)
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def calibrate_columns(fingerprint, reference=REFERENCE_LABELS):
+    """
+    ColumnLayout of a template from its fingerprint (page size, header fonts,
+    English header text and the x0 of each header character). Each column
+    moves as far as its label moved from the reference label position; columns
+    without a label move with the nearest calibrated column on their left (or right)
+    """
+    _, _, text, xs = fingerprint
+    shifts = []
+    for reference_x, pattern in zip(reference, COLUMN_LABEL_PATTERNS):
+        shift = None
+        if pattern is not None and reference_x is not None:
+            moves = [xs[match.start()] - reference_x for match in pattern.finditer(text)]
+            moves = [move for move in moves if abs(move) <= CALIBRATION_MAX_SHIFT]
+            if moves:
+                shift = min(moves, key=abs)
+                if abs(shift) < CALIBRATION_TOLERANCE:
+                    shift = 0.0
+        shifts.append(shift)
     
-    return False
-
-def extract_text_by_coordinates(chars_list, x0, x1):
-    """Extracts text from a character list based on X coordinates"""
-    filtered_chars = [char for char in chars_list if x0 <= char['x0'] <= x1]
-    if filtered_chars:
-        sorted_chars = sorted(filtered_chars, key=lambda c: c['x0'])
-        return ''.join([c['text'] for c in sorted_chars]).strip()
-    return ''
-
-def is_header_line(line_text):
-    """Checks if a line is a header (contains header keywords)"""
-    if 'AmountTotal' in line_text:
-        return False
+    calibrated = [shift for shift in shifts if shift is not None]
+    if not calibrated or not any(calibrated):
+        return DEFAULT_LAYOUT
+    previous = next(shift for shift in shifts if shift is not None)
+    for i, shift in enumerate(shifts):
+        if shift is None:
+            shifts[i] = previous
+        else:
+            previous = shift
     
-    header_keywords = PORTUGUESE_HEADER_KEYWORDS + ENGLISH_HEADER_KEYWORDS + ['Quantity', 'Total']
-    return any(kw.lower() in line_text.lower() for kw in header_keywords)
+    x0 = HEADER_X0 + np.array(shifts)
+    x1 = HEADER_X1 + np.array(shifts)
+    # A column never reaches into the next one
+    x1[:-1] = np.minimum(x1[:-1], np.nextafter(x0[1:], -np.inf))
+    return ColumnLayout(x0, x1)
+
+def column_layout(page_chars, index, page_size=None, reference=REFERENCE_LABELS):
+    """Calibrated ColumnLayout for the English header line at index"""
+    fingerprint = (
+        page_size,
+        page_chars.line_fonts(index),
+        page_chars.lines[index].text,
+        tuple(round(x, 1) for x in page_chars.line_x0s(index))
+    )
+    return calibrate_columns(fingerprint, reference)
+
+def reference_labels(page_chars, index):
+    """
+    Label positions of the English header line at index, aligned with HEADER_MAPPING,
+    to record a new reference template (None where a label is missing)
+    """
+    text = page_chars.lines[index].text
+    xs = page_chars.line_x0s(index)
+    positions = []
+    for pattern in COLUMN_LABEL_PATTERNS:
+        match = pattern.search(text) if pattern is not None else None
+        positions.append(round(xs[match.start()], 1) if match else None)
+    return tuple(positions)
+
+# Layout profile: data region of the statement pages (pdfplumber top-down coordinates).
+# Rows lie below the page header (first_page_top/other_pages_top) and above the
+# footer (bottom); no column starts right of the last one, even when calibrated (right)
+LayoutProfile = namedtuple('LayoutProfile', ['first_page_top', 'other_pages_top', 'bottom', 'right'])
+LAYOUT_PROFILE = LayoutProfile(
+    PAGE1_START_Y, OTHER_PAGES_START_Y, FOOTER_Y_MIN, float(HEADER_X1.max()) + CALIBRATION_MAX_SHIFT
+)
+
+def page_regions(page_num, profile=LAYOUT_PROFILE):
+    """
+    (char_bbox, shape_bbox) of a page: chars that can be in a data row and the
+    lines/rectangles that can mark one of those rows as a section
+    """
+    top = profile.first_page_top if page_num == 0 else profile.other_pages_top
+    char_bbox = (float('-inf'), top, profile.right, profile.bottom)
+    shape_bbox = (float('-inf'), top - BLUE_LINE_TOLERANCE, float('inf'), profile.bottom + BLUE_LINE_TOLERANCE)
+    return char_bbox, shape_bbox
+
+def extract_row(page_chars, index, layout=DEFAULT_LAYOUT):
+    """Values of the HEADER_MAPPING columns of a line, in column order (None when empty)"""
+    values = page_chars.texts_between(index, layout.x0, layout.x1)
+    return [value if value else None for value in values]
+
+def is_header_line(line):
+    """Checks if a CharLine is a header (contains header keywords)"""
+    return line.header
 
 def is_valid_data_row(row):
     """Checks if a data row is valid (has CNPJ, Start Date and Container)"""
-    cnpj = row.get('CNPJ / CPF (ID)', '')
-    data_inicial = row.get('Data Inicial (Start Time)', '')
-    container = row.get('Container (Equipment ID)', '')
+    cnpj = row[CNPJ_COLUMN]
+    data_inicial = row[START_TIME_COLUMN]
+    container = row[CONTAINER_COLUMN]
     
     cnpj = cnpj.strip() if isinstance(cnpj, str) else ''
     data_inicial = data_inicial.strip() if isinstance(data_inicial, str) else ''
@@ -147,166 +394,123 @@ def is_valid_data_row(row):
 
 def is_new_record(next_row):
     """Checks if the next line represents a new record"""
-    has_cnpj = next_row.get('CNPJ / CPF (ID)') and len(next_row.get('CNPJ / CPF (ID)', '')) > 10
-    has_data_inicial = next_row.get('Data Inicial (Start Time)') and '/' in next_row.get('Data Inicial (Start Time)', '')
-    has_container = next_row.get('Container (Equipment ID)') and len(next_row.get('Container (Equipment ID)', '')) > 5
+    has_cnpj = next_row[CNPJ_COLUMN] and len(next_row[CNPJ_COLUMN]) > 10
+    has_data_inicial = next_row[START_TIME_COLUMN] and '/' in next_row[START_TIME_COLUMN]
+    has_container = next_row[CONTAINER_COLUMN] and len(next_row[CONTAINER_COLUMN]) > 5
     
     return has_cnpj and has_data_inicial and has_container
 
-def extract_section_data(page_num, sorted_char_lines, lines, rects):
-    """Extracts data from a specific section"""
+def extract_section_data(page_num, page_chars, blue_tops, profile=LAYOUT_PROFILE, page_size=None, calibrate=False):
+    """Extracts data from a specific section (calibrate: columns follow the English header labels)"""
     sections_data = []
     
+    # Lines between the page header and the footer. Pages are cropped to the profile
+    # by raw top; the bounds apply to the rounded line tops
+    start_y = profile.first_page_top if page_num == 0 else profile.other_pages_top
+    first_line = page_chars.first_line_after(start_y)
+    footer_line = page_chars.first_line_from(profile.bottom)
+    
     # STEP 1: Map all sections (blue lines)
     blue_sections = []
-    for i, (y, line_chars) in enumerate(sorted_char_lines):
-        # Skip lines outside boundaries
-        if page_num == 0 and y <= PAGE1_START_Y:
-            continue
-        elif page_num > 0 and y <= OTHER_PAGES_START_Y:
-            continue
-        if y >= FOOTER_Y_MIN:
-            continue
+    for i in page_chars.blue_lines(first_line, footer_line, blue_tops):
+        title_text = page_chars.text_between(i, 7.2, 400)
+        quantidade_text = page_chars.text_between(i, 540, 700)
+        total_text = page_chars.text_between(i, 700, 820.8)
         
-        if is_blue_line(y, lines, rects):
-            sorted_chars = sorted(line_chars, key=lambda c: c['x0'])
-            title_text = extract_text_by_coordinates(sorted_chars, 7.2, 400)
-            quantidade_text = extract_text_by_coordinates(sorted_chars, 540, 700)
-            total_text = extract_text_by_coordinates(sorted_chars, 700, 820.8)
-            
-            # Extract numeric values
-            total_value = None
-            if total_text:
-                numbers = re.findall(r'[\d\.,]+', total_text)
-                if numbers:
-                    total_value = numbers[0].replace('.', '').replace(',', '.')
-                    try:
-                        total_value = float(total_value)
-                    except:
-                        total_value = None
-            
-            quantidade_value = None
-            if quantidade_text:
-                numbers = re.findall(r'\d+', quantidade_text)
-                if numbers:
-                    quantidade_value = int(numbers[0])
-            
-            # Check if it's a valid section
-            if title_text and any(section in title_text for section in VALID_SECTIONS):
-                blue_sections.append({
-                    'y': y,
-                    'index': i,
-                    'title': title_text,
-                    'quantidade': quantidade_value,
-                    'total': total_value
-                })
+        # Extract numeric values
+        total_value = None
+        if total_text:
+            numbers = re.findall(r'[\d\.,]+', total_text)
+            if numbers:
+                total_value = numbers[0].replace('.', '').replace(',', '.')
+                try:
+                    total_value = float(total_value)
+                except:
+                    total_value = None
+        
+        quantidade_value = None
+        if quantidade_text:
+            numbers = re.findall(r'\d+', quantidade_text)
+            if numbers:
+                quantidade_value = int(numbers[0])
+        
+        # Check if it's a valid section
+        if title_text and SECTION_PATTERN.search(title_text):
+            blue_sections.append({
+                'y': page_chars.lines[i].y,
+                'index': i,
+                'title': title_text,
+                'quantidade': quantidade_value,
+                'total': total_value
+            })
     
     # STEP 2: Process each section individually
     for section_idx, section_info in enumerate(blue_sections):
-        section_y = section_info['y']
         section_index = section_info['index']
-        next_section_y = blue_sections[section_idx + 1]['y'] if section_idx + 1 < len(blue_sections) else None
+        # Section lines end at the next section or the footer
+        if section_idx + 1 < len(blue_sections):
+            end_line = min(blue_sections[section_idx + 1]['index'], footer_line)
+        else:
+            end_line = footer_line
         
         # Find headers and data start
         header_pt_found = False
         header_en_found = False
         data_start_index = None
         
-        for j in range(section_index + 1, len(sorted_char_lines)):
-            y, chars_line = sorted_char_lines[j]
-            
-            # Check boundaries
-            if next_section_y and y >= next_section_y:
-                break
-            if page_num == 0 and y <= PAGE1_START_Y:
-                continue
-            elif page_num > 0 and y <= OTHER_PAGES_START_Y:
-                continue
-            if y >= FOOTER_Y_MIN:
-                break
-            
-            line_text = ''.join([c['text'] for c in sorted(chars_line, key=lambda c: c['x0'])])
+        for j in range(section_index + 1, end_line):
+            line = page_chars.lines[j]
             
             # Find Portuguese header
-            if not header_pt_found and any(keyword in line_text for keyword in PORTUGUESE_HEADER_KEYWORDS):
+            if not header_pt_found and line.header_pt:
                 header_pt_found = True
                 continue
             
-            # Find English header
-            if header_pt_found and not header_en_found and any(keyword in line_text for keyword in ENGLISH_HEADER_KEYWORDS):
+            # Find English header; with calibration, its label positions give the columns of the section
+            if header_pt_found and not header_en_found and line.header_en:
                 header_en_found = True
                 data_start_index = j + 1
+                layout = column_layout(page_chars, j, page_size) if calibrate else DEFAULT_LAYOUT
                 break
         
         # Process section data
         section_fields = []
         if data_start_index:
             k = data_start_index
-            while k < len(sorted_char_lines):
-                content_y, content_chars = sorted_char_lines[k]
-                
-                # Check boundaries
-                if next_section_y and content_y >= next_section_y:
-                    break
-                if page_num == 0 and content_y <= PAGE1_START_Y:
-                    k += 1
-                    continue
-                elif page_num > 0 and content_y <= OTHER_PAGES_START_Y:
-                    k += 1
-                    continue
-                if content_y >= FOOTER_Y_MIN:
-                    break
-                
-                content_text = ''.join([c['text'] for c in sorted(content_chars, key=lambda c: c['x0'])])
-                if is_header_line(content_text):
+            while k < end_line:
+                if is_header_line(page_chars.lines[k]):
                     k += 1
                     continue
                 
                 # Extract row data
-                row = {}
-                for field_name, coords in HEADER_MAPPING.items():
-                    field_value = extract_text_by_coordinates(content_chars, coords['x0'], coords['x1'])
-                    row[field_name] = field_value if field_value else None
+                row = extract_row(page_chars, k, layout)
                 
                 if is_valid_data_row(row):
                     # Concatenate continuation lines
                     k_next = k + 1
-                    while k_next < len(sorted_char_lines):
-                        next_y, next_chars = sorted_char_lines[k_next]
-                        
-                        # Check boundaries
-                        if next_section_y and next_y >= next_section_y:
-                            break
-                        if next_y >= FOOTER_Y_MIN:
-                            break
-                        
-                        next_text = ''.join([c['text'] for c in sorted(next_chars, key=lambda c: c['x0'])])
-                        if is_header_line(next_text):
+                    while k_next < end_line:
+                        if is_header_line(page_chars.lines[k_next]):
                             break
                         
                         # Check if it's a new record
-                        next_row = {}
-                        for field_name, coords in HEADER_MAPPING.items():
-                            field_value = extract_text_by_coordinates(next_chars, coords['x0'], coords['x1'])
-                            next_row[field_name] = field_value if field_value else None
-                        
+                        next_row = extract_row(page_chars, k_next, layout)
                         if is_new_record(next_row):
                             break
                         
                         # Concatenate multi-line fields
-                        for field_name in MULTI_LINE_FIELDS:
-                            field_value_next = extract_text_by_coordinates(next_chars, HEADER_MAPPING[field_name]['x0'], HEADER_MAPPING[field_name]['x1'])
+                        for column in MULTI_LINE_COLUMNS:
+                            field_value_next = next_row[column]
                             if field_value_next:
-                                if row[field_name]:
-                                    row[field_name] += ' ' + field_value_next
+                                if row[column]:
+                                    row[column] += ' ' + field_value_next
                                 else:
-                                    row[field_name] = field_value_next
+                                    row[column] = field_value_next
                         
                         k_next += 1
                     
                     # Process final row
-                    processed_row = {field_name: (value.strip() if isinstance(value, str) and value.strip() else None)
-                                   for field_name, value in row.items()}
+                    processed_row = ContainerRow(*[(value.strip() if isinstance(value, str) and value.strip() else None)
+                                                   for value in row])
                     section_fields.append(processed_row)
                     k = k_next
                 else:
@@ -324,44 +528,130 @@ def extract_section_data(page_num, sorted_char_lines, lines, rects):
     
     return sections_data
 
-def extract_data_with_header_mapping(stream):
+def extract_page(page_num, page, profile=LAYOUT_PROFILE, calibrate=False):
+    """Extracts the sections of the page at index page_num"""
+    # Only objects of the data region: letterhead and footer are never grouped
+    chars, lines, rects = crop_objects(page, *page_regions(page_num, profile))
+    # Convert the page characters once; lines and columns are array lookups
+    page_chars = PageChars(chars)
+    blue_tops = blue_line_tops(lines, rects)
+    return extract_section_data(page_num, page_chars, blue_tops, profile, (page.width, page.height), calibrate)
+
+def extract_pages(pages, first_page_num=0, profile=LAYOUT_PROFILE, calibrate=False):
+    """Extracts the sections of consecutive pages starting at page index first_page_num"""
+    sections_data = []
+    for page_num, page in enumerate(pages, start=first_page_num):
+        sections_data.extend(extract_page(page_num, page, profile, calibrate))
+    return sections_data
+
+def extract_page_list(source, page_nums, backend=DEFAULT_BACKEND, calibrate=False):
+    """Process pool worker: opens the PDF and extracts the sections of each page in page_nums"""
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    with open_pdf(source, backend) as pdf:
+        return [extract_page(page_num, pdf.pages[page_num], calibrate=calibrate) for page_num in page_nums]
+
+def page_ranges(page_count, workers):
+    """Splits page indexes into at most workers contiguous [first, last) ranges"""
+    workers = max(1, min(workers, page_count // PARALLEL_MIN_PAGES_PER_WORKER))
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def page_pool(workers):
+    """Process pool for page ranges, created on first use and grown when more workers are requested"""
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers < workers:
+            if _page_pool is not None:
+                # Work already submitted to the old pool still completes
+                _page_pool.shutdown(wait=False)
+            # spawn: the web server runs threads, which forked workers must not inherit
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _page_pool_workers = workers
+        return _page_pool
+
+def discard_page_pool(executor):
+    """Drops a broken pool (a worker died) so the next document starts a new one"""
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is executor:
+            _page_pool, _page_pool_workers = None, 0
+    executor.shutdown(wait=False)
+
+def pdf_source(stream):
+    """Path (or bytes) that a worker process can open the PDF from"""
+    if isinstance(stream, (str, os.PathLike)):
+        return os.fspath(stream)
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    stream.seek(0)
+    return stream.read()
+
+def page_cache_keys(page_cache, stream, backend, profile=LAYOUT_PROFILE, calibrate=False):
+    """Page cache keys of a document (the first page has its own data region)"""
+    fingerprints = page_fingerprints(stream)
+    options = ('document_001', PARSER_VERSION, backend, tuple(profile))
+    if calibrate:
+        options += ('calibrated', REFERENCE_LABELS)
+    return (page_cache.keys(fingerprints[:1], *options, 'first')
+            + page_cache.keys(fingerprints[1:], *options, 'other'))
+
+def cached_sections(sections):
+    """Sections of a page cache entry, with the rows back as ContainerRow records"""
+    if sections is not None:
+        for section in sections:
+            section['fields'] = [ContainerRow.from_mapping(row) for row in section['fields']]
+    return sections
+
+def extract_data_with_header_mapping(stream, workers=1, backend=DEFAULT_BACKEND, page_cache=None, calibrate=False):
     """
     Extracts data using the specific X coordinate mapping of header columns.
     Groups content lines until the next blue line and returns in organized format.
+    With workers > 1, page ranges of large documents are parsed in a process pool.
+    With a page cache, only pages not parsed before are extracted.
+    With calibrate, columns follow the English header labels of each section.
     """
-    sections_data = []
+    keys = page_cache_keys(page_cache, stream, backend, calibrate=calibrate) if page_cache is not None else None
+    page_sections = [cached_sections(sections) for sections in page_cache.get_many(keys)] if keys else None
     
-    with pdfplumber.open(stream) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            lines = page.lines
-            rects = page.rects
-            chars = page.chars
-            
-            # Group characters by line
-            char_lines = {}
-            for char in chars:
-                y_key = round(char['top'], 1)
-                if y_key not in char_lines:
-                    char_lines[y_key] = []
-                char_lines[y_key].append(char)
-            
-            sorted_char_lines = sorted(char_lines.items(), key=lambda x: x[0])
-            
-            # Extract page data
-            page_sections = extract_section_data(page_num, sorted_char_lines, lines, rects)
-            sections_data.extend(page_sections)
+    with open_pdf(stream, backend) as pdf:
+        if page_sections is None or len(page_sections) != len(pdf.pages):
+            keys = None
+            page_sections = [None] * len(pdf.pages)
+        missing = [page_num for page_num, sections in enumerate(page_sections) if sections is None]
+        ranges = page_ranges(len(missing), workers)
+        if len(ranges) < 2:
+            for page_num in missing:
+                page_sections[page_num] = extract_page(page_num, pdf.pages[page_num], calibrate=calibrate)
     
-    return sections_data
+    if len(ranges) >= 2:
+        # Sections never span pages, so placing each page's sections by index gives the serial result
+        source = pdf_source(stream)
+        executor = page_pool(workers)
+        chunks = [missing[first:last] for first, last in ranges]
+        try:
+            futures = [executor.submit(extract_page_list, source, page_nums, backend, calibrate) for page_nums in chunks]
+            for page_nums, future in zip(chunks, futures):
+                for page_num, sections in zip(page_nums, future.result()):
+                    page_sections[page_num] = sections
+        except BrokenProcessPool:
+            discard_page_pool(executor)
+            raise
+    
+    if keys and missing:
+        page_cache.set_many([(keys[page_num], page_sections[page_num]) for page_num in missing])
+    return [section for sections in page_sections for section in sections]
 
-def read_pdf_and_analyze(stream):
+def read_pdf_and_analyze(stream, workers=1, backend=DEFAULT_BACKEND, page_cache=None, calibrate=False):
     """
     Main function that analyzes the PDF and returns the structure in the requested format
     """
     try:
         # Extract header
-        header_info = extract_header_info(stream)
+        header_info = extract_header_info(stream, backend)
         # Extract data using header mapping
-        sections_with_data = extract_data_with_header_mapping(stream)
+        sections_with_data = extract_data_with_header_mapping(stream, workers, backend, page_cache, calibrate)
         return {
             "header": header_info["header"],
             "sections": sections_with_data
@@ -6,10 +6,18 @@ Parser Baseado em Linhas Fixas - Extrai campos diretamente pelas linhas do PDF
 
 import re
 from datetime import datetime
-import pdfplumber
+
+from .backends import DEFAULT_BACKEND, open_pdf
+from .page_cache import page_fingerprints
+from .records import ArmazenagemItem, OperacaoItem, Record
+
+# Versão do parser: incrementar quando as linhas extraídas de uma página mudarem
+PARSER_VERSION = 2
 
 class PDFLineParser:
-    def __init__(self):
+    def __init__(self, backend=DEFAULT_BACKEND, page_cache=None):
+        self.backend = backend
+        self.page_cache = page_cache
         self.field_mapping = {
             2: {
                 'header.capa': {'start': 'CAPA:', 'end': 'DEMONSTRATIVO:'},
@@ -67,13 +75,26 @@ class PDFLineParser:
         }
 
     def extract_text_by_lines(self, pdf_path):
-        """Extrai texto do PDF linha a linha"""
+        """Extrai texto do PDF linha a linha (páginas já vistas vêm do cache de páginas)"""
         lines = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    lines.extend([line.strip() for line in text.split('\n') if line.strip()])
+        keys = cached_pages = None
+        if self.page_cache is not None:
+            keys = self.page_cache.keys(page_fingerprints(pdf_path), 'document_002', PARSER_VERSION, self.backend)
+            cached_pages = self.page_cache.get_many(keys)
+        parsed_pages = []
+        with open_pdf(pdf_path, self.backend) as pdf:
+            if cached_pages is not None and len(cached_pages) != len(pdf.pages):
+                keys = cached_pages = None
+            for page_num, page in enumerate(pdf.pages):
+                page_lines = cached_pages[page_num] if cached_pages is not None else None
+                if page_lines is None:
+                    text = page.extract_text()
+                    page_lines = [line.strip() for line in text.split('\n') if line.strip()] if text else []
+                    if keys is not None:
+                        parsed_pages.append((keys[page_num], page_lines))
+                lines.extend(page_lines)
+        if parsed_pages:
+            self.page_cache.set_many(parsed_pages)
         return lines
 
     def extract_field_value(self, line_text, field_config):
@@ -349,17 +370,17 @@ class PDFLineParser:
         return result
 
     def _normalize_fields(self, result):
-        """Normaliza campos específicos"""
+        """Normaliza campos específicos (itens em registro já são criados normalizados)"""
         # Normaliza descrições de operações
         if 'operacao_servicos' in result and 'fields' in result['operacao_servicos']:
             for field in result['operacao_servicos']['fields']:
-                if 'descricao' in field:
+                if not isinstance(field, Record) and 'descricao' in field:
                     field['descricao'] = self.normalize_string(field['descricao'])
         
         # Normaliza porcentagens de armazenagem
         if 'armazenagem' in result and 'fields' in result['armazenagem']:
             for field in result['armazenagem']['fields']:
-                if '%_armaz' in field:
+                if not isinstance(field, Record) and '%_armaz' in field:
                     field['%_armaz'] = self.normalize_number(field['%_armaz'])
 
     def _round_totals(self, result):
@@ -419,17 +440,18 @@ class PDFLineParser:
                     try:
                         valor = float(parts[7].replace(',', '.'))
                     except:
-                        valor = parts[7]
-                    armazenagem_item = {
-                        'inicio': parts[0],
-                        'final': parts[1],
-                        'periodo': parts[2],
-                        'qtde_pecas': parts[3],
-                        'carregado': parts[4],
-                        'saldo': parts[5],
-                        '%_armaz': parts[6],
-                        'total_armaz_rs': valor
-                    }
+                        valor = self.clean_prefix(parts[7])
+                    clean = self.clean_prefix
+                    armazenagem_item = ArmazenagemItem(
+                        inicio=clean(parts[0]),
+                        final=clean(parts[1]),
+                        periodo=clean(parts[2]),
+                        qtde_pecas=clean(parts[3]),
+                        carregado=clean(parts[4]),
+                        saldo=clean(parts[5]),
+                        armaz_pct=self.normalize_number(clean(parts[6])),
+                        total_armaz_rs=valor
+                    )
                     result['armazenagem']['fields'].append(armazenagem_item)
             current_line += 1
         result['armazenagem']['total_armazenagem_periodos'] = total_armazenagem
@@ -456,29 +478,34 @@ class PDFLineParser:
                     qtd = match.group(2)
                     rs_unitario = float(match.group(3).replace(',', '.'))
                     total_oper_rs = float(match.group(4).replace(',', '.'))
-                    operacao_item = {
-                        'descricao': descricao,
-                        'qtd': qtd,
-                        'rs_unitario': rs_unitario,
-                        'total_oper_rs': total_oper_rs
-                    }
+                    operacao_item = OperacaoItem(
+                        descricao=self.normalize_string(self.clean_prefix(descricao)),
+                        qtd=self.clean_prefix(qtd),
+                        rs_unitario=rs_unitario,
+                        total_oper_rs=total_oper_rs
+                    )
                     result['operacao_servicos']['fields'].append(operacao_item)
             current_line += 1
-        result['operacao_servicos']['total_operacao_servicos'] = sum([f['total_oper_rs'] for f in result['operacao_servicos']['fields']])
+        result['operacao_servicos']['total_operacao_servicos'] = sum([f.total_oper_rs for f in result['operacao_servicos']['fields']])
         if total_geral is not None:
             result['operacao_servicos']['total_geral'] = total_geral
         else:
             result['operacao_servicos']['total_geral'] = result.get('armazenagem', {}).get('total_armazenagem_periodos', 0) + result['operacao_servicos']['total_operacao_servicos']
 
+    def clean_prefix(self, value):
+        """Remove prefixo ':' ou sufixo ' IM:' de um valor"""
+        if value.startswith(':'):
+            return value[1:]
+        if value.endswith(' IM:'):
+            return value[:-4]
+        return value
+
     def clean_prefixes(self, data):
-        """Remove prefixos indesejados dos campos"""
+        """Remove prefixos indesejados dos campos (registros já são criados limpos)"""
         if isinstance(data, dict):
             for key, value in data.items():
                 if isinstance(value, str):
-                    if value.startswith(':'):
-                        data[key] = value[1:]
-                    elif value.endswith(' IM:'):
-                        data[key] = value[:-4]
+                    data[key] = self.clean_prefix(value)
                 elif isinstance(value, (dict, list)):
                     self.clean_prefixes(value)
         elif isinstance(data, list):
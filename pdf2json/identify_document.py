@@ -1,55 +1,73 @@
-import pdfplumber
+from .backends import DEFAULT_BACKEND, open_pdf
 from .document_001 import read_pdf_and_analyze
 from .document_002 import PDFLineParser
 
-def extract_document_title(pdf_path):
+# Document types: coordinate parser (document_001) and line parser (document_002)
+COORDINATE_DOCUMENT = "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS"
+LINE_DOCUMENT = "DEMONSTRATIVO DE CÁLCULO"
+SUPPORTED_TYPES = [COORDINATE_DOCUMENT, LINE_DOCUMENT]
+
+def read_document_title(pdf_path, backend=DEFAULT_BACKEND):
+    """First non-empty line of the first page (None when there is no text); errors propagate"""
+    with open_pdf(pdf_path, backend) as pdf:
+        if len(pdf.pages) > 0:
+            first_page = pdf.pages[0]
+            text = first_page.extract_text()
+            if text:
+                # Split text into lines and get the first non-empty line
+                lines = [line.strip() for line in text.split('\n') if line.strip()]
+                if lines:
+                    first_line = lines[0]
+                    if COORDINATE_DOCUMENT in first_line:
+                        return COORDINATE_DOCUMENT
+                    return first_line
+    return None
+
+def extract_document_title(pdf_path, backend=DEFAULT_BACKEND):
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if len(pdf.pages) > 0:
-                first_page = pdf.pages[0]
-                text = first_page.extract_text()
-                if text:
-                    # Split text into lines and get the first non-empty line
-                    lines = [line.strip() for line in text.split('\n') if line.strip()]
-                    if lines:
-                        first_line = lines[0]
-                        key = 'DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS'
-                        if key in first_line:
-                            return key
-                        return first_line
-        return None
+        return read_document_title(pdf_path, backend)
     except Exception as e:
         print(f"Error extracting document title: {e}")
         return None
 
-def analyze_document_by_type(pdf_path):
+def document_type_for_title(title):
+    """Supported document type of a title, or None"""
+    if title == COORDINATE_DOCUMENT:
+        return COORDINATE_DOCUMENT
+    if LINE_DOCUMENT in title:
+        return LINE_DOCUMENT
+    return None
+
+def analyze_document_by_type(pdf_path, workers=1, coordinate_backend=DEFAULT_BACKEND, line_backend=DEFAULT_BACKEND,
+                             page_cache=None, calibrate=False):
     """
     Identifies document type and calls appropriate parser
+    (workers > 1 parses large coordinate documents in page ranges across processes;
+    the title is read with the coordinate parser backend; page_cache skips pages parsed before;
+    calibrate moves coordinate parser columns with the English header labels)
     """
     try:
-        title = extract_document_title(pdf_path)
+        title = extract_document_title(pdf_path, coordinate_backend)
         
         if title is None:
             return {
                 "error": "Could not extract document title",
-                "supported_types": [
-                    "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS",
-                    "DEMONSTRATIVO DE CÁLCULO"
-                ]
+                "supported_types": SUPPORTED_TYPES
             }
         
-        if title == "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS":
+        document_type = document_type_for_title(title)
+        if document_type == COORDINATE_DOCUMENT:
             # Use document_001.py (coordinate parser)
             with open(pdf_path, 'rb') as pdf_file:
-                result = read_pdf_and_analyze(pdf_file)
-            result["document_type"] = "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS"
+                result = read_pdf_and_analyze(pdf_file, workers, coordinate_backend, page_cache, calibrate)
+            result["document_type"] = COORDINATE_DOCUMENT
             return result
         
-        elif "DEMONSTRATIVO DE CÁLCULO" in title:
+        elif document_type == LINE_DOCUMENT:
             # Use document_002.py (line parser)
-            parser = PDFLineParser()
+            parser = PDFLineParser(line_backend, page_cache)
             result = parser.parse_pdf(pdf_path)
-            result["document_type"] = "DEMONSTRATIVO DE CÁLCULO"
+            result["document_type"] = LINE_DOCUMENT
             return result
         
         else:
@@ -57,17 +75,11 @@ def analyze_document_by_type(pdf_path):
             return {
                 "error": "Document type not recognized",
                 "document_title": title,
-                "supported_types": [
-                    "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS",
-                    "DEMONSTRATIVO DE CÁLCULO"
-                ]
+                "supported_types": SUPPORTED_TYPES
             }
     except Exception as e:
         return {
             "error": "Could not extract document title",
             "exception": str(e),
-            "supported_types": [
-                "DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS",
-                "DEMONSTRATIVO DE CÁLCULO"
-            ]
+            "supported_types": SUPPORTED_TYPES
         } 
\ No newline at end of file
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Cache por página dos parsers.
+
+Demonstrativos reemitidos costumam mudar apenas uma ou duas páginas, então o hash
+do arquivo inteiro não se repete. Cada página recebe uma impressão digital (SHA-256
+dos content streams, dos recursos usados — fontes, XObjects — e da MediaBox/rotação),
+e o resultado do parser para a página (seções ou linhas) é guardado com a chave
+impressão digital + parser + versão do parser + opções. Um demonstrativo revisado
+só processa as páginas alteradas.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+from .serialization import dumps, loads
+
+try:
+    import redis
+except ImportError:  # Optional dependency, only needed for the shared cache
+    redis = None
+
+
+def _digest_object(obj, reader_cache):
+    """SHA-256 of a PDF object; indirect objects are digested once per document"""
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in reader_cache:
+            reader_cache[key] = None  # Cycles (e.g. /Parent) digest as the reference
+            reader_cache[key] = _digest_object(obj.get_object(), reader_cache)
+        return reader_cache[key] or f"ref {key}".encode('ascii')
+
+    digest = hashlib.sha256()
+    if isinstance(obj, DictionaryObject):
+        for name in sorted(obj):
+            if name in ('/Parent', '/Length'):
+                continue
+            digest.update(name.encode('utf-8'))
+            digest.update(_digest_object(obj.raw_get(name), reader_cache))
+        if isinstance(obj, StreamObject):
+            digest.update(obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(_digest_object(item, reader_cache))
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+    return digest.digest()
+
+
+# Page attributes taken from the /Pages tree when the page doesn't set them
+INHERITABLE_ATTRIBUTES = ('/Resources', '/MediaBox', '/Rotate')
+
+# Deepest /Pages tree walked for inherited attributes (guards against /Parent cycles)
+MAX_PAGE_TREE_DEPTH = 64
+
+
+def _page_attribute(page, name):
+    """Raw page attribute, inherited from /Parent nodes for /Resources, /MediaBox and /Rotate"""
+    node = page
+    for _ in range(MAX_PAGE_TREE_DEPTH):
+        if name in node:
+            return node.raw_get(name)
+        if name not in INHERITABLE_ATTRIBUTES or '/Parent' not in node:
+            return None
+        node = node['/Parent'].get_object()
+    return None
+
+
+def page_fingerprints(source):
+    """Hex fingerprint of each page of a PDF (path, bytes or binary file)"""
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    position = source.tell() if hasattr(source, 'tell') else None
+    try:
+        reader = PdfReader(source)
+        reader_cache = {}
+        fingerprints = []
+        for page in reader.pages:
+            digest = hashlib.sha256()
+            for name in ('/Contents',) + INHERITABLE_ATTRIBUTES:
+                value = _page_attribute(page, name)
+                if value is not None:
+                    digest.update(name.encode('ascii'))
+                    digest.update(_digest_object(value, reader_cache))
+            fingerprints.append(digest.hexdigest())
+        return fingerprints
+    finally:
+        if position is not None:
+            source.seek(position)
+
+
+class PageCache:
+    """
+    Parsed pages by fingerprint: a bounded in-process LRU in front of an optional
+    shared cache such as Redis. Page results never change for a given key, so
+    entries are not invalidated; bump the parser version when its output changes.
+    """
+
+    KEY_PREFIX = 'pdftojson:page:'
+
+    def __init__(self, max_entries=4096, shared_client=None, shared_ttl=604800):
+        self.max_entries = max_entries
+        self.shared_client = shared_client
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def keys(self, fingerprints, parser, version, *options):
+        """Cache keys of pages for a parser, its version and the options affecting its output"""
+        variant = hashlib.sha256(repr(options).encode('utf-8')).hexdigest()[:16]
+        return [f"{self.KEY_PREFIX}{parser}:{version}:{variant}:{fingerprint}" for fingerprint in fingerprints]
+
+    def get_many(self, keys):
+        """Parsed page (or None) for each key"""
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = value
+
+        if missing and self.shared_client is not None:
+            try:
+                values = self.shared_client.mget([keys[i] for i in missing])
+            except Exception as e:
+                logging.error(f"Shared page cache read error: {e}")
+                values = [None] * len(missing)
+            for i, value in zip(missing, values):
+                if value is not None:
+                    results[i] = value
+                    self._store_local(keys[i], value)
+
+        return [loads(value) if value is not None else None for value in results]
+
+    def set_many(self, items):
+        """Cache (key, parsed page) pairs"""
+        serialized = [(key, dumps(value)) for key, value in items]
+        for key, value in serialized:
+            self._store_local(key, value)
+
+        if serialized and self.shared_client is not None:
+            try:
+                pipeline = self.shared_client.pipeline(transaction=False)
+                for key, value in serialized:
+                    pipeline.set(key, value, ex=self.shared_ttl)
+                pipeline.execute()
+            except Exception as e:
+                logging.error(f"Shared page cache write error: {e}")
+
+    def _store_local(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all local entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+def create_page_cache(max_entries=4096, redis_url=None):
+    """Build page cache (None when disabled), connecting to Redis when a URL is configured"""
+    if max_entries <= 0 and not redis_url:
+        return None
+    shared_client = None
+    if redis_url:
+        if redis is None:
+            logging.warning("redis not installed, using in-process page cache only")
+        else:
+            shared_client = redis.Redis.from_url(redis_url)
+    return PageCache(max_entries=max_entries, shared_client=shared_client)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Registros tipados das linhas produzidas pelos parsers.
+
+As linhas de container (`sections[*].fields` do parser por coordenadas) e os itens
+de `armazenagem`/`operacao_servicos` (parser por linhas) são dataclasses com
+`__slots__`, sem um dict por linha. Internamente os campos são atributos; na borda
+cada registro se comporta como um mapeamento somente leitura com as chaves JSON
+publicadas (`'Data Inicial (Start Time)'`, `'%_armaz'`...), e os serializadores
+(`serialization.dumps`, tabelas Arrow, formato colunar) leem os valores direto dos
+slots, na ordem de `KEYS`.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Optional, Union
+
+
+class Record(Mapping):
+    """Slotted row record, read as a mapping of its JSON keys (KEYS, in field order)"""
+
+    __slots__ = ()
+    KEYS = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._ATTRIBUTES[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __contains__(self, key):
+        return key in self._ATTRIBUTES
+
+    def values(self):
+        """Field values in KEYS order"""
+        return self._values(self)
+
+    def to_dict(self):
+        """Plain dict with the JSON keys"""
+        return dict(zip(self.KEYS, self._values(self)))
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Record from a dict with the JSON keys (e.g. a stored or cached row)"""
+        return cls(*(mapping.get(key) for key in cls.KEYS))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def record(cls):
+    """Class decorator: slotted dataclass record whose fields map to cls.KEYS"""
+    cls = dataclass(slots=True, eq=False)(cls)
+    names = tuple(field.name for field in fields(cls))
+    if len(names) != len(cls.KEYS):
+        raise TypeError(f"{cls.__name__}: {len(names)} fields for {len(cls.KEYS)} keys")
+    cls._ATTRIBUTES = dict(zip(cls.KEYS, names))
+    getter = attrgetter(*names)
+    cls._values = staticmethod(getter)
+    return cls
+
+
+@record
+class ContainerRow(Record):
+    """Container line of a coordinate parser section (HEADER_MAPPING columns)"""
+
+    KEYS = (
+        'Data Inicial (Start Time)', 'Data Final (End Time)', 'Container (Equipment ID)', 'Categoria (Category)',
+        'Armador (Line)', 'Manifesto Carga BL / Booking', 'Importador/Exportador (Consignee / Shipper)',
+        'CNPJ / CPF (ID)', 'DT / DTA', 'GMCI / GRCI', 'Doc', 'Referência (Reference)', 'DIAS (Days)',
+        'Observacoes (Notes)', 'Moeda (Currency)', 'Valor (Unit Value)'
+    )
+
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    equipment_id: Optional[str] = None
+    category: Optional[str] = None
+    line: Optional[str] = None
+    booking: Optional[str] = None
+    consignee_shipper: Optional[str] = None
+    tax_id: Optional[str] = None
+    dt_dta: Optional[str] = None
+    gmci_grci: Optional[str] = None
+    doc: Optional[str] = None
+    reference: Optional[str] = None
+    days: Optional[str] = None
+    notes: Optional[str] = None
+    currency: Optional[str] = None
+    unit_value: Optional[str] = None
+
+
+@record
+class ArmazenagemItem(Record):
+    """Período da tabela de armazenagem"""
+
+    KEYS = ('inicio', 'final', 'periodo', 'qtde_pecas', 'carregado', 'saldo', '%_armaz', 'total_armaz_rs')
+
+    inicio: str
+    final: str
+    periodo: str
+    qtde_pecas: str
+    carregado: str
+    saldo: str
+    armaz_pct: str
+    total_armaz_rs: Union[float, str]
+
+
+@record
+class OperacaoItem(Record):
+    """Item da tabela de operações/serviços"""
+
+    KEYS = ('descricao', 'qtd', 'rs_unitario', 'total_oper_rs')
+
+    descricao: str
+    qtd: str
+    rs_unitario: float
+    total_oper_rs: float
+
+
+def record_dict(obj):
+    """`default` hook of the JSON/MessagePack encoders: records as dicts"""
+    if isinstance(obj, Record):
+        return dict(zip(obj.KEYS, obj._values(obj)))
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
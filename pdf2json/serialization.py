@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Serialização do resultado dos parsers.
+
+O resultado é serializado uma vez em bytes JSON UTF-8; os mesmos bytes são usados
+no bind do CLOB e na resposta HTTP, com os metadados do banco inseridos ao final.
+Representações binárias opcionais: MessagePack e Arrow/Parquet (ver `tables`).
+"""
+
+import io
+import json
+
+from .records import record_dict
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, falls back to the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, only needed for MessagePack output
+    msgpack = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for Arrow/Parquet output
+    pa = pq = None
+
+JSON_MIMETYPE = 'application/json'
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def dumps(obj):
+    """Serializes obj to compact UTF-8 JSON bytes (non-ASCII characters kept; row records as objects)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=record_dict, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; use the standard encoder
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=record_dict).encode('utf-8')
+
+
+def loads(data):
+    """Parses JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def splice_fields(body, fields):
+    """
+    Appends fields to a serialized JSON object without re-encoding it.
+    Keys in fields must not already exist in body.
+    """
+    if not fields:
+        return body
+    extra = dumps(fields)
+    body = body.rstrip()
+    if body == b'{}':
+        return extra
+    return body[:-1] + b',' + extra[1:]
+
+
+def msgpack_dumps(obj):
+    """Serializes obj to MessagePack bytes"""
+    if msgpack is None:
+        raise RuntimeError("msgpack is required for MessagePack output")
+    return msgpack.packb(obj, use_bin_type=True, default=record_dict)
+
+
+def arrow_stream(batch):
+    """Serializes an Arrow record batch to the Arrow IPC stream format"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow output")
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def parquet_bytes(batch):
+    """Serializes an Arrow record batch to a Parquet file"""
+    if pq is None:
+        raise RuntimeError("pyarrow is required for Parquet output")
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_batches([batch]), buffer)
+    return buffer.getvalue()
+
+
+def binary_formats_available():
+    """MIME types whose optional encoders are installed"""
+    available = []
+    if pa is not None:
+        available.extend([ARROW_STREAM_MIMETYPE, PARQUET_MIMETYPE])
+    if msgpack is not None:
+        available.append(MSGPACK_MIMETYPE)
+    return available
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Achatamento dos resultados dos parsers em tabelas tipadas.
+
+Cada tipo de documento expõe uma ou mais tabelas (linhas de `sections[*].fields`
+no parser por coordenadas; `armazenagem` e `operacao_servicos` no parser por
+linhas) com esquema fixo, prontas para Arrow/Parquet sem re-parse no cliente.
+"""
+
+from .columnar import to_rows
+from .document_001 import HEADER_MAPPING
+from .records import Record
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional dependency, only needed for Arrow/Parquet output
+    pa = None
+
+STRING = 'string'
+FLOAT = 'float'
+INT = 'int'
+
+# Table name -> [(column, type)]; document_id, section/row indexes come first
+TABLE_SCHEMAS = {
+    'fields': [
+        ('document_id', INT),
+        ('section_index', INT),
+        ('section_title', STRING),
+        ('field_index', INT),
+    ] + [(name, STRING) for name in HEADER_MAPPING],
+    'armazenagem': [
+        ('document_id', INT),
+        ('field_index', INT),
+        ('inicio', STRING),
+        ('final', STRING),
+        ('periodo', STRING),
+        ('qtde_pecas', STRING),
+        ('carregado', STRING),
+        ('saldo', STRING),
+        ('%_armaz', STRING),
+        ('total_armaz_rs', FLOAT),
+    ],
+    'operacao_servicos': [
+        ('document_id', INT),
+        ('field_index', INT),
+        ('descricao', STRING),
+        ('qtd', STRING),
+        ('rs_unitario', FLOAT),
+        ('total_oper_rs', FLOAT),
+    ],
+}
+
+
+def _coerce(value, kind):
+    """Coerces a parsed value to the column type (None when not convertible)"""
+    if value is None or value == '':
+        return None
+    if kind == STRING:
+        return value if isinstance(value, str) else str(value)
+    try:
+        if kind == FLOAT:
+            if isinstance(value, str) and ',' in value:
+                # Brazilian format: '.' groups thousands and ',' is the decimal separator
+                value = value.replace('.', '').replace(',', '.')
+            return float(value)
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def document_tables(result):
+    """Table names available for a parse result"""
+    if isinstance(result.get('sections'), list):
+        return ['fields']
+    return [name for name in ('armazenagem', 'operacao_servicos') if isinstance(result.get(name), dict)]
+
+
+def _row_dict(row):
+    """Copy of a parsed row (record or dict) as a dict"""
+    return row.to_dict() if isinstance(row, Record) else dict(row)
+
+
+def _records(result, table, document_id):
+    """Yields raw row dicts (with index columns) for one table"""
+    if table == 'fields':
+        for section_index, section in enumerate(result.get('sections', []), start=1):
+            for field_index, row in enumerate(section.get('fields', []), start=1):
+                record = _row_dict(row)
+                record.update(document_id=document_id, section_index=section_index,
+                              section_title=section.get('Title'), field_index=field_index)
+                yield record
+    else:
+        for field_index, row in enumerate(result.get(table, {}).get('fields', []), start=1):
+            record = _row_dict(row)
+            record.update(document_id=document_id, field_index=field_index)
+            yield record
+
+
+def iter_rows(result, table, document_id=None):
+    """Yields typed rows as tuples in TABLE_SCHEMAS column order"""
+    schema = TABLE_SCHEMAS[table]
+    for record in _records(to_rows(result), table, document_id):
+        yield tuple(_coerce(record.get(name), kind) for name, kind in schema)
+
+
+def flatten(result, table, document_id=None):
+    """Column name -> list of typed values for one table"""
+    schema = TABLE_SCHEMAS[table]
+    columns = {name: [] for name, _ in schema}
+    for row in iter_rows(result, table, document_id):
+        for (name, _), value in zip(schema, row):
+            columns[name].append(value)
+    return columns
+
+
+def arrow_available():
+    """Whether pyarrow is installed"""
+    return pa is not None
+
+
+def arrow_schema(table):
+    """pyarrow schema of a table"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow/Parquet output")
+    types = {STRING: pa.string(), FLOAT: pa.float64(), INT: pa.int64()}
+    return pa.schema([(name, types[kind]) for name, kind in TABLE_SCHEMAS[table]])
+
+
+def to_record_batch(result, table, document_id=None):
+    """Arrow record batch of one table"""
+    schema = arrow_schema(table)
+    columns = flatten(result, table, document_id)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in schema],
+        schema=schema
+    )
+
+
+def to_record_batches(result, document_id=None):
+    """Arrow record batches of every table of a parse result: {table: batch}"""
+    return {table: to_record_batch(result, table, document_id) for table in document_tables(result)}
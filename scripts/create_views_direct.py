@@ -169,6 +169,44 @@ def create_view_fields(connection):
               )
             )
           ) f
+        WHERE NOT JSON_EXISTS(p.CONTENT, '$?(@.format == "columnar")')
+        UNION ALL
+        SELECT
+          p.ID,
+          f.SECTION_INDEX,
+          f.FIELD_INDEX,
+          f.Data_Inicial,
+          f.Data_Final,
+          f.Container,
+          f.Categoria,
+          f.Armador,
+          f.Importador,
+          f.CNPJ_CPF,
+          f.Valor,
+          f.Moeda
+        FROM
+          PDFTOJSON p,
+          JSON_TABLE(
+            get_json_varchar(p.CONTENT) FORMAT JSON,
+            '$.sections[*]'
+            COLUMNS (
+              SECTION_INDEX FOR ORDINALITY,
+              NESTED PATH '$.rows[*]'
+              COLUMNS (
+                FIELD_INDEX     FOR ORDINALITY,
+                Data_Inicial    VARCHAR2(20)  PATH '$[0]' NULL ON EMPTY,
+                Data_Final      VARCHAR2(20)  PATH '$[1]' NULL ON EMPTY,
+                Container       VARCHAR2(30)  PATH '$[2]' NULL ON EMPTY,
+                Categoria       VARCHAR2(20)  PATH '$[3]' NULL ON EMPTY,
+                Armador         VARCHAR2(100) PATH '$[4]' NULL ON EMPTY,
+                Importador      VARCHAR2(255) PATH '$[6]' NULL ON EMPTY,
+                CNPJ_CPF        VARCHAR2(20)  PATH '$[7]' NULL ON EMPTY,
+                Valor           VARCHAR2(20)  PATH '$[15]' NULL ON EMPTY,
+                Moeda           VARCHAR2(10)  PATH '$[14]' NULL ON EMPTY
+              )
+            )
+          ) f
+        WHERE JSON_EXISTS(p.CONTENT, '$?(@.format == "columnar")')
         """
         
         cursor.execute(sql)
@@ -202,205 +240,163 @@ def create_view_full(connection):
           p.id,
           p.document_filename,
           p.date_created,
-          root.document_type,
-          root.observacoes,
-          hdr.capa,
-          hdr.demonstrativo,
-          hdr.nota_fiscal,
-          hdr.regime,
-          hdr.tarifa_01,
-          hdr.opcao_tarifa,
-          ben.codigo AS ben_codigo,
-          ben.nome AS ben_nome,
-          ben.cnpj_cpf AS ben_cnpj_cpf,
-          comiss.codigo AS com_codigo,
-          comiss.nome AS com_nome,
-          comiss.cnpj_cpf AS com_cnpj_cpf,
-          cli.codigo AS cli_codigo,
-          cli.nome AS cli_nome,
-          cli.endereco AS cli_endereco,
-          cli.bairro AS cli_bairro,
-          cli.cidade AS cli_cidade,
-          cli.estado AS cli_estado,
-          cli.cep AS cli_cep,
-          cli.cnpj_cpf AS cli_cnpj_cpf,
-          cli.ie AS cli_ie,
-          fat.codigo AS fat_codigo,
-          fat.nome AS fat_nome,
-          fat.endereco AS fat_endereco,
-          fat.bairro AS fat_bairro,
-          fat.cidade AS fat_cidade,
-          fat.estado AS fat_estado,
-          fat.cep AS fat_cep,
-          fat.cnpj_cpf AS fat_cnpj_cpf,
-          fat.ie AS fat_ie,
-          fat.im AS fat_im,
-          tar.moeda AS tar_moeda,
-          TO_DATE(tar.cotacao,'DD/MM/YYYY') AS tar_cotacao_data,
-          tar.valor_cotacao AS tar_valor_cotacao,
-          arm_total.total_armazenagem_periodos,
-          arm_elem.arm_idx AS arm_idx,
-          arm_elem.arm_inicio AS arm_inicio,
-          arm_elem.arm_final AS arm_final,
-          arm_elem.arm_periodo AS arm_periodo,
-          arm_elem.arm_qtde_pecas AS arm_qtde_pecas,
-          arm_elem.arm_carregado AS arm_carregado,
-          arm_elem.arm_saldo AS arm_saldo,
-          arm_elem.arm_pct_armaz AS arm_pct_armaz,
-          arm_elem.arm_total_armaz_rs AS arm_total_armaz_rs,
-          ops_total.total_operacao_servicos,
-          ops_total.total_geral,
-          ops_elem.descricao AS ops_descricao,
-          ops_elem.qtd AS ops_qtd,
-          ops_elem.rs_unitario AS ops_rs_unitario,
-          ops_elem.total_oper_rs AS ops_total_oper_rs,
-          lote.lote AS lote_numero,
-          lote.bl_awb_ctrc AS lote_bl_awb_ctrc,
-          lote.doc_aduan_de_entrada AS lote_doc_aduan_entrada,
-          lote.doc_aduaneiro_i AS lote_doc_aduaneiro_i,
-          TO_DATE(lote.data_entrada,'DD/MM/YYYY') AS lote_data_entrada,
-          lote.qtd_container AS lote_qtd_container,
-          lote.ref_cliente AS lote_ref_cliente,
-          lote.valor_fob_cif_rs AS lote_valor_fob_cif_rs,
-          lote.valor_fob_cif_us AS lote_valor_fob_cif_us,
-          lote.qtd_lote AS lote_qtd_lote,
-          lote.periodos_apuracao AS lote_periodos_apuracao,
-          TO_DATE(lote.fim_periodo_armaz,'DD/MM/YYYY') AS lote_fim_periodo_armaz,
-          TO_DATE(lote.prazo_p_retirada,'DD/MM/YYYY') AS lote_prazo_retirada,
-          lote.dias AS lote_dias,
-          lote.doc_aduaneiro_ii AS lote_doc_aduaneiro_ii,
-          lote.periodos_armaz AS lote_periodos_armaz,
-          lote.document_type AS lote_document_type
-        FROM pdftojson p
-        CROSS JOIN JSON_TABLE(
+          jt.document_type,
+          jt.observacoes,
+          jt.capa,
+          jt.demonstrativo,
+          jt.nota_fiscal,
+          jt.regime,
+          jt.tarifa_01,
+          jt.opcao_tarifa,
+          jt.ben_codigo,
+          jt.ben_nome,
+          jt.ben_cnpj_cpf,
+          jt.com_codigo,
+          jt.com_nome,
+          jt.com_cnpj_cpf,
+          jt.cli_codigo,
+          jt.cli_nome,
+          jt.cli_endereco,
+          jt.cli_bairro,
+          jt.cli_cidade,
+          jt.cli_estado,
+          jt.cli_cep,
+          jt.cli_cnpj_cpf,
+          jt.cli_ie,
+          jt.fat_codigo,
+          jt.fat_nome,
+          jt.fat_endereco,
+          jt.fat_bairro,
+          jt.fat_cidade,
+          jt.fat_estado,
+          jt.fat_cep,
+          jt.fat_cnpj_cpf,
+          jt.fat_ie,
+          jt.fat_im,
+          jt.tar_moeda,
+          TO_DATE(jt.tar_cotacao,'DD/MM/YYYY') AS tar_cotacao_data,
+          jt.tar_valor_cotacao,
+          jt.total_armazenagem_periodos,
+          jt.arm_idx,
+          jt.arm_inicio,
+          jt.arm_final,
+          jt.arm_periodo,
+          jt.arm_qtde_pecas,
+          jt.arm_carregado,
+          jt.arm_saldo,
+          jt.arm_pct_armaz,
+          jt.arm_total_armaz_rs,
+          jt.total_operacao_servicos,
+          jt.total_geral,
+          jt.ops_idx,
+          jt.ops_descricao,
+          jt.ops_qtd,
+          jt.ops_rs_unitario,
+          jt.ops_total_oper_rs,
+          jt.lote_numero,
+          jt.lote_bl_awb_ctrc,
+          jt.lote_doc_aduan_entrada,
+          jt.lote_doc_aduaneiro_i,
+          TO_DATE(jt.lote_data_entrada,'DD/MM/YYYY') AS lote_data_entrada,
+          jt.lote_qtd_container,
+          jt.lote_ref_cliente,
+          jt.lote_valor_fob_cif_rs,
+          jt.lote_valor_fob_cif_us,
+          jt.lote_qtd_lote,
+          jt.lote_periodos_apuracao,
+          TO_DATE(jt.lote_fim_periodo_armaz,'DD/MM/YYYY') AS lote_fim_periodo_armaz,
+          TO_DATE(jt.lote_prazo_retirada,'DD/MM/YYYY') AS lote_prazo_retirada,
+          jt.lote_dias,
+          jt.lote_doc_aduaneiro_ii,
+          jt.lote_periodos_armaz,
+          jt.lote_document_type
+        FROM pdftojson p,
+        -- Single pass over CONTENT. The two collections are sibling NESTED PATHs,
+        -- so a document yields (storage rows + operation rows) instead of their product;
+        -- each row fills either the arm_* or the ops_* columns.
+        JSON_TABLE(
           p.content, '$'
           COLUMNS (
             document_type VARCHAR2(50) PATH '$.document_type',
-            observacoes VARCHAR2(4000) PATH '$.observacoes'
-          )
-        ) root
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.header'
-          COLUMNS (
-            capa VARCHAR2(50) PATH '$.capa',
-            demonstrativo VARCHAR2(50) PATH '$.demonstrativo',
-            nota_fiscal VARCHAR2(50) PATH '$.nota_fiscal',
-            regime VARCHAR2(100) PATH '$.regime',
-            tarifa_01 VARCHAR2(100) PATH '$."tarifa 01"',
-            opcao_tarifa VARCHAR2(100) PATH '$.opcao_tarifa'
-          )
-        ) hdr
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.beneficiario'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf'
-          )
-        ) ben
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.comissaria'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf'
-          )
-        ) comiss
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.cliente'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            endereco VARCHAR2(500) PATH '$.endereco',
-            bairro VARCHAR2(100) PATH '$.bairro',
-            cidade VARCHAR2(100) PATH '$.cidade',
-            estado VARCHAR2(10) PATH '$.estado',
-            cep VARCHAR2(20) PATH '$.cep',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf',
-            ie VARCHAR2(50) PATH '$.ie'
-          )
-        ) cli
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."faturar para"'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            endereco VARCHAR2(500) PATH '$.endereco',
-            bairro VARCHAR2(100) PATH '$.bairro',
-            cidade VARCHAR2(100) PATH '$.cidade',
-            estado VARCHAR2(10) PATH '$.estado',
-            cep VARCHAR2(20) PATH '$.cep',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf',
-            ie VARCHAR2(50) PATH '$.ie',
-            im VARCHAR2(50) PATH '$.im'
-          )
-        ) fat
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."tarifas aplicadas"'
-          COLUMNS (
-            moeda VARCHAR2(50) PATH '$.moeda',
-            cotacao VARCHAR2(20) PATH '$.cotacao',
-            valor_cotacao NUMBER PATH '$.valor_cotacao'
-          )
-        ) tar
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.armazenagem'
-          COLUMNS (
-            total_armazenagem_periodos NUMBER PATH '$.total_armazenagem_periodos'
-          )
-        ) arm_total
-        LEFT JOIN JSON_TABLE(
-          p.content, '$.armazenagem.fields[*]'
-          COLUMNS (
-            arm_idx FOR ORDINALITY,
-            arm_inicio VARCHAR2(20) PATH '$.inicio',
-            arm_final VARCHAR2(20) PATH '$.final',
-            arm_periodo VARCHAR2(20) PATH '$.periodo',
-            arm_qtde_pecas VARCHAR2(20) PATH '$.qtde_pecas',
-            arm_carregado VARCHAR2(20) PATH '$.carregado',
-            arm_saldo VARCHAR2(20) PATH '$.saldo',
-            arm_pct_armaz VARCHAR2(20) PATH '$."%_armaz"',
-            arm_total_armaz_rs NUMBER PATH '$.total_armaz_rs'
-          )
-        ) arm_elem ON (1=1)
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.operacao_servicos'
-          COLUMNS (
-            total_operacao_servicos NUMBER PATH '$.total_operacao_servicos',
-            total_geral NUMBER PATH '$.total_geral'
-          )
-        ) ops_total
-        LEFT JOIN JSON_TABLE(
-          p.content, '$.operacao_servicos.fields[*]'
-          COLUMNS (
-            descricao VARCHAR2(255) PATH '$.descricao',
-            qtd VARCHAR2(20) PATH '$.qtd',
-            rs_unitario NUMBER PATH '$.rs_unitario',
-            total_oper_rs NUMBER PATH '$.total_oper_rs'
-          )
-        ) ops_elem ON (1=1)
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."informacoes do lote"'
-          COLUMNS (
-            lote VARCHAR2(50) PATH '$.lote',
-            bl_awb_ctrc VARCHAR2(50) PATH '$.bl_awb_ctrc',
-            doc_aduan_de_entrada VARCHAR2(255) PATH '$.doc_aduan_de_entrada',
-            doc_aduaneiro_i VARCHAR2(255) PATH '$.doc_aduaneiro_i',
-            data_entrada VARCHAR2(20) PATH '$.data_entrada',
-            qtd_container VARCHAR2(20) PATH '$.qtd_container',
-            ref_cliente VARCHAR2(50) PATH '$.ref_cliente',
-            valor_fob_cif_rs NUMBER PATH '$.valor_fob_cif_rs',
-            valor_fob_cif_us NUMBER PATH '$.valor_fob_cif_us',
-            qtd_lote VARCHAR2(20) PATH '$.qtd_lote',
-            periodos_apuracao VARCHAR2(100) PATH '$.periodos_apuracao',
-            fim_periodo_armaz VARCHAR2(20) PATH '$.fim_periodo_armaz',
-            prazo_p_retirada VARCHAR2(20) PATH '$.prazo_p_retirada',
-            dias VARCHAR2(10) PATH '$.dias',
-            doc_aduaneiro_ii VARCHAR2(255) PATH '$.doc_aduaneiro_ii',
-            periodos_armaz VARCHAR2(100) PATH '$.periodos_armaz',
-            document_type VARCHAR2(50) PATH '$.document_type'
+            observacoes VARCHAR2(4000) PATH '$.observacoes',
+            capa VARCHAR2(50) PATH '$.header.capa',
+            demonstrativo VARCHAR2(50) PATH '$.header.demonstrativo',
+            nota_fiscal VARCHAR2(50) PATH '$.header.nota_fiscal',
+            regime VARCHAR2(100) PATH '$.header.regime',
+            tarifa_01 VARCHAR2(100) PATH '$.header."tarifa 01"',
+            opcao_tarifa VARCHAR2(100) PATH '$.header.opcao_tarifa',
+            ben_codigo VARCHAR2(20) PATH '$.beneficiario.codigo',
+            ben_nome VARCHAR2(255) PATH '$.beneficiario.nome',
+            ben_cnpj_cpf VARCHAR2(20) PATH '$.beneficiario.cnpj_cpf',
+            com_codigo VARCHAR2(20) PATH '$.comissaria.codigo',
+            com_nome VARCHAR2(255) PATH '$.comissaria.nome',
+            com_cnpj_cpf VARCHAR2(20) PATH '$.comissaria.cnpj_cpf',
+            cli_codigo VARCHAR2(20) PATH '$.cliente.codigo',
+            cli_nome VARCHAR2(255) PATH '$.cliente.nome',
+            cli_endereco VARCHAR2(500) PATH '$.cliente.endereco',
+            cli_bairro VARCHAR2(100) PATH '$.cliente.bairro',
+            cli_cidade VARCHAR2(100) PATH '$.cliente.cidade',
+            cli_estado VARCHAR2(10) PATH '$.cliente.estado',
+            cli_cep VARCHAR2(20) PATH '$.cliente.cep',
+            cli_cnpj_cpf VARCHAR2(20) PATH '$.cliente.cnpj_cpf',
+            cli_ie VARCHAR2(50) PATH '$.cliente.ie',
+            fat_codigo VARCHAR2(20) PATH '$."faturar para".codigo',
+            fat_nome VARCHAR2(255) PATH '$."faturar para".nome',
+            fat_endereco VARCHAR2(500) PATH '$."faturar para".endereco',
+            fat_bairro VARCHAR2(100) PATH '$."faturar para".bairro',
+            fat_cidade VARCHAR2(100) PATH '$."faturar para".cidade',
+            fat_estado VARCHAR2(10) PATH '$."faturar para".estado',
+            fat_cep VARCHAR2(20) PATH '$."faturar para".cep',
+            fat_cnpj_cpf VARCHAR2(20) PATH '$."faturar para".cnpj_cpf',
+            fat_ie VARCHAR2(50) PATH '$."faturar para".ie',
+            fat_im VARCHAR2(50) PATH '$."faturar para".im',
+            tar_moeda VARCHAR2(50) PATH '$."tarifas aplicadas".moeda',
+            tar_cotacao VARCHAR2(20) PATH '$."tarifas aplicadas".cotacao',
+            tar_valor_cotacao NUMBER PATH '$."tarifas aplicadas".valor_cotacao',
+            total_armazenagem_periodos NUMBER PATH '$.armazenagem.total_armazenagem_periodos',
+            total_operacao_servicos NUMBER PATH '$.operacao_servicos.total_operacao_servicos',
+            total_geral NUMBER PATH '$.operacao_servicos.total_geral',
+            lote_numero VARCHAR2(50) PATH '$."informacoes do lote".lote',
+            lote_bl_awb_ctrc VARCHAR2(50) PATH '$."informacoes do lote".bl_awb_ctrc',
+            lote_doc_aduan_entrada VARCHAR2(255) PATH '$."informacoes do lote".doc_aduan_de_entrada',
+            lote_doc_aduaneiro_i VARCHAR2(255) PATH '$."informacoes do lote".doc_aduaneiro_i',
+            lote_data_entrada VARCHAR2(20) PATH '$."informacoes do lote".data_entrada',
+            lote_qtd_container VARCHAR2(20) PATH '$."informacoes do lote".qtd_container',
+            lote_ref_cliente VARCHAR2(50) PATH '$."informacoes do lote".ref_cliente',
+            lote_valor_fob_cif_rs NUMBER PATH '$."informacoes do lote".valor_fob_cif_rs',
+            lote_valor_fob_cif_us NUMBER PATH '$."informacoes do lote".valor_fob_cif_us',
+            lote_qtd_lote VARCHAR2(20) PATH '$."informacoes do lote".qtd_lote',
+            lote_periodos_apuracao VARCHAR2(100) PATH '$."informacoes do lote".periodos_apuracao',
+            lote_fim_periodo_armaz VARCHAR2(20) PATH '$."informacoes do lote".fim_periodo_armaz',
+            lote_prazo_retirada VARCHAR2(20) PATH '$."informacoes do lote".prazo_p_retirada',
+            lote_dias VARCHAR2(10) PATH '$."informacoes do lote".dias',
+            lote_doc_aduaneiro_ii VARCHAR2(255) PATH '$."informacoes do lote".doc_aduaneiro_ii',
+            lote_periodos_armaz VARCHAR2(100) PATH '$."informacoes do lote".periodos_armaz',
+            lote_document_type VARCHAR2(50) PATH '$."informacoes do lote".document_type',
+            NESTED PATH '$.armazenagem.fields[*]'
+            COLUMNS (
+              arm_idx FOR ORDINALITY,
+              arm_inicio VARCHAR2(20) PATH '$.inicio',
+              arm_final VARCHAR2(20) PATH '$.final',
+              arm_periodo VARCHAR2(20) PATH '$.periodo',
+              arm_qtde_pecas VARCHAR2(20) PATH '$.qtde_pecas',
+              arm_carregado VARCHAR2(20) PATH '$.carregado',
+              arm_saldo VARCHAR2(20) PATH '$.saldo',
+              arm_pct_armaz VARCHAR2(20) PATH '$."%_armaz"',
+              arm_total_armaz_rs NUMBER PATH '$.total_armaz_rs'
+            ),
+            NESTED PATH '$.operacao_servicos.fields[*]'
+            COLUMNS (
+              ops_idx FOR ORDINALITY,
+              ops_descricao VARCHAR2(255) PATH '$.descricao',
+              ops_qtd VARCHAR2(20) PATH '$.qtd',
+              ops_rs_unitario NUMBER PATH '$.rs_unitario',
+              ops_total_oper_rs NUMBER PATH '$.total_oper_rs'
+            )
           )
-        ) lote
+        ) jt
+        -- Only line-parser documents (DEMONSTRATIVO DE CÁLCULO) have these sections
+        WHERE JSON_EXISTS(p.content, '$."informacoes do lote"')
         """
         
         cursor.execute(sql)
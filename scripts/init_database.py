@@ -6,6 +6,7 @@ Checks and creates PDFTOJSON table and necessary views
 
 import os
 import sys
+import hashlib
 import oracledb
 from pathlib import Path
 from dotenv import load_dotenv
@@ -23,6 +24,405 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# SecureFile compression for CONTENT: NONE, LOW, MEDIUM or HIGH
+CONTENT_LOB_COMPRESSION = os.getenv('CONTENT_LOB_COMPRESSION', 'NONE').upper()
+
+LOB_COMPRESSION_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+def content_lob_compression_level():
+    """Configured compression level for CONTENT ('NONE' when not compressed)"""
+    if CONTENT_LOB_COMPRESSION in LOB_COMPRESSION_LEVELS:
+        return CONTENT_LOB_COMPRESSION
+    return 'NONE'
+
+def content_lob_storage_clause():
+    """LOB storage clause for CONTENT according to configured compression"""
+    if content_lob_compression_level() != 'NONE':
+        return f"LOB (CONTENT) STORE AS SECUREFILE (COMPRESS {CONTENT_LOB_COMPRESSION})"
+    return ""
+
+# PDFTOJSON_PARTITIONING: 'none' or 'monthly' (interval partitions on DATE_CREATED)
+PDFTOJSON_PARTITIONING = os.getenv('PDFTOJSON_PARTITIONING', 'none').lower()
+
+# Upper bound of the first range partition; later months are created automatically
+PARTITION_CLAUSE = """
+    PARTITION BY RANGE (DATE_CREATED) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+    (PARTITION p_initial VALUES LESS THAN (TIMESTAMP '2024-01-01 00:00:00'))
+    """
+
+def is_partitioned():
+    """Whether monthly interval partitioning is configured"""
+    return PDFTOJSON_PARTITIONING == 'monthly'
+
+def create_table_sql():
+    """CREATE TABLE statement for PDFTOJSON"""
+    if is_partitioned():
+        # Partition key must be NOT NULL for interval partitioning
+        return """
+    CREATE TABLE PDFTOJSON (
+        ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        DOCUMENT_TYPE VARCHAR2(50) NOT NULL,
+        DOCUMENT_FILENAME VARCHAR2(255) NOT NULL,
+        DOCUMENT_PATH VARCHAR2(500) NOT NULL,
+        DATE_CREATED TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        CONTENT CLOB NOT NULL,
+        CONSTRAINT chk_content_is_json CHECK (CONTENT IS JSON)
+    )
+    """ + content_lob_storage_clause() + PARTITION_CLAUSE
+    return """
+    CREATE TABLE PDFTOJSON (
+        ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        DOCUMENT_TYPE VARCHAR2(50) NOT NULL,
+        DOCUMENT_FILENAME VARCHAR2(255) NOT NULL,
+        DOCUMENT_PATH VARCHAR2(500) NOT NULL,
+        DATE_CREATED TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONTENT CLOB NOT NULL,
+        CONSTRAINT chk_content_is_json CHECK (CONTENT IS JSON)
+    )
+    """ + content_lob_storage_clause()
+
+def index_sqls():
+    """Secondary indexes; LOCAL (one segment per partition) when partitioned"""
+    local = " LOCAL" if is_partitioned() else ""
+    return [
+        f"CREATE INDEX idx_pdftojson_type ON PDFTOJSON(DOCUMENT_TYPE){local}",
+        f"CREATE INDEX idx_pdftojson_filename ON PDFTOJSON(DOCUMENT_FILENAME){local}",
+        f"CREATE INDEX idx_pdftojson_created ON PDFTOJSON(DATE_CREATED){local}"
+    ]
+
+# Global index for lookups by stored file (reference checks, reconciliation);
+# kept out of index_sqls() so existing tables get it through its own ledger entry
+PATH_INDEX_SQL = "CREATE INDEX idx_pdftojson_path ON PDFTOJSON(DOCUMENT_PATH)"
+
+# Write-behind queue entry of a row; unique so a retried entry is never inserted twice
+# (several NULLs are allowed, for documents inserted directly)
+QUEUE_ID_SQLS = [
+    "ALTER TABLE PDFTOJSON ADD (QUEUE_ID VARCHAR2(32))",
+    "CREATE UNIQUE INDEX idx_pdftojson_queue_id ON PDFTOJSON(QUEUE_ID)"
+]
+
+# Online conversion of an existing heap table; the ID primary key stays global
+PARTITION_EXISTING_SQLS = [
+    "UPDATE PDFTOJSON SET DATE_CREATED = CURRENT_TIMESTAMP WHERE DATE_CREATED IS NULL",
+    "ALTER TABLE PDFTOJSON MODIFY (DATE_CREATED NOT NULL)",
+    "ALTER TABLE PDFTOJSON MODIFY" + PARTITION_CLAUSE + """ONLINE
+    UPDATE INDEXES (
+        idx_pdftojson_type LOCAL,
+        idx_pdftojson_filename LOCAL,
+        idx_pdftojson_created LOCAL
+    )
+    """
+]
+
+FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION get_json_varchar(p_clob CLOB) 
+    RETURN VARCHAR2 
+    IS
+    BEGIN
+        RETURN DBMS_LOB.SUBSTR(p_clob, 32767, 1);
+    END;
+    """
+
+VIEW_SECTIONS_SQL = """
+    CREATE OR REPLACE VIEW VW_PDFTOJSON_SECTIONS AS
+    SELECT
+      p.ID,
+      p.DOCUMENT_TYPE,
+      p.DOCUMENT_FILENAME,
+      p.DOCUMENT_PATH,
+      p.DATE_CREATED,
+      jt.SECTION_INDEX,
+      jt.TITLE,
+      jt.QUANTITY,
+      jt.TOTAL,
+      jt.Cliente,
+      jt.CNPJ,
+      jt.Navio,
+      jt.Atracao,
+      jt.Demonstrativo,
+      jt.Valor_Bruto,
+      jt.Moeda
+    FROM
+      PDFTOJSON p,
+      JSON_TABLE(
+        get_json_varchar(p.CONTENT) FORMAT JSON,
+        '$'
+        COLUMNS (
+          Cliente        VARCHAR2(255) PATH '$.header."Cliente (Customer)"' NULL ON EMPTY,
+          CNPJ           VARCHAR2(20)  PATH '$.header."CNPJ (TAX_ID)"' NULL ON EMPTY,
+          Navio          VARCHAR2(255) PATH '$.header."Navio (Viessel)"' NULL ON EMPTY,
+          Atracao        VARCHAR2(100) PATH '$.header."Atração (BERTH_ATA)"' NULL ON EMPTY,
+          Demonstrativo  VARCHAR2(100) PATH '$.header."Demonstrativo (Draft)"' NULL ON EMPTY,
+          Valor_Bruto    NUMBER        PATH '$.header."Valor Bruto"' NULL ON EMPTY,
+          Moeda          VARCHAR2(10)  PATH '$.header."Moeda"' NULL ON EMPTY,
+          NESTED PATH '$.sections[*]'
+          COLUMNS (
+            SECTION_INDEX FOR ORDINALITY,
+            TITLE         VARCHAR2(255) PATH '$.Title' NULL ON EMPTY,
+            QUANTITY      NUMBER        PATH '$."Quantidade (Quantity)"' NULL ON EMPTY,
+            TOTAL         NUMBER        PATH '$.Total' NULL ON EMPTY
+          )
+        )
+      ) jt
+    """
+
+# Row-object sections (sections[*].fields) UNION ALL columnar sections
+# (sections[*].rows, "format": "columnar"); columnar rows follow HEADER_MAPPING order
+VIEW_FIELDS_SQL = """
+    CREATE OR REPLACE VIEW VW_PDFTOJSON_FIELDS AS
+    SELECT
+      p.ID,
+      f.SECTION_INDEX,
+      f.FIELD_INDEX,
+      f.Data_Inicial,
+      f.Data_Final,
+      f.Container,
+      f.Categoria,
+      f.Armador,
+      f.Importador,
+      f.CNPJ_CPF,
+      f.Valor,
+      f.Moeda
+    FROM
+      PDFTOJSON p,
+      JSON_TABLE(
+        get_json_varchar(p.CONTENT) FORMAT JSON,
+        '$.sections[*]'
+        COLUMNS (
+          SECTION_INDEX FOR ORDINALITY,
+          NESTED PATH '$.fields[*]'
+          COLUMNS (
+            FIELD_INDEX     FOR ORDINALITY,
+            Data_Inicial    VARCHAR2(20)  PATH '$."Data Inicial (Start Time)"' NULL ON EMPTY,
+            Data_Final      VARCHAR2(20)  PATH '$."Data Final (End Time)"' NULL ON EMPTY,
+            Container       VARCHAR2(30)  PATH '$."Container (Equipment ID)"' NULL ON EMPTY,
+            Categoria       VARCHAR2(20)  PATH '$."Categoria (Category)"' NULL ON EMPTY,
+            Armador         VARCHAR2(100) PATH '$."Armador (Line)"' NULL ON EMPTY,
+            Importador      VARCHAR2(255) PATH '$."Importador/Exportador (Consignee / Shipper)"' NULL ON EMPTY,
+            CNPJ_CPF        VARCHAR2(20)  PATH '$."CNPJ / CPF (ID)"' NULL ON EMPTY,
+            Valor           VARCHAR2(20)  PATH '$."Valor (Unit Value)"' NULL ON EMPTY,
+            Moeda           VARCHAR2(10)  PATH '$."Moeda (Currency)"' NULL ON EMPTY
+          )
+        )
+      ) f
+    WHERE NOT JSON_EXISTS(p.CONTENT, '$?(@.format == "columnar")')
+    UNION ALL
+    SELECT
+      p.ID,
+      f.SECTION_INDEX,
+      f.FIELD_INDEX,
+      f.Data_Inicial,
+      f.Data_Final,
+      f.Container,
+      f.Categoria,
+      f.Armador,
+      f.Importador,
+      f.CNPJ_CPF,
+      f.Valor,
+      f.Moeda
+    FROM
+      PDFTOJSON p,
+      JSON_TABLE(
+        get_json_varchar(p.CONTENT) FORMAT JSON,
+        '$.sections[*]'
+        COLUMNS (
+          SECTION_INDEX FOR ORDINALITY,
+          NESTED PATH '$.rows[*]'
+          COLUMNS (
+            FIELD_INDEX     FOR ORDINALITY,
+            Data_Inicial    VARCHAR2(20)  PATH '$[0]' NULL ON EMPTY,
+            Data_Final      VARCHAR2(20)  PATH '$[1]' NULL ON EMPTY,
+            Container       VARCHAR2(30)  PATH '$[2]' NULL ON EMPTY,
+            Categoria       VARCHAR2(20)  PATH '$[3]' NULL ON EMPTY,
+            Armador         VARCHAR2(100) PATH '$[4]' NULL ON EMPTY,
+            Importador      VARCHAR2(255) PATH '$[6]' NULL ON EMPTY,
+            CNPJ_CPF        VARCHAR2(20)  PATH '$[7]' NULL ON EMPTY,
+            Valor           VARCHAR2(20)  PATH '$[15]' NULL ON EMPTY,
+            Moeda           VARCHAR2(10)  PATH '$[14]' NULL ON EMPTY
+          )
+        )
+      ) f
+    WHERE JSON_EXISTS(p.CONTENT, '$?(@.format == "columnar")')
+    """
+
+VIEW_FULL_SQL = """
+    CREATE OR REPLACE VIEW vw_pdftojson_full AS
+    SELECT
+      p.id,
+      p.document_filename,
+      p.date_created,
+      jt.document_type,
+      jt.observacoes,
+      jt.capa,
+      jt.demonstrativo,
+      jt.nota_fiscal,
+      jt.regime,
+      jt.tarifa_01,
+      jt.opcao_tarifa,
+      jt.ben_codigo,
+      jt.ben_nome,
+      jt.ben_cnpj_cpf,
+      jt.com_codigo,
+      jt.com_nome,
+      jt.com_cnpj_cpf,
+      jt.cli_codigo,
+      jt.cli_nome,
+      jt.cli_endereco,
+      jt.cli_bairro,
+      jt.cli_cidade,
+      jt.cli_estado,
+      jt.cli_cep,
+      jt.cli_cnpj_cpf,
+      jt.cli_ie,
+      jt.fat_codigo,
+      jt.fat_nome,
+      jt.fat_endereco,
+      jt.fat_bairro,
+      jt.fat_cidade,
+      jt.fat_estado,
+      jt.fat_cep,
+      jt.fat_cnpj_cpf,
+      jt.fat_ie,
+      jt.fat_im,
+      jt.tar_moeda,
+      TO_DATE(jt.tar_cotacao,'DD/MM/YYYY') AS tar_cotacao_data,
+      jt.tar_valor_cotacao,
+      jt.total_armazenagem_periodos,
+      jt.arm_idx,
+      jt.arm_inicio,
+      jt.arm_final,
+      jt.arm_periodo,
+      jt.arm_qtde_pecas,
+      jt.arm_carregado,
+      jt.arm_saldo,
+      jt.arm_pct_armaz,
+      jt.arm_total_armaz_rs,
+      jt.total_operacao_servicos,
+      jt.total_geral,
+      jt.ops_idx,
+      jt.ops_descricao,
+      jt.ops_qtd,
+      jt.ops_rs_unitario,
+      jt.ops_total_oper_rs,
+      jt.lote_numero,
+      jt.lote_bl_awb_ctrc,
+      jt.lote_doc_aduan_entrada,
+      jt.lote_doc_aduaneiro_i,
+      TO_DATE(jt.lote_data_entrada,'DD/MM/YYYY') AS lote_data_entrada,
+      jt.lote_qtd_container,
+      jt.lote_ref_cliente,
+      jt.lote_valor_fob_cif_rs,
+      jt.lote_valor_fob_cif_us,
+      jt.lote_qtd_lote,
+      jt.lote_periodos_apuracao,
+      TO_DATE(jt.lote_fim_periodo_armaz,'DD/MM/YYYY') AS lote_fim_periodo_armaz,
+      TO_DATE(jt.lote_prazo_retirada,'DD/MM/YYYY') AS lote_prazo_retirada,
+      jt.lote_dias,
+      jt.lote_doc_aduaneiro_ii,
+      jt.lote_periodos_armaz,
+      jt.lote_document_type
+    FROM pdftojson p,
+    -- Single pass over CONTENT. The two collections are sibling NESTED PATHs,
+    -- so a document yields (storage rows + operation rows) instead of their product;
+    -- each row fills either the arm_* or the ops_* columns.
+    JSON_TABLE(
+      p.content, '$'
+      COLUMNS (
+        document_type VARCHAR2(50) PATH '$.document_type',
+        observacoes VARCHAR2(4000) PATH '$.observacoes',
+        capa VARCHAR2(50) PATH '$.header.capa',
+        demonstrativo VARCHAR2(50) PATH '$.header.demonstrativo',
+        nota_fiscal VARCHAR2(50) PATH '$.header.nota_fiscal',
+        regime VARCHAR2(100) PATH '$.header.regime',
+        tarifa_01 VARCHAR2(100) PATH '$.header."tarifa 01"',
+        opcao_tarifa VARCHAR2(100) PATH '$.header.opcao_tarifa',
+        ben_codigo VARCHAR2(20) PATH '$.beneficiario.codigo',
+        ben_nome VARCHAR2(255) PATH '$.beneficiario.nome',
+        ben_cnpj_cpf VARCHAR2(20) PATH '$.beneficiario.cnpj_cpf',
+        com_codigo VARCHAR2(20) PATH '$.comissaria.codigo',
+        com_nome VARCHAR2(255) PATH '$.comissaria.nome',
+        com_cnpj_cpf VARCHAR2(20) PATH '$.comissaria.cnpj_cpf',
+        cli_codigo VARCHAR2(20) PATH '$.cliente.codigo',
+        cli_nome VARCHAR2(255) PATH '$.cliente.nome',
+        cli_endereco VARCHAR2(500) PATH '$.cliente.endereco',
+        cli_bairro VARCHAR2(100) PATH '$.cliente.bairro',
+        cli_cidade VARCHAR2(100) PATH '$.cliente.cidade',
+        cli_estado VARCHAR2(10) PATH '$.cliente.estado',
+        cli_cep VARCHAR2(20) PATH '$.cliente.cep',
+        cli_cnpj_cpf VARCHAR2(20) PATH '$.cliente.cnpj_cpf',
+        cli_ie VARCHAR2(50) PATH '$.cliente.ie',
+        fat_codigo VARCHAR2(20) PATH '$."faturar para".codigo',
+        fat_nome VARCHAR2(255) PATH '$."faturar para".nome',
+        fat_endereco VARCHAR2(500) PATH '$."faturar para".endereco',
+        fat_bairro VARCHAR2(100) PATH '$."faturar para".bairro',
+        fat_cidade VARCHAR2(100) PATH '$."faturar para".cidade',
+        fat_estado VARCHAR2(10) PATH '$."faturar para".estado',
+        fat_cep VARCHAR2(20) PATH '$."faturar para".cep',
+        fat_cnpj_cpf VARCHAR2(20) PATH '$."faturar para".cnpj_cpf',
+        fat_ie VARCHAR2(50) PATH '$."faturar para".ie',
+        fat_im VARCHAR2(50) PATH '$."faturar para".im',
+        tar_moeda VARCHAR2(50) PATH '$."tarifas aplicadas".moeda',
+        tar_cotacao VARCHAR2(20) PATH '$."tarifas aplicadas".cotacao',
+        tar_valor_cotacao NUMBER PATH '$."tarifas aplicadas".valor_cotacao',
+        total_armazenagem_periodos NUMBER PATH '$.armazenagem.total_armazenagem_periodos',
+        total_operacao_servicos NUMBER PATH '$.operacao_servicos.total_operacao_servicos',
+        total_geral NUMBER PATH '$.operacao_servicos.total_geral',
+        lote_numero VARCHAR2(50) PATH '$."informacoes do lote".lote',
+        lote_bl_awb_ctrc VARCHAR2(50) PATH '$."informacoes do lote".bl_awb_ctrc',
+        lote_doc_aduan_entrada VARCHAR2(255) PATH '$."informacoes do lote".doc_aduan_de_entrada',
+        lote_doc_aduaneiro_i VARCHAR2(255) PATH '$."informacoes do lote".doc_aduaneiro_i',
+        lote_data_entrada VARCHAR2(20) PATH '$."informacoes do lote".data_entrada',
+        lote_qtd_container VARCHAR2(20) PATH '$."informacoes do lote".qtd_container',
+        lote_ref_cliente VARCHAR2(50) PATH '$."informacoes do lote".ref_cliente',
+        lote_valor_fob_cif_rs NUMBER PATH '$."informacoes do lote".valor_fob_cif_rs',
+        lote_valor_fob_cif_us NUMBER PATH '$."informacoes do lote".valor_fob_cif_us',
+        lote_qtd_lote VARCHAR2(20) PATH '$."informacoes do lote".qtd_lote',
+        lote_periodos_apuracao VARCHAR2(100) PATH '$."informacoes do lote".periodos_apuracao',
+        lote_fim_periodo_armaz VARCHAR2(20) PATH '$."informacoes do lote".fim_periodo_armaz',
+        lote_prazo_retirada VARCHAR2(20) PATH '$."informacoes do lote".prazo_p_retirada',
+        lote_dias VARCHAR2(10) PATH '$."informacoes do lote".dias',
+        lote_doc_aduaneiro_ii VARCHAR2(255) PATH '$."informacoes do lote".doc_aduaneiro_ii',
+        lote_periodos_armaz VARCHAR2(100) PATH '$."informacoes do lote".periodos_armaz',
+        lote_document_type VARCHAR2(50) PATH '$."informacoes do lote".document_type',
+        NESTED PATH '$.armazenagem.fields[*]'
+        COLUMNS (
+          arm_idx FOR ORDINALITY,
+          arm_inicio VARCHAR2(20) PATH '$.inicio',
+          arm_final VARCHAR2(20) PATH '$.final',
+          arm_periodo VARCHAR2(20) PATH '$.periodo',
+          arm_qtde_pecas VARCHAR2(20) PATH '$.qtde_pecas',
+          arm_carregado VARCHAR2(20) PATH '$.carregado',
+          arm_saldo VARCHAR2(20) PATH '$.saldo',
+          arm_pct_armaz VARCHAR2(20) PATH '$."%_armaz"',
+          arm_total_armaz_rs NUMBER PATH '$.total_armaz_rs'
+        ),
+        NESTED PATH '$.operacao_servicos.fields[*]'
+        COLUMNS (
+          ops_idx FOR ORDINALITY,
+          ops_descricao VARCHAR2(255) PATH '$.descricao',
+          ops_qtd VARCHAR2(20) PATH '$.qtd',
+          ops_rs_unitario NUMBER PATH '$.rs_unitario',
+          ops_total_oper_rs NUMBER PATH '$.total_oper_rs'
+        )
+      )
+    ) jt
+    """
+
+# Ledger of applied schema objects; startup only re-applies objects whose DDL changed
+LEDGER_TABLE = 'PDFTOJSON_SCHEMA_LEDGER'
+
+# Returned by an apply function that left the object as it was; its checksum is not recorded
+NOT_APPLIED = 'not applied'
+
+LEDGER_TABLE_SQL = f"""
+CREATE TABLE {LEDGER_TABLE} (
+    OBJECT_NAME VARCHAR2(128) PRIMARY KEY,
+    VERSION NUMBER NOT NULL,
+    CHECKSUM VARCHAR2(64) NOT NULL,
+    APPLIED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+)
+"""
+
 def table_exists(connection, table_name):
     """Check if table exists"""
     try:
@@ -62,29 +462,10 @@ def create_table(connection):
     try:
         cursor = connection.cursor()
         
-        # SQL to create table
-        create_table_sql = """
-        CREATE TABLE PDFTOJSON (
-            ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
-            DOCUMENT_TYPE VARCHAR2(50) NOT NULL,
-            DOCUMENT_FILENAME VARCHAR2(255) NOT NULL,
-            DOCUMENT_PATH VARCHAR2(500) NOT NULL,
-            DATE_CREATED TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            CONTENT CLOB NOT NULL,
-            CONSTRAINT chk_content_is_json CHECK (CONTENT IS JSON)
-        )
-        """
-        
-        cursor.execute(create_table_sql)
+        cursor.execute(create_table_sql())
         
         # Create indexes
-        index_sqls = [
-            "CREATE INDEX idx_pdftojson_type ON PDFTOJSON(DOCUMENT_TYPE)",
-            "CREATE INDEX idx_pdftojson_filename ON PDFTOJSON(DOCUMENT_FILENAME)",
-            "CREATE INDEX idx_pdftojson_created ON PDFTOJSON(DATE_CREATED)"
-        ]
-        
-        for index_sql in index_sqls:
+        for index_sql in index_sqls():
             cursor.execute(index_sql)
         
         connection.commit()
@@ -101,16 +482,7 @@ def create_function(connection):
     try:
         cursor = connection.cursor()
         
-        function_sql = """
-        CREATE OR REPLACE FUNCTION get_json_varchar(p_clob CLOB) 
-        RETURN VARCHAR2 
-        IS
-        BEGIN
-            RETURN DBMS_LOB.SUBSTR(p_clob, 32767, 1);
-        END;
-        """
-        
-        cursor.execute(function_sql)
+        cursor.execute(FUNCTION_SQL)
         connection.commit()
         cursor.close()
         logger.info("get_json_varchar function created successfully")
@@ -125,58 +497,7 @@ def create_view_sections(connection):
     try:
         cursor = connection.cursor()
         
-        # First, remove view if it exists
-        try:
-            cursor.execute("DROP VIEW VW_PDFTOJSON_SECTIONS")
-            logger.info("VW_PDFTOJSON_SECTIONS view removed")
-        except:
-            pass  # Doesn't exist, that's fine
-        
-        # View SQL
-        sql = """
-        CREATE VIEW VW_PDFTOJSON_SECTIONS AS
-        SELECT
-          p.ID,
-          p.DOCUMENT_TYPE,
-          p.DOCUMENT_FILENAME,
-          p.DOCUMENT_PATH,
-          p.DATE_CREATED,
-          jt.SECTION_INDEX,
-          jt.TITLE,
-          jt.QUANTITY,
-          jt.TOTAL,
-          jt.Cliente,
-          jt.CNPJ,
-          jt.Navio,
-          jt.Atracao,
-          jt.Demonstrativo,
-          jt.Valor_Bruto,
-          jt.Moeda
-        FROM
-          PDFTOJSON p,
-          JSON_TABLE(
-            get_json_varchar(p.CONTENT) FORMAT JSON,
-            '$'
-            COLUMNS (
-              Cliente        VARCHAR2(255) PATH '$.header."Cliente (Customer)"' NULL ON EMPTY,
-              CNPJ           VARCHAR2(20)  PATH '$.header."CNPJ (TAX_ID)"' NULL ON EMPTY,
-              Navio          VARCHAR2(255) PATH '$.header."Navio (Viessel)"' NULL ON EMPTY,
-              Atracao        VARCHAR2(100) PATH '$.header."Atração (BERTH_ATA)"' NULL ON EMPTY,
-              Demonstrativo  VARCHAR2(100) PATH '$.header."Demonstrativo (Draft)"' NULL ON EMPTY,
-              Valor_Bruto    NUMBER        PATH '$.header."Valor Bruto"' NULL ON EMPTY,
-              Moeda          VARCHAR2(10)  PATH '$.header."Moeda"' NULL ON EMPTY,
-              NESTED PATH '$.sections[*]'
-              COLUMNS (
-                SECTION_INDEX FOR ORDINALITY,
-                TITLE         VARCHAR2(255) PATH '$.Title' NULL ON EMPTY,
-                QUANTITY      NUMBER        PATH '$."Quantidade (Quantity)"' NULL ON EMPTY,
-                TOTAL         NUMBER        PATH '$.Total' NULL ON EMPTY
-              )
-            )
-          ) jt
-        """
-        
-        cursor.execute(sql)
+        cursor.execute(VIEW_SECTIONS_SQL)
         connection.commit()
         cursor.close()
         
@@ -193,54 +514,7 @@ def create_view_fields(connection):
     try:
         cursor = connection.cursor()
         
-        # First, remove view if it exists
-        try:
-            cursor.execute("DROP VIEW VW_PDFTOJSON_FIELDS")
-            logger.info("VW_PDFTOJSON_FIELDS view removed")
-        except:
-            pass  # Doesn't exist, that's fine
-        
-        # View SQL
-        sql = """
-        CREATE VIEW VW_PDFTOJSON_FIELDS AS
-        SELECT
-          p.ID,
-          f.SECTION_INDEX,
-          f.FIELD_INDEX,
-          f.Data_Inicial,
-          f.Data_Final,
-          f.Container,
-          f.Categoria,
-          f.Armador,
-          f.Importador,
-          f.CNPJ_CPF,
-          f.Valor,
-          f.Moeda
-        FROM
-          PDFTOJSON p,
-          JSON_TABLE(
-            get_json_varchar(p.CONTENT) FORMAT JSON,
-            '$.sections[*]'
-            COLUMNS (
-              SECTION_INDEX FOR ORDINALITY,
-              NESTED PATH '$.fields[*]'
-              COLUMNS (
-                FIELD_INDEX     FOR ORDINALITY,
-                Data_Inicial    VARCHAR2(20)  PATH '$."Data Inicial (Start Time)"' NULL ON EMPTY,
-                Data_Final      VARCHAR2(20)  PATH '$."Data Final (End Time)"' NULL ON EMPTY,
-                Container       VARCHAR2(30)  PATH '$."Container (Equipment ID)"' NULL ON EMPTY,
-                Categoria       VARCHAR2(20)  PATH '$."Categoria (Category)"' NULL ON EMPTY,
-                Armador         VARCHAR2(100) PATH '$."Armador (Line)"' NULL ON EMPTY,
-                Importador      VARCHAR2(255) PATH '$."Importador/Exportador (Consignee / Shipper)"' NULL ON EMPTY,
-                CNPJ_CPF        VARCHAR2(20)  PATH '$."CNPJ / CPF (ID)"' NULL ON EMPTY,
-                Valor           VARCHAR2(20)  PATH '$."Valor (Unit Value)"' NULL ON EMPTY,
-                Moeda           VARCHAR2(10)  PATH '$."Moeda (Currency)"' NULL ON EMPTY
-              )
-            )
-          ) f
-        """
-        
-        cursor.execute(sql)
+        cursor.execute(VIEW_FIELDS_SQL)
         connection.commit()
         cursor.close()
         
@@ -294,222 +568,7 @@ def create_view_full(connection):
     try:
         cursor = connection.cursor()
         
-        # First, remove view if it exists
-        try:
-            cursor.execute("DROP VIEW vw_pdftojson_full")
-            logger.info("vw_pdftojson_full view removed")
-        except:
-            pass  # Doesn't exist, that's fine
-        
-        # View SQL
-        sql = """
-        CREATE OR REPLACE VIEW vw_pdftojson_full AS
-        SELECT
-          p.id,
-          p.document_filename,
-          p.date_created,
-          root.document_type,
-          root.observacoes,
-          hdr.capa,
-          hdr.demonstrativo,
-          hdr.nota_fiscal,
-          hdr.regime,
-          hdr.tarifa_01,
-          hdr.opcao_tarifa,
-          ben.codigo AS ben_codigo,
-          ben.nome AS ben_nome,
-          ben.cnpj_cpf AS ben_cnpj_cpf,
-          comiss.codigo AS com_codigo,
-          comiss.nome AS com_nome,
-          comiss.cnpj_cpf AS com_cnpj_cpf,
-          cli.codigo AS cli_codigo,
-          cli.nome AS cli_nome,
-          cli.endereco AS cli_endereco,
-          cli.bairro AS cli_bairro,
-          cli.cidade AS cli_cidade,
-          cli.estado AS cli_estado,
-          cli.cep AS cli_cep,
-          cli.cnpj_cpf AS cli_cnpj_cpf,
-          cli.ie AS cli_ie,
-          fat.codigo AS fat_codigo,
-          fat.nome AS fat_nome,
-          fat.endereco AS fat_endereco,
-          fat.bairro AS fat_bairro,
-          fat.cidade AS fat_cidade,
-          fat.estado AS fat_estado,
-          fat.cep AS fat_cep,
-          fat.cnpj_cpf AS fat_cnpj_cpf,
-          fat.ie AS fat_ie,
-          fat.im AS fat_im,
-          tar.moeda AS tar_moeda,
-          TO_DATE(tar.cotacao,'DD/MM/YYYY') AS tar_cotacao_data,
-          tar.valor_cotacao AS tar_valor_cotacao,
-          arm_total.total_armazenagem_periodos,
-          arm_elem.arm_idx AS arm_idx,
-          arm_elem.arm_inicio AS arm_inicio,
-          arm_elem.arm_final AS arm_final,
-          arm_elem.arm_periodo AS arm_periodo,
-          arm_elem.arm_qtde_pecas AS arm_qtde_pecas,
-          arm_elem.arm_carregado AS arm_carregado,
-          arm_elem.arm_saldo AS arm_saldo,
-          arm_elem.arm_pct_armaz AS arm_pct_armaz,
-          arm_elem.arm_total_armaz_rs AS arm_total_armaz_rs,
-          ops_total.total_operacao_servicos,
-          ops_total.total_geral,
-          ops_elem.descricao AS ops_descricao,
-          ops_elem.qtd AS ops_qtd,
-          ops_elem.rs_unitario AS ops_rs_unitario,
-          ops_elem.total_oper_rs AS ops_total_oper_rs,
-          lote.lote AS lote_numero,
-          lote.bl_awb_ctrc AS lote_bl_awb_ctrc,
-          lote.doc_aduan_de_entrada AS lote_doc_aduan_entrada,
-          lote.doc_aduaneiro_i AS lote_doc_aduaneiro_i,
-          TO_DATE(lote.data_entrada,'DD/MM/YYYY') AS lote_data_entrada,
-          lote.qtd_container AS lote_qtd_container,
-          lote.ref_cliente AS lote_ref_cliente,
-          lote.valor_fob_cif_rs AS lote_valor_fob_cif_rs,
-          lote.valor_fob_cif_us AS lote_valor_fob_cif_us,
-          lote.qtd_lote AS lote_qtd_lote,
-          lote.periodos_apuracao AS lote_periodos_apuracao,
-          TO_DATE(lote.fim_periodo_armaz,'DD/MM/YYYY') AS lote_fim_periodo_armaz,
-          TO_DATE(lote.prazo_p_retirada,'DD/MM/YYYY') AS lote_prazo_retirada,
-          lote.dias AS lote_dias,
-          lote.doc_aduaneiro_ii AS lote_doc_aduaneiro_ii,
-          lote.periodos_armaz AS lote_periodos_armaz,
-          lote.document_type AS lote_document_type
-        FROM pdftojson p
-        CROSS JOIN JSON_TABLE(
-          p.content, '$'
-          COLUMNS (
-            document_type VARCHAR2(50) PATH '$.document_type',
-            observacoes VARCHAR2(4000) PATH '$.observacoes'
-          )
-        ) root
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.header'
-          COLUMNS (
-            capa VARCHAR2(50) PATH '$.capa',
-            demonstrativo VARCHAR2(50) PATH '$.demonstrativo',
-            nota_fiscal VARCHAR2(50) PATH '$.nota_fiscal',
-            regime VARCHAR2(100) PATH '$.regime',
-            tarifa_01 VARCHAR2(100) PATH '$."tarifa 01"',
-            opcao_tarifa VARCHAR2(100) PATH '$.opcao_tarifa'
-          )
-        ) hdr
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.beneficiario'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf'
-          )
-        ) ben
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.comissaria'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf'
-          )
-        ) comiss
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.cliente'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            endereco VARCHAR2(500) PATH '$.endereco',
-            bairro VARCHAR2(100) PATH '$.bairro',
-            cidade VARCHAR2(100) PATH '$.cidade',
-            estado VARCHAR2(10) PATH '$.estado',
-            cep VARCHAR2(20) PATH '$.cep',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf',
-            ie VARCHAR2(50) PATH '$.ie'
-          )
-        ) cli
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."faturar para"'
-          COLUMNS (
-            codigo VARCHAR2(20) PATH '$.codigo',
-            nome VARCHAR2(255) PATH '$.nome',
-            endereco VARCHAR2(500) PATH '$.endereco',
-            bairro VARCHAR2(100) PATH '$.bairro',
-            cidade VARCHAR2(100) PATH '$.cidade',
-            estado VARCHAR2(10) PATH '$.estado',
-            cep VARCHAR2(20) PATH '$.cep',
-            cnpj_cpf VARCHAR2(20) PATH '$.cnpj_cpf',
-            ie VARCHAR2(50) PATH '$.ie',
-            im VARCHAR2(50) PATH '$.im'
-          )
-        ) fat
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."tarifas aplicadas"'
-          COLUMNS (
-            moeda VARCHAR2(50) PATH '$.moeda',
-            cotacao VARCHAR2(20) PATH '$.cotacao',
-            valor_cotacao NUMBER PATH '$.valor_cotacao'
-          )
-        ) tar
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.armazenagem'
-          COLUMNS (
-            total_armazenagem_periodos NUMBER PATH '$.total_armazenagem_periodos'
-          )
-        ) arm_total
-        LEFT JOIN JSON_TABLE(
-          p.content, '$.armazenagem.fields[*]'
-          COLUMNS (
-            arm_idx FOR ORDINALITY,
-            arm_inicio VARCHAR2(20) PATH '$.inicio',
-            arm_final VARCHAR2(20) PATH '$.final',
-            arm_periodo VARCHAR2(20) PATH '$.periodo',
-            arm_qtde_pecas VARCHAR2(20) PATH '$.qtde_pecas',
-            arm_carregado VARCHAR2(20) PATH '$.carregado',
-            arm_saldo VARCHAR2(20) PATH '$.saldo',
-            arm_pct_armaz VARCHAR2(20) PATH '$."%_armaz"',
-            arm_total_armaz_rs NUMBER PATH '$.total_armaz_rs'
-          )
-        ) arm_elem ON (1=1)
-        CROSS JOIN JSON_TABLE(
-          p.content, '$.operacao_servicos'
-          COLUMNS (
-            total_operacao_servicos NUMBER PATH '$.total_operacao_servicos',
-            total_geral NUMBER PATH '$.total_geral'
-          )
-        ) ops_total
-        LEFT JOIN JSON_TABLE(
-          p.content, '$.operacao_servicos.fields[*]'
-          COLUMNS (
-            descricao VARCHAR2(255) PATH '$.descricao',
-            qtd VARCHAR2(20) PATH '$.qtd',
-            rs_unitario NUMBER PATH '$.rs_unitario',
-            total_oper_rs NUMBER PATH '$.total_oper_rs'
-          )
-        ) ops_elem ON (1=1)
-        CROSS JOIN JSON_TABLE(
-          p.content, '$."informacoes do lote"'
-          COLUMNS (
-            lote VARCHAR2(50) PATH '$.lote',
-            bl_awb_ctrc VARCHAR2(50) PATH '$.bl_awb_ctrc',
-            doc_aduan_de_entrada VARCHAR2(255) PATH '$.doc_aduan_de_entrada',
-            doc_aduaneiro_i VARCHAR2(255) PATH '$.doc_aduaneiro_i',
-            data_entrada VARCHAR2(20) PATH '$.data_entrada',
-            qtd_container VARCHAR2(20) PATH '$.qtd_container',
-            ref_cliente VARCHAR2(50) PATH '$.ref_cliente',
-            valor_fob_cif_rs NUMBER PATH '$.valor_fob_cif_rs',
-            valor_fob_cif_us NUMBER PATH '$.valor_fob_cif_us',
-            qtd_lote VARCHAR2(20) PATH '$.qtd_lote',
-            periodos_apuracao VARCHAR2(100) PATH '$.periodos_apuracao',
-            fim_periodo_armaz VARCHAR2(20) PATH '$.fim_periodo_armaz',
-            prazo_p_retirada VARCHAR2(20) PATH '$.prazo_p_retirada',
-            dias VARCHAR2(10) PATH '$.dias',
-            doc_aduaneiro_ii VARCHAR2(255) PATH '$.doc_aduaneiro_ii',
-            periodos_armaz VARCHAR2(100) PATH '$.periodos_armaz',
-            document_type VARCHAR2(50) PATH '$.document_type'
-          )
-        ) lote
-        """
-        
-        cursor.execute(sql)
+        cursor.execute(VIEW_FULL_SQL)
         connection.commit()
         cursor.close()
 
@@ -519,8 +578,205 @@ def create_view_full(connection):
         connection.rollback()
         return False
 
+def table_lob_compression(connection):
+    """Actual compression level of PDFTOJSON.CONTENT ('NONE' when not compressed)"""
+    cursor = connection.cursor()
+    try:
+        # Partitioned tables keep the LOB defaults in user_part_lobs
+        cursor.execute("""
+            SELECT NVL(pl.def_compress, l.compression)
+            FROM user_lobs l
+            LEFT JOIN user_part_lobs pl
+              ON pl.table_name = l.table_name AND pl.column_name = l.column_name
+            WHERE l.table_name = 'PDFTOJSON' AND l.column_name = 'CONTENT'
+        """)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    level = (row[0] or '').upper() if row else ''
+    return level if level in LOB_COMPRESSION_LEVELS else 'NONE'
+
+def table_drift(connection):
+    """Differences between the existing PDFTOJSON table and its configured DDL"""
+    drift = []
+    configured = content_lob_compression_level()
+    actual = table_lob_compression(connection)
+    if actual != configured:
+        drift.append(f"CONTENT compression is {actual}, CONTENT_LOB_COMPRESSION={configured}")
+    # Converting to partitions is the PDFTOJSON_PARTITIONING entry's job; the reverse is not automated
+    if not is_partitioned() and table_is_partitioned(connection, 'PDFTOJSON'):
+        drift.append("table is partitioned, PDFTOJSON_PARTITIONING=none")
+    return drift
+
+def ensure_table(connection):
+    """Create PDFTOJSON table if it doesn't exist (existing tables are never altered)
+
+    Returns NOT_APPLIED when an existing table differs from the configured DDL,
+    so the new checksum is not recorded and the drift is reported on every start.
+    """
+    if not table_exists(connection, 'PDFTOJSON'):
+        logger.info("Creating PDFTOJSON table...")
+        return create_table(connection)
+    try:
+        drift = table_drift(connection)
+    except Exception as e:
+        logger.error(f"Error checking PDFTOJSON table storage: {e}")
+        return False
+    if drift:
+        logger.warning(
+            f"PDFTOJSON table already exists and differs from its DDL ({'; '.join(drift)}); "
+            "existing tables are not altered, apply the change manually"
+        )
+        return NOT_APPLIED
+    logger.info("PDFTOJSON table already exists")
+    return True
+
+def create_path_index(connection):
+    """Create DOCUMENT_PATH index if it doesn't exist"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(PATH_INDEX_SQL)
+        logger.info("idx_pdftojson_path index created successfully")
+        return True
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        if error.code in (955, 1408):  # ORA-00955 / ORA-01408: index already exists
+            logger.info("idx_pdftojson_path index already exists")
+            return True
+        logger.error(f"Error creating idx_pdftojson_path index: {e}")
+        return False
+    finally:
+        cursor.close()
+
+def add_queue_id(connection):
+    """Add QUEUE_ID column and its unique index if they don't exist"""
+    cursor = connection.cursor()
+    try:
+        for sql in QUEUE_ID_SQLS:
+            try:
+                cursor.execute(sql)
+            except oracledb.DatabaseError as e:
+                error, = e.args
+                # ORA-01430: column already exists; ORA-00955 / ORA-01408: index already exists
+                if error.code not in (1430, 955, 1408):
+                    raise
+        logger.info("QUEUE_ID column and idx_pdftojson_queue_id index in place")
+        return True
+    except Exception as e:
+        logger.error(f"Error adding QUEUE_ID column: {e}")
+        return False
+    finally:
+        cursor.close()
+
+def table_is_partitioned(connection, table_name):
+    """Check if table is partitioned"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM user_part_tables
+            WHERE table_name = :table_name
+        """, table_name=table_name.upper())
+        return cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+
+def partition_table(connection):
+    """Convert existing PDFTOJSON heap table to monthly interval partitions"""
+    try:
+        if table_is_partitioned(connection, 'PDFTOJSON'):
+            logger.info("PDFTOJSON table already partitioned")
+            return True
+        
+        cursor = connection.cursor()
+        for sql in PARTITION_EXISTING_SQLS:
+            cursor.execute(sql)
+        connection.commit()
+        cursor.close()
+        
+        logger.info("PDFTOJSON table converted to monthly interval partitions")
+        return True
+    except Exception as e:
+        logger.error(f"Error partitioning PDFTOJSON table: {e}")
+        connection.rollback()
+        return False
+
+def sql_checksum(*statements):
+    """Checksum of DDL statements, insensitive to whitespace"""
+    normalized = '\n'.join(' '.join(statement.split()) for statement in statements)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def schema_objects():
+    """Managed schema objects in creation order: (name, checksum, apply function)"""
+    objects = [('PDFTOJSON', sql_checksum(create_table_sql(), *index_sqls()), ensure_table)]
+    if is_partitioned():
+        objects.append(('PDFTOJSON_PARTITIONING', sql_checksum(*PARTITION_EXISTING_SQLS), partition_table))
+    objects.extend([
+        ('IDX_PDFTOJSON_PATH', sql_checksum(PATH_INDEX_SQL), create_path_index),
+        ('PDFTOJSON_QUEUE_ID', sql_checksum(*QUEUE_ID_SQLS), add_queue_id),
+        ('GET_JSON_VARCHAR', sql_checksum(FUNCTION_SQL), create_function),
+        ('VW_PDFTOJSON_SECTIONS', sql_checksum(VIEW_SECTIONS_SQL), create_view_sections),
+        ('VW_PDFTOJSON_FIELDS', sql_checksum(VIEW_FIELDS_SQL), create_view_fields),
+        ('VW_PDFTOJSON_FULL', sql_checksum(VIEW_FULL_SQL), create_view_full)
+    ])
+    return objects
+
+def read_ledger(connection):
+    """Return {object_name: (version, checksum)} or None if the ledger doesn't exist"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT OBJECT_NAME, VERSION, CHECKSUM FROM {LEDGER_TABLE}")
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        if error.code == 942:  # ORA-00942: table or view does not exist
+            return None
+        raise
+    finally:
+        cursor.close()
+
+def create_ledger(connection):
+    """Create schema ledger table"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(LEDGER_TABLE_SQL)
+        logger.info(f"{LEDGER_TABLE} table created successfully")
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        if error.code != 955:  # ORA-00955: created concurrently by another replica
+            raise
+    finally:
+        cursor.close()
+
+def record_migration(connection, object_name, version, checksum):
+    """Upsert ledger entry for an applied object"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""
+            MERGE INTO {LEDGER_TABLE} l
+            USING (SELECT :object_name AS OBJECT_NAME FROM DUAL) s
+            ON (l.OBJECT_NAME = s.OBJECT_NAME)
+            WHEN MATCHED THEN UPDATE SET
+                l.VERSION = :version, l.CHECKSUM = :checksum, l.APPLIED_AT = CURRENT_TIMESTAMP
+            WHEN NOT MATCHED THEN INSERT (OBJECT_NAME, VERSION, CHECKSUM)
+                VALUES (:object_name, :version, :checksum)
+        """, object_name=object_name, version=version, checksum=checksum)
+        connection.commit()
+    finally:
+        cursor.close()
+
+def pending_objects(ledger, force=False):
+    """Schema objects whose checksum differs from the ledger"""
+    pending = []
+    for object_name, checksum, apply in schema_objects():
+        version, applied_checksum = ledger.get(object_name, (0, None))
+        if force or applied_checksum != checksum:
+            pending.append((object_name, version + 1, checksum, apply))
+    return pending
+
 def main():
     """Main function"""
+    force = '--force' in sys.argv[1:]
     logger.info("Starting Oracle database configuration...")
     
     # Connect to database
@@ -530,38 +786,28 @@ def main():
         sys.exit(1)
     
     try:
-        # Check/create table
-        if table_exists(connection, 'PDFTOJSON'):
-            logger.info("PDFTOJSON table already exists")
-        else:
-            logger.info("Creating PDFTOJSON table...")
-            if not create_table(connection):
-                logger.error("Failed to create PDFTOJSON table")
+        # Warm start: a single SELECT on the ledger decides what to do
+        ledger = read_ledger(connection)
+        if ledger is None:
+            logger.info(f"Creating {LEDGER_TABLE} table...")
+            create_ledger(connection)
+            ledger = {}
+        
+        pending = pending_objects(ledger, force)
+        if not pending:
+            logger.info("Database schema is up to date, nothing to apply")
+            return
+        
+        for object_name, version, checksum, apply in pending:
+            logger.info(f"Applying {object_name} (version {version})...")
+            result = apply(connection)
+            if not result:
+                logger.error(f"Failed to apply {object_name}")
                 sys.exit(1)
-        
-        # Create helper function
-        logger.info("Creating/updating get_json_varchar function...")
-        if not create_function(connection):
-            logger.error("Failed to create get_json_varchar function")
-            sys.exit(1)
-        
-        # Create views
-        logger.info("Creating/updating views...")
-        
-        # Create VW_PDFTOJSON_SECTIONS view
-        if not create_view_sections(connection):
-            logger.error("Failed to create VW_PDFTOJSON_SECTIONS view")
-            sys.exit(1)
-        
-        # Create VW_PDFTOJSON_FIELDS view
-        if not create_view_fields(connection):
-            logger.error("Failed to create VW_PDFTOJSON_FIELDS view")
-            sys.exit(1)
-        
-        # Create vw_pdftojson_full view
-        if not create_view_full(connection):
-            logger.error("Failed to create vw_pdftojson_full view")
-            sys.exit(1)
+            if result == NOT_APPLIED:
+                logger.warning(f"{object_name} not applied, ledger left at version {version - 1}")
+                continue
+            record_migration(connection, object_name, version, checksum)
         
         logger.info("Database configuration completed successfully!")
         
@@ -572,4 +818,4 @@ def main():
         connection.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Orphan reconciliation script
+Merges the documents/ folder with PDFTOJSON.DOCUMENT_PATH in sorted order and
+reports (or fixes) stored files without rows and rows without files
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from dotenv import load_dotenv
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import DOCUMENTS_PATH, DOCUMENT_CACHE_REDIS_URL
+from db.oracle_connection import OracleManager, REFERENCE_CHECK_CHUNK
+from db.document_cache import create_document_cache
+from storage.reconcile import walk_sorted, merge_sorted, ReconcileCheckpoint
+
+# Logging configuration
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Reconcile stored PDFs with PDFTOJSON rows")
+    parser.add_argument('--fix', action='store_true',
+                        help="remove orphan files and empty directories")
+    parser.add_argument('--delete-dangling', action='store_true',
+                        help="delete rows whose stored file is missing")
+    parser.add_argument('--min-age', type=int, default=3600,
+                        help="ignore orphans modified in the last N seconds (inserts in progress)")
+    parser.add_argument('--checkpoint', default='.reconcile_checkpoint.json',
+                        help="progress file used to resume interrupted runs")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore existing checkpoint and start from the beginning")
+    return parser.parse_args()
+
+def stream_referenced_paths(cursor, root, start_after):
+    """Yield (DOCUMENT_PATH, ID) for local files under root, in binary path order"""
+    # Path order must match the filesystem walk (code point / UTF-8 byte order)
+    cursor.execute("ALTER SESSION SET NLS_SORT = BINARY")
+    prefix = os.path.join(root, '')
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    cursor.execute("""
+        SELECT DOCUMENT_PATH, ID
+        FROM PDFTOJSON
+        WHERE DOCUMENT_PATH LIKE :prefix ESCAPE '\\'
+        AND DOCUMENT_PATH > :start_after
+        ORDER BY DOCUMENT_PATH, ID
+    """, {'prefix': escaped + '%', 'start_after': start_after or prefix})
+    for row in cursor:
+        yield row[0], row[1]
+
+def is_recent(path, min_age, now):
+    """Whether a stored entry was modified within min_age seconds"""
+    try:
+        return now - os.stat(path.rstrip('/')).st_mtime < min_age
+    except FileNotFoundError:
+        return True
+
+def remove_orphans(oracle_manager, cursor, paths):
+    """
+    Remove orphan files and empty directories; returns number removed.
+    File references are checked again right before the unlink, and shared files
+    an insert just deduplicated onto are kept (see remove_unreferenced_files)
+    """
+    removed = 0
+    for path in paths:
+        if path.endswith('/'):
+            try:
+                os.rmdir(path.rstrip('/'))
+            except OSError:
+                continue  # A new file was stored in it meanwhile
+            logger.info(f"Directory removed: {path}")
+            removed += 1
+    files = [path for path in paths if not path.endswith('/')]
+    if files:
+        removed += oracle_manager.remove_unreferenced_files(cursor, files)
+    return removed
+
+def delete_dangling(connection, cursor, ids, document_cache):
+    """Delete rows whose stored file is missing and drop their cached responses"""
+    cursor.executemany("DELETE FROM PDFTOJSON WHERE ID = :id", [{'id': i} for i in ids])
+    connection.commit()
+    document_cache.invalidate_many(ids)
+
+def main():
+    """Main function"""
+    args = parse_args()
+    oracle_manager = OracleManager()
+    store = oracle_manager.store
+    root = DOCUMENTS_PATH
+
+    checkpoint = ReconcileCheckpoint(args.checkpoint)
+    start_after = None if args.restart else checkpoint.load()
+    if start_after:
+        logger.info(f"Resuming after {start_after}")
+
+    connection = oracle_manager.get_connection()
+    if not connection:
+        logger.error("Failed to connect to Oracle")
+        sys.exit(1)
+
+    counts = {'ok': 0, 'orphan': 0, 'dangling': 0, 'recent': 0, 'fixed': 0}
+    last_path = start_after
+    completed = False
+    now = time.time()
+    # Only the shared cache matters here; app replicas' local entries expire with their TTL
+    document_cache = create_document_cache(0, redis_url=DOCUMENT_CACHE_REDIS_URL)
+    try:
+        rows = stream_referenced_paths(oracle_manager.read_cursor(connection), root, start_after)
+        delete_cursor = connection.cursor()
+        orphans = []
+
+        for status, path, ids in merge_sorted(walk_sorted(root, start_after), rows):
+            if status == 'orphan':
+                if is_recent(path, args.min_age, now):
+                    counts['recent'] += 1
+                else:
+                    counts['orphan'] += 1
+                    logger.warning(f"Orphan: {path}")
+                    if args.fix:
+                        orphans.append(path)
+            elif status == 'dangling':
+                counts['dangling'] += 1
+                logger.warning(f"Missing file for IDs {ids}: {path}")
+                # Re-check in case the file appeared after the walk passed it
+                if args.delete_dangling and store.resolve(path) is None:
+                    delete_dangling(connection, delete_cursor, ids, document_cache)
+                    counts['fixed'] += len(ids)
+            else:
+                counts['ok'] += 1
+
+            if len(orphans) >= REFERENCE_CHECK_CHUNK:
+                counts['fixed'] += remove_orphans(oracle_manager, delete_cursor, orphans)
+                orphans = []
+            # The checkpoint only moves past orphans once they are removed
+            if not orphans:
+                last_path = path
+                checkpoint.advance(last_path)
+
+        counts['fixed'] += remove_orphans(oracle_manager, delete_cursor, orphans)
+        completed = True
+        checkpoint.clear()
+        logger.info(
+            f"Reconciliation completed: {counts['ok']} ok, {counts['orphan']} orphans, "
+            f"{counts['dangling']} dangling paths, {counts['recent']} recent entries skipped, "
+            f"{counts['fixed']} fixed"
+        )
+
+    except Exception as e:
+        logger.error(f"Error during reconciliation: {e}")
+        sys.exit(1)
+    finally:
+        if not completed and last_path:
+            checkpoint.save(last_path)
+            logger.info(f"Progress saved to {args.checkpoint}, rerun to resume")
+        connection.close()
+
+if __name__ == "__main__":
+    main()
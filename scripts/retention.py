@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Document retention script
+Removes PDFTOJSON documents older than the retention period: drops expired
+monthly partitions, then purges remaining rows in batches
+"""
+
+import os
+import sys
+import logging
+from datetime import datetime
+from dotenv import load_dotenv
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.oracle_connection import OracleManager
+from db.document_cache import create_document_cache
+from config import DOCUMENT_CACHE_REDIS_URL
+
+# Logging configuration
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Months of documents to keep (current month included)
+RETENTION_MONTHS = int(os.getenv('RETENTION_MONTHS', '24'))
+
+def retention_cutoff(months, now=None):
+    """First day of the oldest month to keep"""
+    now = now or datetime.now()
+    month_index = now.year * 12 + (now.month - 1) - (months - 1)
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+def main():
+    """Main function"""
+    months = RETENTION_MONTHS
+    if len(sys.argv) > 1:
+        months = int(sys.argv[1])
+    if months < 1:
+        logger.error("Retention must be at least 1 month")
+        sys.exit(1)
+
+    cutoff = retention_cutoff(months)
+    logger.info(f"Removing PDFTOJSON documents older than {cutoff:%Y-%m-%d} ({months} months kept)...")
+
+    try:
+        oracle_manager = OracleManager()
+        # Only the shared cache matters here; app replicas' local entries expire with their TTL
+        document_cache = create_document_cache(0, redis_url=DOCUMENT_CACHE_REDIS_URL)
+        # No-op on unpartitioned tables
+        dropped = oracle_manager.drop_partitions_before(cutoff)
+        document_cache.invalidate_many(dropped['ids'])
+        # Rows in partitions that straddle the cutoff, or everything when unpartitioned
+        result = oracle_manager.delete_documents_before(cutoff)
+        document_cache.invalidate_many(result['ids'])
+        logger.info(
+            f"Retention completed: {dropped['partitions']} partitions dropped, "
+            f"{len(dropped['ids']) + len(result['ids'])} documents and "
+            f"{dropped['files_removed'] + result['files_removed']} files removed"
+        )
+    except Exception as e:
+        logger.error(f"Error during retention: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
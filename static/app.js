@@ -13,6 +13,7 @@ class PDFConverter {
         this.selectFileBtn = document.getElementById('selectFileBtn');
         this.uploadArea = document.getElementById('uploadArea');
         this.uploadBtn = document.getElementById('uploadBtn');
+        this.columnarToggle = document.getElementById('columnarToggle');
         this.fileInfo = document.getElementById('fileInfo');
         this.fileName = document.getElementById('fileName');
         this.fileSize = document.getElementById('fileSize');
@@ -109,7 +110,9 @@ class PDFConverter {
         this.uploadBtn.disabled = true;
 
         try {
-            const response = await fetch(`${this.API_BASE_URL}/document`, {
+            // Formato colunar só quando escolhido: nomes das colunas uma vez por seção (payload menor)
+            const query = this.columnarToggle.checked ? '?format=columnar' : '';
+            const response = await fetch(`${this.API_BASE_URL}/document${query}`, {
                 method: 'POST',
                 body: formData
             });
@@ -117,7 +120,7 @@ class PDFConverter {
             const data = await response.json();
 
             if (response.ok) {
-                this.showSuccess(data);
+                this.showSuccess(this.expandColumnar(data));
                 this.showToast('Arquivo convertido com sucesso!', 'success');
             } else {
                 this.showError(data.error || 'Erro ao processar o arquivo.');
@@ -135,6 +138,27 @@ class PDFConverter {
         }
     }
 
+    expandColumnar(data) {
+        // Converte seções colunares (columns + rows) de volta para objetos por linha
+        if (!data || data.format !== 'columnar' || !Array.isArray(data.sections)) {
+            return data;
+        }
+        const { format, ...rest } = data;
+        rest.sections = data.sections.map(section => {
+            if (!Array.isArray(section.columns)) {
+                return section;
+            }
+            const { columns, rows, ...expanded } = section;
+            expanded.fields = (rows || []).map(row => {
+                const field = {};
+                columns.forEach((column, index) => { field[column] = row[index]; });
+                return field;
+            });
+            return expanded;
+        });
+        return rest;
+    }
+
     showLoading() {
         this.loading.style.display = 'block';
         this.hideResultsAndErrors();
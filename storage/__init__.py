@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Módulo storage: armazenamento dos PDFs processados."""
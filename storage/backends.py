@@ -0,0 +1,423 @@
+import os
+import re
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from storage.compression import (
+    ZSTD_SUFFIX, ZSTD_FRAME_HEADER_SIZE, zstd_available, store_file, resolve_stored_path,
+    open_stored_file, compress_to, decompressing_reader, frame_content_size
+)
+
+try:
+    import boto3
+except ImportError:  # Optional dependency, only needed for the s3 backend
+    boto3 = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; shared files are then only protected by the grace period
+    fcntl = None
+
+S3_SCHEME = 's3://'
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_CACHE_SIZE = 4096
+CONTENT_ADDRESSED_NAME = re.compile(r'^([0-9a-f]{64})\.pdf(?:\.zst)?$')
+# S3 error codes of a missing object (HEAD answers a bare 404)
+S3_NOT_FOUND_CODES = ('404', 'NoSuchKey', 'NotFound')
+# Object headers kept when an object is copied onto itself with MetadataDirective='REPLACE'
+S3_COPIED_HEADERS = ('ContentType', 'ContentEncoding', 'ContentDisposition', 'ContentLanguage',
+                     'CacheControl', 'StorageClass')
+
+
+def stream_sha256(fileobj):
+    """Computes SHA-256 hex digest of a readable binary stream"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stream_length(fileobj):
+    """Counts the bytes of a readable binary stream"""
+    return sum(len(chunk) for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b''))
+
+
+def file_sha256(path):
+    """Computes SHA-256 hex digest of a file"""
+    with open(path, 'rb') as f:
+        return stream_sha256(f)
+
+
+def is_s3_not_found(error):
+    """Whether an S3 client error (botocore ClientError) means the object doesn't exist"""
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in S3_NOT_FOUND_CODES
+
+
+def hash_from_name(path):
+    """Content hash embedded in a content-addressed file name, if any"""
+    match = CONTENT_ADDRESSED_NAME.match(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def shard_key(content_hash, extension='.pdf'):
+    """Content-addressed key: ab/cd/<sha256>.pdf"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{extension}"
+
+
+@contextmanager
+def shard_lock(path):
+    """
+    Exclusive lock on the shard directory of a content-addressed file, held by
+    deduplicating saves and deletes of that content (across processes on the host)
+    """
+    if fcntl is None or not hash_from_name(path):
+        yield
+        return
+    try:
+        fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    except FileNotFoundError:
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+class LocalDocumentStore(ABC):
+    """
+    Base store for files on the local filesystem.
+    Stored paths are relative to the working directory and saved in DOCUMENT_PATH;
+    subclasses define the layout of new files (save).
+    """
+
+    def __init__(self, root='documents', compression='none', compression_level=3):
+        self.root = root
+        self.compression = compression
+        self.compression_level = compression_level
+        self._hash_cache = OrderedDict()
+        self._hash_lock = threading.Lock()
+
+    def ensure_root(self):
+        """Ensure documents folder exists"""
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+            logging.info(f"Folder {self.root} created")
+
+    @abstractmethod
+    def save(self, document_id, filename, source_path):
+        """Store file for a document and return its stored path"""
+
+    def resolve(self, path):
+        """Return existing stored path (plain or compressed) or None"""
+        if not path:
+            return None
+        return resolve_stored_path(path)
+
+    def open(self, path):
+        """Open stored file for reading, decompressed"""
+        return open_stored_file(path)
+
+    def local_file(self, path):
+        """Return path when it can be served directly from disk (plain local file)"""
+        if path.startswith(S3_SCHEME) or path.endswith(ZSTD_SUFFIX):
+            return None
+        return path
+
+    def content_hash(self, path):
+        """
+        SHA-256 of the stored document's original content.
+        Taken from content-addressed names, otherwise computed once per file version.
+        """
+        content_hash = hash_from_name(path)
+        if content_hash:
+            return content_hash
+
+        return self._computed_once(path, 'sha256', stream_sha256)
+
+    def content_length(self, path):
+        """
+        Size of the stored document's original content, without reading it into memory.
+        Taken from the file or its zstd frame header, otherwise counted once per file version.
+        """
+        if not path.endswith(ZSTD_SUFFIX):
+            return os.path.getsize(path)
+        with open(path, 'rb') as f:
+            size = frame_content_size(f.read(ZSTD_FRAME_HEADER_SIZE))
+        if size is not None:
+            return size
+        return self._computed_once(path, 'length', stream_length)
+
+    def _computed_once(self, path, name, compute):
+        """compute(stream) over the stored file's content, cached per file version"""
+        stat = os.stat(path)
+        cache_key = (path, stat.st_mtime_ns, stat.st_size, name)
+        with self._hash_lock:
+            value = self._hash_cache.get(cache_key)
+            if value is not None:
+                self._hash_cache.move_to_end(cache_key)
+                return value
+
+        with self.open(path) as f:
+            value = compute(f)
+
+        with self._hash_lock:
+            self._hash_cache[cache_key] = value
+            if len(self._hash_cache) > HASH_CACHE_SIZE:
+                self._hash_cache.popitem(last=False)
+        return value
+
+    def delete(self, path, min_age=0):
+        """
+        Remove stored file; returns True if something was removed.
+        Content-addressed files stored or reused by an upload in the last min_age
+        seconds are kept: that upload's row may not be committed yet.
+        """
+        with shard_lock(path):
+            path = self.resolve(path)
+            if not path:
+                return False
+            if min_age and hash_from_name(path) and time.time() - os.stat(path).st_mtime < min_age:
+                logging.info(f"Keeping recently used shared file: {path}")
+                return False
+            os.remove(path)
+        logging.info(f"File removed: {path}")
+        self._remove_empty_dirs(os.path.dirname(path))
+        return True
+
+    def _remove_empty_dirs(self, dir_path):
+        """Remove empty directories up to the store root"""
+        root = os.path.abspath(self.root)
+        dir_path = os.path.abspath(dir_path)
+        while dir_path != root and dir_path.startswith(root + os.sep):
+            try:
+                os.rmdir(dir_path)
+                logging.info(f"Directory removed: {dir_path}")
+            except OSError:
+                break  # Directory not empty
+            dir_path = os.path.dirname(dir_path)
+
+
+class FlatDocumentStore(LocalDocumentStore):
+    """Legacy layout: documents/<id>/<filename>"""
+
+    def create_document_directory(self, document_id):
+        """Create specific directory for document"""
+        # Convert to integer to avoid folders with .0
+        document_id_int = int(document_id)
+        document_dir = os.path.join(self.root, str(document_id_int))
+        if not os.path.exists(document_dir):
+            os.makedirs(document_dir)
+            logging.info(f"Directory created: {document_dir}")
+        return document_dir
+
+    def save(self, document_id, filename, source_path):
+        """Save PDF file to the document's own directory"""
+        document_dir = self.create_document_directory(document_id)
+        final_path = os.path.join(document_dir, filename)
+        stored_path = store_file(source_path, final_path, self.compression, self.compression_level)
+        logging.info(f"File saved: {stored_path}")
+        return stored_path
+
+
+class ShardedDocumentStore(LocalDocumentStore):
+    """
+    Content-addressed layout: documents/ab/cd/<sha256>.pdf
+    Identical uploads share a single file.
+    """
+
+    def _suffix(self):
+        """Extension for newly stored files"""
+        if self.compression == 'zstd' and zstd_available():
+            return '.pdf' + ZSTD_SUFFIX
+        return '.pdf'
+
+    def save(self, document_id, filename, source_path):
+        """Save PDF under its content hash, reusing an existing copy"""
+        content_hash = file_sha256(source_path)
+
+        # Reuse any existing copy, compressed or not. Under the shard lock, a delete
+        # of the same content either ran before (no copy left) or sees the new mtime
+        shard_path = os.path.join(self.root, shard_key(content_hash))
+        with shard_lock(shard_path):
+            existing = resolve_stored_path(shard_path)
+            if existing:
+                os.utime(existing)
+                logging.info(f"Deduplicated upload '{filename}': {existing}")
+                return existing
+
+        final_path = os.path.join(self.root, shard_key(content_hash, self._suffix()))
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+        # Write to temporary file then rename so readers never see partial files
+        temp_path = f"{final_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if final_path.endswith(ZSTD_SUFFIX):
+                with open(source_path, 'rb') as source, open(temp_path, 'wb') as dest:
+                    compress_to(source, dest, self.compression_level)
+            else:
+                shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, final_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logging.info(f"File saved: {final_path}")
+        return final_path
+
+
+class S3DocumentStore(LocalDocumentStore):
+    """
+    Content-addressed store on an S3-compatible service (e.g. MinIO).
+    Stored paths look like s3://<bucket>/<prefix>ab/cd/<sha256>.pdf; local paths
+    from earlier layouts are still readable.
+    """
+
+    def __init__(self, bucket, client=None, prefix='', endpoint_url=None, access_key=None,
+                 secret_key=None, region=None, root='documents', compression='none',
+                 compression_level=3):
+        super().__init__(root, compression, compression_level)
+        self.bucket = bucket
+        self.prefix = prefix
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("boto3 is required for the s3 storage backend")
+            client = boto3.client(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region
+            )
+        self.client = client
+
+    def _split(self, path):
+        """Split s3://bucket/key into (bucket, key)"""
+        bucket, _, key = path[len(S3_SCHEME):].partition('/')
+        return bucket, key
+
+    def _head(self, bucket, key):
+        """HEAD of an object, or None when it doesn't exist (other errors are raised)"""
+        try:
+            return self.client.head_object(Bucket=bucket, Key=key)
+        except Exception as e:
+            if is_s3_not_found(e):
+                return None
+            raise
+
+    def _object_exists(self, bucket, key):
+        """Check object existence with a HEAD request"""
+        return self._head(bucket, key) is not None
+
+    def _touch(self, bucket, key, head):
+        """Refresh LastModified with a server-side copy onto itself, keeping metadata and headers"""
+        headers = {name: head[name] for name in S3_COPIED_HEADERS if head.get(name)}
+        self.client.copy_object(Bucket=bucket, Key=key, CopySource={'Bucket': bucket, 'Key': key},
+                                MetadataDirective='REPLACE', Metadata=head.get('Metadata', {}), **headers)
+
+    def save(self, document_id, filename, source_path):
+        """Upload PDF under its content hash, reusing an existing object"""
+        content_hash = file_sha256(source_path)
+        key = self.prefix + shard_key(content_hash)
+
+        for candidate in (key, key + ZSTD_SUFFIX):
+            head = self._head(self.bucket, candidate)
+            if head is not None:
+                # A fresh LastModified makes deletes keep the object (see delete's min_age)
+                self._touch(self.bucket, candidate, head)
+                logging.info(f"Deduplicated upload '{filename}': {candidate}")
+                return f"{S3_SCHEME}{self.bucket}/{candidate}"
+
+        if self.compression == 'zstd' and zstd_available():
+            key += ZSTD_SUFFIX
+            with open(source_path, 'rb') as source, tempfile.TemporaryFile() as body:
+                compress_to(source, body, self.compression_level)
+                body.seek(0)
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=body)
+        else:
+            with open(source_path, 'rb') as body:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+        logging.info(f"File uploaded: {key}")
+        return f"{S3_SCHEME}{self.bucket}/{key}"
+
+    def resolve(self, path):
+        """Return existing stored path or None"""
+        if path and path.startswith(S3_SCHEME):
+            bucket, key = self._split(path)
+            return path if self._object_exists(bucket, key) else None
+        return super().resolve(path)
+
+    def open(self, path):
+        """Open stored object for reading, decompressed"""
+        if path.startswith(S3_SCHEME):
+            bucket, key = self._split(path)
+            body = self.client.get_object(Bucket=bucket, Key=key)['Body']
+            return decompressing_reader(body, key.endswith(ZSTD_SUFFIX))
+        return super().open(path)
+
+    def content_hash(self, path):
+        """SHA-256 of the stored object's original content"""
+        if path.startswith(S3_SCHEME):
+            content_hash = hash_from_name(path)
+            if content_hash:
+                return content_hash
+            with self.open(path) as f:
+                return stream_sha256(f)
+        return super().content_hash(path)
+
+    def content_length(self, path):
+        """Size of the stored object's original content, from HEAD or the zstd frame header"""
+        if path.startswith(S3_SCHEME):
+            bucket, key = self._split(path)
+            if not key.endswith(ZSTD_SUFFIX):
+                return self.client.head_object(Bucket=bucket, Key=key)['ContentLength']
+            header = self.client.get_object(Bucket=bucket, Key=key,
+                                            Range=f'bytes=0-{ZSTD_FRAME_HEADER_SIZE - 1}')['Body'].read()
+            size = frame_content_size(header)
+            if size is None:
+                with self.open(path) as f:
+                    size = stream_length(f)
+            return size
+        return super().content_length(path)
+
+    def delete(self, path, min_age=0):
+        """Remove stored object; returns True if something was removed (recently used objects are kept)"""
+        if path and path.startswith(S3_SCHEME):
+            bucket, key = self._split(path)
+            if min_age:
+                head = self._head(bucket, key)
+                if head is None:
+                    return False
+                if (datetime.now(timezone.utc) - head['LastModified']).total_seconds() < min_age:
+                    logging.info(f"Keeping recently used shared object: {path}")
+                    return False
+            self.client.delete_object(Bucket=bucket, Key=key)
+            logging.info(f"Object removed: {path}")
+            return True
+        return super().delete(path, min_age)
+
+
+def create_document_store(backend='flat', root='documents', compression='none', compression_level=3,
+                          s3_config=None):
+    """Build the configured document store ('flat', 'sharded' or 's3')"""
+    if backend == 'sharded':
+        return ShardedDocumentStore(root, compression, compression_level)
+    if backend == 's3':
+        return S3DocumentStore(root=root, compression=compression, compression_level=compression_level,
+                               **(s3_config or {}))
+    if backend != 'flat':
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return FlatDocumentStore(root, compression, compression_level)
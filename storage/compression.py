@@ -0,0 +1,78 @@
+import os
+import shutil
+import logging
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+ZSTD_SUFFIX = '.zst'
+# Largest zstd frame header, magic number included
+ZSTD_FRAME_HEADER_SIZE = 18
+
+
+def zstd_available():
+    """Checks if zstd compression is available"""
+    return zstandard is not None
+
+
+def store_file(source_path, dest_path, compression='none', level=3):
+    """
+    Copies a file to its final destination, optionally zstd-compressed.
+    Returns the path actually written (with .zst suffix when compressed).
+    """
+    if compression == 'zstd':
+        if zstandard is None:
+            logging.warning("zstandard not installed, storing file uncompressed")
+        else:
+            compressed_path = dest_path + ZSTD_SUFFIX
+            with open(source_path, 'rb') as source, open(compressed_path, 'wb') as dest:
+                compress_to(source, dest, level)
+            return compressed_path
+
+    shutil.copy2(source_path, dest_path)
+    return dest_path
+
+
+def resolve_stored_path(path):
+    """Returns existing path for a stored file, plain or compressed"""
+    if os.path.exists(path):
+        return path
+    if not path.endswith(ZSTD_SUFFIX) and os.path.exists(path + ZSTD_SUFFIX):
+        return path + ZSTD_SUFFIX
+    return None
+
+
+def compress_to(source, dest, level=3):
+    """Compresses a readable binary stream into a writable one with zstd"""
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to compress documents")
+    # Record the original size in the frame header when known (see frame_content_size)
+    try:
+        size = os.fstat(source.fileno()).st_size - source.tell()
+    except (AttributeError, OSError, ValueError):
+        size = -1
+    zstandard.ZstdCompressor(level=level).copy_stream(source, dest, size=size)
+
+
+def frame_content_size(header):
+    """Original size recorded in a zstd frame header, or None when it was not recorded"""
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to read compressed documents")
+    size = zstandard.frame_content_size(header)
+    return size if size >= 0 else None
+
+
+def decompressing_reader(fileobj, compressed):
+    """Wraps a readable binary stream, decompressing it when compressed"""
+    if compressed:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed documents")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True)
+    return fileobj
+
+
+def open_stored_file(path):
+    """Opens stored file for reading, transparently decompressing zstd"""
+    return decompressing_reader(open(path, 'rb'), path.endswith(ZSTD_SUFFIX))
@@ -0,0 +1,129 @@
+import os
+import json
+import logging
+
+# Directories under the documents root that are not document storage
+SKIPPED_DIRS = {'.queue'}
+CHECKPOINT_INTERVAL = 1000
+
+
+def _sort_key(entry):
+    """
+    Sort directory entries so a depth-first walk yields full paths in the same
+    order as a binary ORDER BY on the path strings ('a.pdf' < 'a/x.pdf').
+    """
+    return entry.name + '/' if entry.is_dir(follow_symlinks=False) else entry.name
+
+
+def walk_sorted(root, start_after=None):
+    """
+    Stream stored files under root as paths in binary sort order.
+    Only one directory listing is held at a time per level. Empty directories are
+    yielded as '<dir>/'. Paths <= start_after are skipped without descending into
+    subtrees that were already processed; temporary files are ignored.
+    """
+    yield from _walk(root, start_after, is_root=True)
+
+
+def _walk(directory, start_after, is_root=False):
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=_sort_key)
+    except FileNotFoundError:
+        return
+
+    if not entries:
+        key = directory + '/'
+        if not is_root and (start_after is None or key > start_after):
+            yield key
+        return
+
+    for entry in entries:
+        path = os.path.join(directory, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name in SKIPPED_DIRS:
+                continue
+            prefix = path + '/'
+            # Every descendant of path sorts after prefix; skip finished subtrees
+            if start_after is not None and prefix <= start_after and not start_after.startswith(prefix):
+                continue
+            yield from _walk(path, start_after)
+        else:
+            if start_after is not None and path <= start_after:
+                continue
+            if entry.name.endswith('.tmp'):
+                continue
+            yield path
+
+
+def merge_sorted(stored_paths, referenced_rows):
+    """
+    Merge-join two sorted streams.
+    stored_paths yields paths found on disk; referenced_rows yields (path, id)
+    from the database ordered by path. Yields:
+      ('orphan', path, None)     - stored file or empty directory without a row
+      ('dangling', path, [ids])  - rows whose file does not exist
+      ('ok', path, [ids])        - file with its rows
+    """
+    sentinel = object()
+    stored = iter(stored_paths)
+    rows = iter(referenced_rows)
+    path = next(stored, sentinel)
+    row = next(rows, sentinel)
+
+    while path is not sentinel or row is not sentinel:
+        if row is sentinel or (path is not sentinel and path < row[0]):
+            yield 'orphan', path, None
+            path = next(stored, sentinel)
+            continue
+
+        # Collect every row sharing this path (deduplicated stores)
+        row_path, ids = row[0], []
+        while row is not sentinel and row[0] == row_path:
+            ids.append(row[1])
+            row = next(rows, sentinel)
+
+        if path is not sentinel and path == row_path:
+            yield 'ok', row_path, ids
+            path = next(stored, sentinel)
+        else:
+            yield 'dangling', row_path, ids
+
+
+class ReconcileCheckpoint:
+    """Last fully reconciled path, persisted atomically so long runs can resume"""
+
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._pending = 0
+
+    def load(self):
+        """Return last reconciled path or None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('last_path')
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logging.warning(f"Ignoring unreadable checkpoint {self.path}")
+            return None
+
+    def save(self, last_path):
+        """Write checkpoint (temporary file + rename)"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_path': last_path}, f)
+        os.replace(temp_path, self.path)
+
+    def advance(self, last_path):
+        """Record progress, persisting every `interval` entries"""
+        self._pending += 1
+        if self._pending >= self.interval:
+            self.save(last_path)
+            self._pending = 0
+
+    def clear(self):
+        """Remove checkpoint after a complete run"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,86 @@
+"""Minimal PDF writer for parser tests: Helvetica text and filled rectangles"""
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+FONT_SIZE = 5
+BLUE = (0.098, 0.098, 0.439)
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def page_content(texts=(), rects=()):
+    """
+    Content stream of a page. texts: (text, x0, top); rects: (top, height, color).
+    Coordinates use pdfplumber's top-down convention.
+    """
+    commands = []
+    for top, height, color in rects:
+        commands.append(f"{color[0]} {color[1]} {color[2]} rg 0 {PAGE_HEIGHT - top - height} {PAGE_WIDTH} {height} re f")
+    commands.append("0 0 0 rg")
+    for text, x0, top in texts:
+        encoded = _escape(text).encode('cp1252').decode('latin-1')
+        commands.append(f"BT /F1 {FONT_SIZE} Tf {x0} {PAGE_HEIGHT - top - FONT_SIZE} Td ({encoded}) Tj ET")
+    return '\n'.join(commands).encode('latin-1')
+
+
+def build_pdf(pages, inherited=False, base_font=b'Helvetica'):
+    """
+    PDF bytes with one page per content stream. With inherited, the pages take
+    their MediaBox and Resources from the /Pages node
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base_font,
+    ]
+    attributes = b"/MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >>" % (PAGE_WIDTH, PAGE_HEIGHT)
+    kids = []
+    for content in pages:
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R %s /Contents %d 0 R >>"
+            % (b'' if inherited else attributes, len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d %s >>" % (
+        b' '.join(kids), len(kids), attributes if inherited else b''
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def statement_page(page_num, rows=2):
+    """Coordinate parser page: one blue section with headers and container lines"""
+    top = 170 if page_num == 0 else 80
+    texts = [
+        ('DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS', 7.2, 20),
+        (f'Armazenagem pagina {page_num + 1}', 7.2, top), (f'{rows}', 550, top), ('1.234,56', 710, top),
+        ('Data Inicial', 7.2, top + 12), ('Container', 86.1, top + 12),
+        ('Start Time', 7.2, top + 20), ('Equipment', 86.1, top + 20),
+    ]
+    if page_num == 0:
+        texts += [
+            ('CLIENTE: ACME IMPORTAÇÃO LTDA', 7.2, 40), ('NAVIO: MSC AURORA', 300, 40),
+            ('CNPJ: 12.345.678/0001-99', 7.2, 50), ('DEMONSTRATIVO: 987654', 300, 50),
+            ('ATRAÇÃO: 01/01/2024', 7.2, 60), ('VALOR BRUTO R$: (BRL) 1.234,56', 300, 60),
+        ]
+    for row in range(rows):
+        y = top + 30 + row * 16
+        texts += [
+            (f'{row + 1:02d}/01/2024', 7.2, y), ('02/01/2024', 47.0, y), (f'ABCU{page_num:03d}{row:04d}', 86.1, y),
+            ('12345678000199', 335.0, y), (f'Nota {page_num}-{row}', 600.0, y), ('BRL', 751.3, y), ('100,00', 788.0, y),
+            ('continuacao', 600.0, y + 7),
+        ]
+    return page_content(texts, [(top - 1, 8, BLUE)])
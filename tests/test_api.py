@@ -0,0 +1,147 @@
+import unittest
+import os
+import pickle
+import tempfile
+from io import BytesIO
+
+from pdf2json import ParseError, ParseResult, UnsupportedDocumentError, parse, parse_many
+from pdf2json.document_001 import read_pdf_and_analyze
+from pdf2json.identify_document import analyze_document_by_type
+from tests.sample_pdf import build_pdf, page_content, statement_page
+
+
+def statement(pages=2):
+    """Coordinate parser statement"""
+    return build_pdf([statement_page(page_num) for page_num in range(pages)])
+
+
+def line_document():
+    """Line parser document"""
+    return build_pdf([page_content([('DEMONSTRATIVO DE CÁLCULO', 40, 30), ('Lote: 123', 40, 50)])])
+
+
+class UnseekableStream:
+    """Binary file without seek, like a socket or pipe"""
+
+    def __init__(self, data):
+        self.stream = BytesIO(data)
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+    def seekable(self):
+        return False
+
+
+class TestParse(unittest.TestCase):
+    """Test parsing from paths, bytes and files"""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(statement())
+        self.addCleanup(os.unlink, pdf_file.name)
+        self.path = pdf_file.name
+
+    def test_sources(self):
+        """Test paths, bytes and binary files give the same result"""
+        result = parse(self.path)
+        data = statement()
+
+        self.assertIsInstance(result, ParseResult)
+        self.assertEqual(result.document_type, 'DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS')
+        self.assertEqual(result.source, self.path)
+        self.assertEqual(result.header['Demonstrativo (Draft)'], '987654')
+        self.assertEqual(len(result.sections), 2)
+        for source in (data, BytesIO(data), UnseekableStream(data)):
+            self.assertEqual(parse(source).content, result.content)
+        with open(self.path, 'rb') as pdf_file:
+            pdf_file.read(10)
+            self.assertEqual(parse(pdf_file).content, result.content)
+
+    def test_matches_http_output(self):
+        """Test to_dict() is the document returned by analyze_document_by_type"""
+        result = parse(self.path)
+
+        self.assertEqual(result.to_dict(), analyze_document_by_type(self.path))
+        with open(self.path, 'rb') as pdf_file:
+            self.assertEqual(result.content, read_pdf_and_analyze(pdf_file))
+        self.assertIn(b'"document_type"', result.to_json())
+
+    def test_rows(self):
+        """Test typed table rows"""
+        result = parse(self.path)
+
+        self.assertEqual(result.tables(), ['fields'])
+        rows = list(result.rows('fields', 7))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][0], 7)
+
+    def test_line_document(self):
+        """Test line parser documents are routed to the line parser"""
+        result = parse(line_document())
+
+        self.assertEqual(result.document_type, 'DEMONSTRATIVO DE CÁLCULO')
+        self.assertIn('armazenagem', result.content)
+        self.assertEqual(result.sections, [])
+
+    def test_errors(self):
+        """Test failures raise instead of returning error dicts"""
+        unsupported = build_pdf([page_content([('FATURA COMERCIAL', 40, 30)])])
+
+        with self.assertRaises(UnsupportedDocumentError) as context:
+            parse(unsupported)
+        self.assertIn('FATURA COMERCIAL', str(context.exception))
+        with self.assertRaises(ParseError):
+            parse(b'not a pdf')
+        with self.assertRaises(TypeError):
+            parse(42)
+
+    def test_error_pickle(self):
+        """Test errors keep their source across processes"""
+        error = pickle.loads(pickle.dumps(UnsupportedDocumentError('Document type not recognized', 3)))
+
+        self.assertIsInstance(error, UnsupportedDocumentError)
+        self.assertEqual((str(error), error.source), ('Document type not recognized', 3))
+
+
+class TestParseMany(unittest.TestCase):
+    """Test bulk parsing"""
+
+    def sources(self):
+        return [statement(1), BytesIO(line_document()), statement(3)]
+
+    def test_serial(self):
+        """Test results follow the input order, labelled by index"""
+        results = list(parse_many(self.sources()))
+
+        self.assertEqual([result.source for result in results], [0, 1, 2])
+        self.assertEqual([len(result.sections) for result in results], [1, 0, 3])
+
+    def test_workers(self):
+        """Test worker processes give the serial results in input order"""
+        serial = list(parse_many(self.sources()))
+        parallel = list(parse_many(self.sources() * 2, workers=2))
+
+        self.assertEqual([result.source for result in parallel], list(range(6)))
+        self.assertEqual([result.content for result in parallel], [result.content for result in serial] * 2)
+
+    def test_return_exceptions(self):
+        """Test failed documents are yielded as errors or stop the iteration"""
+        sources = [statement(1), b'not a pdf', statement(1)]
+
+        for workers in (1, 2):
+            results = list(parse_many(sources, workers=workers, return_exceptions=True))
+            self.assertIsInstance(results[1], ParseError)
+            self.assertEqual(results[1].source, 1)
+            self.assertEqual(results[2].source, 2)
+            with self.assertRaises(ParseError):
+                list(parse_many(sources, workers=workers))
+
+    def test_page_cache_in_process(self):
+        """Test a page cache is refused for worker processes"""
+        with self.assertRaises(ValueError):
+            next(parse_many([statement(1)], workers=2, page_cache=object()))
+
+
+if __name__ == '__main__':
+    unittest.main()
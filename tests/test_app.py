@@ -0,0 +1,381 @@
+import unittest
+import tempfile
+import shutil
+import os
+import io
+import json
+from datetime import datetime
+from unittest.mock import patch, Mock
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+import app as app_module
+from pdf2json.tables import arrow_available
+from pdf2json.serialization import msgpack, pa, pq
+from storage.backends import FlatDocumentStore, ShardedDocumentStore, file_sha256
+from storage.compression import zstd_available
+
+# Caches are set up by the serving process (python app.py)
+app_module.init_services()
+
+
+class TestServeDocument(unittest.TestCase):
+    """Test stored PDF download endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.content = b'%PDF-1.4\n' + bytes(range(256)) * 40
+        source = os.path.join(self.temp_dir, 'upload.pdf')
+        with open(source, 'wb') as f:
+            f.write(self.content)
+        self.content_hash = file_sha256(source)
+
+        self.store = ShardedDocumentStore(os.path.join(self.temp_dir, 'documents'))
+        self.document_path = self.store.save(7, 'statement.pdf', source)
+
+        self.oracle_manager = Mock()
+        self.oracle_manager.store = self.store
+        self.oracle_manager.get_document_file_info.return_value = ('statement.pdf', self.document_path)
+        patcher = patch.object(app_module, 'OracleManager', return_value=self.oracle_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_full_download_has_validators(self):
+        """Test strong ETag and long-lived cache headers"""
+        response = self.client.get('/documents/7/statement.pdf')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.content)
+        self.assertEqual(response.headers['ETag'], f'"{self.content_hash}"')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+
+    def test_if_none_match_returns_304(self):
+        """Test revalidation does not resend the file"""
+        with patch.object(self.store, 'open') as mock_open:
+            response = self.client.get(
+                '/documents/7/statement.pdf',
+                headers={'If-None-Match': f'"{self.content_hash}"'}
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        mock_open.assert_not_called()
+
+    def test_range_request(self):
+        """Test partial content for Range requests"""
+        response = self.client.get('/documents/7/statement.pdf', headers={'Range': 'bytes=100-199'})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[100:200])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 100-199/{len(self.content)}')
+
+    @unittest.skipUnless(zstd_available(), "zstandard not installed")
+    def test_compressed_file_is_streamed(self):
+        """Test compressed files are streamed, with Range offsets from the original size"""
+        compressed_store = ShardedDocumentStore(os.path.join(self.temp_dir, 'compressed'), compression='zstd')
+        compressed_path = compressed_store.save(8, 'statement.pdf', os.path.join(self.temp_dir, 'upload.pdf'))
+        self.oracle_manager.store = compressed_store
+        self.oracle_manager.get_document_file_info.return_value = ('statement.pdf', compressed_path)
+
+        full = self.client.get('/documents/8/statement.pdf')
+        partial = self.client.get('/documents/8/statement.pdf', headers={'Range': 'bytes=5000-5099'})
+
+        self.assertTrue(full.is_streamed)
+        self.assertEqual(full.data, self.content)
+        self.assertEqual(full.headers['Content-Length'], str(len(self.content)))
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.data, self.content[5000:5100])
+        self.assertEqual(partial.headers['Content-Range'], f'bytes 5000-5099/{len(self.content)}')
+
+    def test_filename_must_match_database_row(self):
+        """Test URL filename is checked against the stored document"""
+        response = self.client.get('/documents/7/other.pdf')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_document(self):
+        """Test missing document row"""
+        self.oracle_manager.get_document_file_info.return_value = None
+
+        response = self.client.get('/documents/8/statement.pdf')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_legacy_flat_file_etag(self):
+        """Test ETag of files stored without a content-addressed name"""
+        flat_store = FlatDocumentStore(os.path.join(self.temp_dir, 'documents'))
+        legacy_path = flat_store.save(9, 'old.pdf', self.document_path)
+        self.oracle_manager.store = flat_store
+        self.oracle_manager.get_document_file_info.return_value = ('old.pdf', legacy_path)
+
+        response = self.client.get('/documents/9/old.pdf')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['ETag'], f'"{self.content_hash}"')
+
+
+class TestGetDocument(unittest.TestCase):
+    """Test cached document endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.oracle_manager = Mock()
+        self.oracle_manager.get_document_by_id.return_value = {'id': 5, 'content': {'header': {}}}
+        patcher = patch.object(app_module, 'OracleManager', return_value=self.oracle_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app_module.document_cache.clear()
+        self.addCleanup(app_module.document_cache.clear)
+
+        self.client = app_module.app.test_client()
+
+    def test_repeated_gets_hit_cache(self):
+        """Test Oracle is queried once for repeated reads"""
+        first = self.client.get('/documents/5')
+        second = self.client.get('/documents/5')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json, {'id': 5, 'content': {'header': {}}})
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.oracle_manager.get_document_by_id.assert_called_once_with(5)
+
+    def test_conditional_get(self):
+        """Test If-None-Match returns 304"""
+        etag = self.client.get('/documents/5').headers['ETag']
+
+        response = self.client.get('/documents/5', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_columnar_variant(self):
+        """Test ?format=columnar is converted and cached separately"""
+        self.oracle_manager.get_document_by_id.return_value = {
+            'id': 5,
+            'content': {'sections': [{'Title': 'T', 'fields': [{'a': 1}]}]}
+        }
+
+        columnar = self.client.get('/documents/5?format=columnar')
+        plain = self.client.get('/documents/5')
+
+        self.assertEqual(columnar.json['content']['sections'][0]['rows'], [[1]])
+        self.assertEqual(plain.json['content']['sections'][0]['fields'], [{'a': 1}])
+        self.assertEqual(self.client.get('/documents/5?format=xml').status_code, 400)
+
+    @unittest.skipUnless(arrow_available(), "pyarrow not installed")
+    def test_arrow_and_parquet(self):
+        """Test Accept selects a flattened table as Arrow stream or Parquet"""
+        self.oracle_manager.get_document_by_id.return_value = {
+            'id': 5,
+            'content': {'sections': [{'Title': 'T', 'fields': [{'Doc': 'A1'}, {'Doc': 'A2'}]}]}
+        }
+
+        arrow = self.client.get('/documents/5', headers={'Accept': 'application/vnd.apache.arrow.stream'})
+        parquet = self.client.get('/documents/5', headers={'Accept': 'application/vnd.apache.parquet'})
+
+        self.assertEqual(arrow.mimetype, 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(arrow.data).read_all()
+        self.assertEqual(table.column('Doc').to_pylist(), ['A1', 'A2'])
+        self.assertEqual(table.column('document_id').to_pylist(), [5, 5])
+        self.assertEqual(pq.read_table(io.BytesIO(parquet.data)).num_rows, 2)
+        self.assertIn('Accept', arrow.headers['Vary'])
+
+    @unittest.skipUnless(msgpack, "msgpack not installed")
+    def test_msgpack(self):
+        """Test MessagePack representation of the document"""
+        response = self.client.get('/documents/5', headers={'Accept': 'application/msgpack'})
+
+        self.assertEqual(msgpack.unpackb(response.data), {'id': 5, 'content': {'header': {}}})
+
+    def test_delete_invalidates_cache(self):
+        """Test deleted documents are not served from cache"""
+        self.client.get('/documents/5')
+        self.oracle_manager.delete_document.return_value = True
+        self.client.delete('/documents/5')
+        self.oracle_manager.get_document_by_id.return_value = None
+
+        response = self.client.get('/documents/5')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestListDocuments(unittest.TestCase):
+    """Test document listing filters"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.oracle_manager = Mock()
+        self.oracle_manager.get_all_documents.return_value = []
+        patcher = patch.object(app_module, 'OracleManager', return_value=self.oracle_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = app_module.app.test_client()
+
+    def test_date_range_filter(self):
+        """Test date range and type are passed to the partition-pruned query"""
+        response = self.client.get('/documents?date_from=2025-01-01&date_to=2025-02-01&document_type=002')
+
+        self.assertEqual(response.status_code, 200)
+        self.oracle_manager.get_all_documents.assert_called_once_with(
+            limit=50,
+            date_from=datetime(2025, 1, 1),
+            date_to=datetime(2025, 2, 1),
+            document_type='002'
+        )
+
+    def test_invalid_date(self):
+        """Test malformed dates are rejected"""
+        response = self.client.get('/documents?date_from=yesterday')
+
+        self.assertEqual(response.status_code, 400)
+        self.oracle_manager.get_all_documents.assert_not_called()
+
+
+class TestPurgeDocuments(unittest.TestCase):
+    """Test bulk delete endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.oracle_manager = Mock()
+        self.oracle_manager.delete_documents_before.return_value = {'ids': [3, 4], 'files_removed': 1}
+        patcher = patch.object(app_module, 'OracleManager', return_value=self.oracle_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app_module.document_cache.clear()
+        self.addCleanup(app_module.document_cache.clear)
+
+        self.client = app_module.app.test_client()
+
+    def test_purge_before_date(self):
+        """Test documents older than cutoff are removed and evicted from cache"""
+        app_module.document_cache.set(3, b'{}')
+        app_module.document_cache.set(5, b'{}')
+
+        response = self.client.delete('/documents?before=2024-01-01')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {'deleted': 2, 'files_removed': 1})
+        self.oracle_manager.delete_documents_before.assert_called_once_with(datetime(2024, 1, 1), None)
+        self.assertIsNone(app_module.document_cache.get(3))
+        self.assertIsNotNone(app_module.document_cache.get(5))
+
+    def test_before_is_required(self):
+        """Test bulk delete without cutoff is rejected"""
+        response = self.client.delete('/documents')
+
+        self.assertEqual(response.status_code, 400)
+        self.oracle_manager.delete_documents_before.assert_not_called()
+
+
+class TestExportDocuments(unittest.TestCase):
+    """Test streaming export endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.stream_export = Mock(return_value=iter([
+            [('ID', None, None, None, None, None, False), ('DESCRICAO', None, None, None, None, None, True)],
+            [(1, 'Pesagem'), (2, 'Lavagem')],
+        ]))
+        patcher = patch.object(app_module, 'stream_export', self.stream_export)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(app_module, 'OracleManager')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = app_module.app.test_client()
+
+    def test_export_csv(self):
+        """Test export streams CSV as an attachment with filters passed through"""
+        response = self.client.get('/exports/fields?format=csv&document_type=001&date_from=2024-01-01')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('fields.csv', response.headers['Content-Disposition'])
+        self.assertEqual(response.data.decode().splitlines(), ['id,descricao', '1,Pesagem', '2,Lavagem'])
+        kwargs = self.stream_export.call_args.kwargs
+        self.assertEqual(kwargs['document_type'], '001')
+        self.assertEqual(kwargs['date_from'], datetime(2024, 1, 1))
+
+    def test_unknown_export_and_format(self):
+        """Test unknown export names and formats are rejected before querying"""
+        self.assertEqual(self.client.get('/exports/unknown').status_code, 404)
+        self.assertEqual(self.client.get('/exports/lotes?format=xml').status_code, 400)
+        self.stream_export.assert_not_called()
+
+    def test_query_error(self):
+        """Test query failures return 500 instead of a truncated stream"""
+        def failing_export():
+            raise RuntimeError("ORA-00942")
+            yield
+
+        self.stream_export.return_value = failing_export()
+
+        response = self.client.get('/exports/lotes')
+
+        self.assertEqual(response.status_code, 500)
+
+
+class TestAnalyzeDocument(unittest.TestCase):
+    """Test upload endpoint serialization"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.result = {'document_type': 'DEMONSTRATIVO DE CÁLCULO', 'header': {'Lote': '123'}}
+        self.oracle_manager = Mock()
+        self.oracle_manager.insert_pdf_document.return_value = (11, 'documents/11/a.pdf')
+        for target, value in (('OracleManager', self.oracle_manager),
+                              ('analyze_document_by_type', dict(self.result))):
+            patcher = patch.object(app_module, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.client = app_module.app.test_client()
+
+    def test_same_serialization_for_database_and_response(self):
+        """Test the stored CLOB and the response share one serialization"""
+        response = self.client.post(
+            '/document',
+            data={'file': (io.BytesIO(b'%PDF-1.4'), 'a.pdf')},
+            content_type='multipart/form-data'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        stored = self.oracle_manager.insert_pdf_document.call_args.kwargs['json_content']
+        self.assertEqual(json.loads(stored), self.result)
+        self.assertTrue(response.data.startswith(stored[:-1].encode('utf-8')))
+        self.assertEqual(response.json['database_id'], 11)
+        self.assertEqual(response.json['file_path'], 'documents/11/a.pdf')
+        self.assertEqual(response.json['header'], {'Lote': '123'})
+
+    def test_columnar_upload(self):
+        """Test ?format=columnar stores and returns the compact format"""
+        app_module.analyze_document_by_type.return_value = {
+            'document_type': 'DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS',
+            'sections': [{'Title': 'T', 'fields': [{'a': 1}, {'a': 2}]}]
+        }
+
+        response = self.client.post(
+            '/document?format=columnar',
+            data={'file': (io.BytesIO(b'%PDF-1.4'), 'a.pdf')},
+            content_type='multipart/form-data'
+        )
+
+        stored = json.loads(self.oracle_manager.insert_pdf_document.call_args.kwargs['json_content'])
+        self.assertEqual(stored['format'], 'columnar')
+        self.assertEqual(stored['sections'][0]['rows'], [[1], [2]])
+        self.assertEqual(response.json['sections'][0]['columns'], ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+from io import BytesIO
+
+from pdf2json.backends import crop_objects, open_pdf, pdfium
+from pdf2json.document_001 import page_regions, read_pdf_and_analyze
+from pdf2json.document_002 import PDFLineParser
+from tests.sample_pdf import BLUE, build_pdf, page_content, statement_page
+
+CHAR_KEYS = ('x0', 'x1', 'top', 'bottom', 'doctop', 'size')
+
+
+def line_parser_page():
+    """Free text lines with accents, symbols, wide gaps and mixed sizes"""
+    return page_content([
+        ('DEMONSTRATIVO DE CÁLCULO', 40, 30),
+        ('CAPA: 123 DEMONSTRATIVO: 456 NOTA FISCAL: 789', 40, 50),
+        ('Regime: Importação', 40, 60), ('Tarifa 01: R$ 1.234,56', 300, 60),
+        ('(parênteses) e \\barra/ 50%', 40, 70),
+        ('Início', 40, 80), ('Final', 120, 80), ('Período', 200, 80.4),
+    ], [(90, 0.5, (0, 0, 0))])
+
+
+@unittest.skipUnless(pdfium is not None, "pypdfium2 not installed")
+class TestPdfiumBackend(unittest.TestCase):
+    """Equivalence of the pdfium backend with pdfplumber"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.pdf_bytes = build_pdf([statement_page(page_num) for page_num in range(3)] + [line_parser_page()])
+
+    def assert_same_pages(self, source):
+        with open_pdf(BytesIO(source), 'pdfplumber') as expected_pdf, open_pdf(BytesIO(source), 'pdfium') as pdf:
+            self.assertEqual(len(pdf.pages), len(expected_pdf.pages))
+            for expected_page, page in zip(expected_pdf.pages, pdf.pages):
+                self.assertEqual([char['text'] for char in page.chars], [char['text'] for char in expected_page.chars])
+                for expected_char, char in zip(expected_page.chars, page.chars):
+                    for key in CHAR_KEYS:
+                        self.assertAlmostEqual(char[key], expected_char[key], places=4, msg=key)
+                    self.assertEqual(char['upright'], expected_char['upright'])
+                    self.assertEqual(char['fontname'], expected_char['fontname'])
+
+                self.assertEqual(
+                    [(rect['top'], rect['bottom'], rect['x0'], rect['x1']) for rect in page.rects],
+                    [(rect['top'], rect['bottom'], rect['x0'], rect['x1']) for rect in expected_page.rects]
+                )
+                self.assertEqual(page.extract_text(), expected_page.extract_text())
+
+    def test_chars_rects_and_text(self):
+        """Test chars, rects and extracted text match pdfplumber"""
+        self.assert_same_pages(self.pdf_bytes)
+
+    def test_section_color(self):
+        """Test fill colors are reported as written in the content stream"""
+        with open_pdf(BytesIO(self.pdf_bytes), 'pdfium') as pdf:
+            self.assertEqual(pdf.pages[0].rects[0]['non_stroking_color'], BLUE)
+
+    def test_scaled_text_matrix(self):
+        """Test size and coordinates when the font size comes from the text matrix"""
+        content = b"BT /F1 1 Tf 5 0 0 5 10 500 Tm (Ag/x) Tj ET\nBT /F1 10 Tf 0.5 0 0 0.5 10 400 Tm (Ag/x) Tj ET"
+        self.assert_same_pages(build_pdf([content]))
+
+    def test_lines_and_transforms(self):
+        """Test stroked lines, rects under a transformed CTM and curves left out"""
+        content = (
+            b"0.098 0.098 0.439 RG 1 w 10 300 m 800 300 l S\n"
+            b"q 1 0 0 1 0 -50 cm 0 0 1 rg 20 100 50 10 re f 10 200 m 100 200 l S Q\n"
+            b"10 10 m 20 20 l 30 10 l h f"
+        )
+        pdf_bytes = build_pdf([content])
+        with open_pdf(BytesIO(pdf_bytes), 'pdfplumber') as expected_pdf, open_pdf(BytesIO(pdf_bytes), 'pdfium') as pdf:
+            expected_page, page = expected_pdf.pages[0], pdf.pages[0]
+            self.assertEqual(
+                [(line['top'], line['x0'], line['x1']) for line in page.lines],
+                [(line['top'], line['x0'], line['x1']) for line in expected_page.lines]
+            )
+            self.assertEqual(
+                [(rect['top'], rect['bottom'], rect['x0'], rect['x1']) for rect in page.rects],
+                [(rect['top'], rect['bottom'], rect['x0'], rect['x1']) for rect in expected_page.rects]
+            )
+            self.assertEqual(page.lines[0]['stroking_color'], BLUE)
+
+    def test_cropped_objects(self):
+        """Test objects of a region match pdfplumber, whether or not the page was extracted"""
+        with open_pdf(BytesIO(self.pdf_bytes), 'pdfplumber') as expected_pdf, open_pdf(BytesIO(self.pdf_bytes), 'pdfium') as pdf:
+            for page_num, (expected_page, page) in enumerate(zip(expected_pdf.pages, pdf.pages)):
+                regions = page_regions(page_num)
+                expected = crop_objects(expected_page, *regions)
+                cropped = crop_objects(page, *regions)
+                self.assertLess(len(cropped.chars), len(page.chars))
+                self.assertEqual(crop_objects(page, *regions), cropped)
+                self.assertEqual([char['text'] for char in cropped.chars], [char['text'] for char in expected.chars])
+                self.assertEqual([rect['top'] for rect in cropped.rects], [rect['top'] for rect in expected.rects])
+
+    def test_coordinate_parser(self):
+        """Test the coordinate parser returns the same document with both backends"""
+        expected = read_pdf_and_analyze(BytesIO(self.pdf_bytes))
+        result = read_pdf_and_analyze(BytesIO(self.pdf_bytes), backend='pdfium')
+
+        self.assertEqual(len(expected['sections']), 3)
+        self.assertEqual(result, expected)
+
+    def test_line_parser_text(self):
+        """Test the line parser reads the same lines with both backends"""
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(self.pdf_bytes)
+        self.addCleanup(os.unlink, pdf_file.name)
+
+        expected = PDFLineParser().extract_text_by_lines(pdf_file.name)
+        lines = PDFLineParser(backend='pdfium').extract_text_by_lines(pdf_file.name)
+
+        self.assertIn('Regime: Importação Tarifa 01: R$ 1.234,56', lines)
+        self.assertEqual(lines, expected)
+
+    def test_unknown_backend(self):
+        """Test unknown backend names are rejected"""
+        with self.assertRaises(ValueError):
+            open_pdf(BytesIO(self.pdf_bytes), 'pdfminer')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import json
+
+from pdf2json.columnar import to_columnar, to_rows, convert, is_columnar
+from pdf2json.document_001 import HEADER_MAPPING
+
+
+class TestColumnarFormat(unittest.TestCase):
+    """Test compact columnar section rows"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        columns = list(HEADER_MAPPING)
+        self.document = {
+            'document_type': 'DEMONSTRATIVO DE CÁLCULO DE SERVIÇOS',
+            'header': {'Cliente (Customer)': 'ACME'},
+            'sections': [{
+                'Quantidade (Quantity)': 2,
+                'Title': 'ARMAZENAGEM',
+                'Total': 10.5,
+                'fields': [
+                    {column: f"{column} value" for column in columns},
+                    {column: None for column in columns}
+                ]
+            }]
+        }
+
+    def test_columns_once_per_section(self):
+        """Test column names are emitted once and rows as arrays"""
+        columnar = to_columnar(self.document)
+        section = columnar['sections'][0]
+
+        self.assertTrue(is_columnar(columnar))
+        self.assertEqual(section['columns'], list(HEADER_MAPPING))
+        self.assertEqual(section['rows'][1], [None] * len(HEADER_MAPPING))
+        self.assertNotIn('fields', section)
+        self.assertEqual(section['Title'], 'ARMAZENAGEM')
+        self.assertLess(len(json.dumps(columnar)), len(json.dumps(self.document)))
+
+    def test_round_trip(self):
+        """Test columnar converts back to the row-object format"""
+        self.assertEqual(to_rows(to_columnar(self.document)), self.document)
+        self.assertIs(to_rows(self.document), self.document)
+        self.assertEqual(convert(self.document, 'columnar'), to_columnar(self.document))
+
+    def test_documents_without_sections(self):
+        """Test line-parser results are left as they are"""
+        document = {'document_type': 'DEMONSTRATIVO DE CÁLCULO', 'armazenagem': {'fields': []}}
+
+        self.assertIs(to_columnar(document), document)
+
+    def test_unknown_format(self):
+        """Test invalid format names"""
+        with self.assertRaises(ValueError):
+            convert(self.document, 'csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
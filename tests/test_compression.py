@@ -0,0 +1,51 @@
+import unittest
+import tempfile
+import shutil
+import os
+
+from storage.compression import store_file, resolve_stored_path, open_stored_file, zstd_available, ZSTD_SUFFIX
+
+
+class TestStorageCompression(unittest.TestCase):
+    """Test compressed PDF storage helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, 'source.pdf')
+        self.content = b'%PDF-1.4\n' + b'0 0 m 10 10 l S\n' * 500
+        with open(self.source, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_store_uncompressed(self):
+        """Test plain copy when compression is disabled"""
+        dest = os.path.join(self.temp_dir, 'doc.pdf')
+        stored = store_file(self.source, dest, 'none')
+
+        self.assertEqual(stored, dest)
+        with open_stored_file(stored) as f:
+            self.assertEqual(f.read(), self.content)
+
+    @unittest.skipUnless(zstd_available(), "zstandard not installed")
+    def test_store_zstd_round_trip(self):
+        """Test zstd storage is smaller and transparently decompressed"""
+        dest = os.path.join(self.temp_dir, 'doc.pdf')
+        stored = store_file(self.source, dest, 'zstd')
+
+        self.assertEqual(stored, dest + ZSTD_SUFFIX)
+        self.assertLess(os.path.getsize(stored), len(self.content))
+        self.assertEqual(resolve_stored_path(dest), stored)
+        with open_stored_file(stored) as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_resolve_missing(self):
+        """Test resolving a file that was never stored"""
+        self.assertIsNone(resolve_stored_path(os.path.join(self.temp_dir, 'missing.pdf')))
+
+
+if __name__ == '__main__':
+    unittest.main()
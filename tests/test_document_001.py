@@ -0,0 +1,289 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import Mock, patch
+
+from pdf2json.document_001 import (
+    BLUE_COLOR, DEFAULT_LAYOUT, HEADER_MAPPING, LAYOUT_PROFILE, PageChars, calibrate_columns, classify_line,
+    column_layout, extract_data_with_header_mapping, page_pool, page_ranges, page_regions, reference_labels
+)
+from pdf2json.backends import crop_objects
+from pdf2json.records import ContainerRow
+from tests.sample_pdf import build_pdf, statement_page
+
+CHAR_WIDTH = 3.0
+
+
+def word(text, x0, top):
+    """Characters of a word as pdfplumber char dicts"""
+    return [
+        {'text': char, 'x0': x0 + i * CHAR_WIDTH, 'x1': x0 + (i + 1) * CHAR_WIDTH, 'top': top}
+        for i, char in enumerate(text)
+    ]
+
+
+def blue_rect(top):
+    """Section background rectangle"""
+    return {'x0': 0.0, 'top': top, 'non_stroking_color': (0.098, 0.098, 0.439)}
+
+
+def section_lines(title, top, quantity, total):
+    """Section title row followed by the Portuguese and English header rows"""
+    return (
+        word(title, 7.2, top) + word(f"Qtd {quantity}", 545.0, top) + word(f"Total {total}", 705.0, top)
+        + word('Data Inicial', 7.2, top + 10) + word('Container', 86.1, top + 10)
+        + word('Start Time', 7.2, top + 20) + word('Equipment', 86.1, top + 20)
+    )
+
+
+def data_row(top, start, container, cnpj, notes, value):
+    """One container line"""
+    return (
+        word(start, 7.2, top) + word('02/01/2024', 47.0, top) + word(container, 86.1, top)
+        + word(cnpj, 335.0, top) + word(notes, 600.0, top) + word('BRL', 751.3, top) + word(value, 788.0, top)
+    )
+
+
+def page(chars, rects, lines=()):
+    """pdfplumber page double"""
+    return Mock(chars=chars, rects=list(rects), lines=list(lines), width=842, height=595)
+
+
+def first_page():
+    """Two sections, a continuation line and characters out of reading order"""
+    chars = word('CLIENTE: ACME', 7.2, 100.0)
+    chars += section_lines('Armazenagem 1 periodo', 170.0, 2, '1.234,56')
+    chars += data_row(200.04, '01/01/2024', 'ABCU1234567', '12345678000199', 'Primeira', '100,00')
+    # Continuation of the first row, split across two rounded tops
+    chars += word('linha', 600.0, 205.0) + word('dois', 618.0, 204.96)
+    chars += list(reversed(data_row(215.0, '03/01/2024', 'MSCU7654321', '98765432000155', 'Segunda', '50,00')))
+    # Blue row without a known section title continues the current section
+    chars += word('Outros', 7.2, 240.0)
+    chars += section_lines('Scanner', 260.0, 1, '10,00')
+    chars += data_row(290.0, '04/01/2024', 'TGHU0000001', '11222333000181', 'Scanner', '10,00')
+    # Line without CNPJ is not a new record: continues the previous one
+    chars += word('05/01/2024', 7.2, 300.0) + word('XXXU0000002', 86.1, 300.0)
+    chars += word('Pagina 1', 700.0, 520.0)
+    rects = [blue_rect(170.0), blue_rect(240.0), {'x0': 0.0, 'top': 290.0, 'non_stroking_color': (1, 1, 1)}]
+    lines = [{'x0': 0.0, 'top': 260.0, 'stroking_color': (0.098, 0.098, 0.439)}]
+    return page(chars, rects, lines)
+
+
+def second_page():
+    """Section continued after the page header"""
+    chars = word('Repasse', 7.2, 50.0)
+    chars += section_lines('Repasse', 80.0, 1, '5,00')
+    chars += data_row(110.0, '06/01/2024', 'CAIU1111111', '55666777000199', 'Repasse', '5,00')
+    # Summary line ends the record
+    chars += word('Total', 7.2, 118.0)
+    return page(chars, [blue_rect(50.0), blue_rect(80.0)])
+
+
+def parse(*pages, calibrate=False):
+    """Runs the coordinate parser over page doubles"""
+    with patch('pdfplumber.open') as mock_open:
+        mock_open.return_value.__enter__.return_value.pages = list(pages)
+        return extract_data_with_header_mapping('dummy.pdf', calibrate=calibrate)
+
+
+def expected_row(start, container, cnpj, notes, value):
+    """Parsed container line"""
+    row = dict.fromkeys([
+        'Data Inicial (Start Time)', 'Data Final (End Time)', 'Container (Equipment ID)', 'Categoria (Category)',
+        'Armador (Line)', 'Manifesto Carga BL / Booking', 'Importador/Exportador (Consignee / Shipper)',
+        'CNPJ / CPF (ID)', 'DT / DTA', 'GMCI / GRCI', 'Doc', 'Referência (Reference)', 'DIAS (Days)',
+        'Observacoes (Notes)', 'Moeda (Currency)', 'Valor (Unit Value)'
+    ])
+    row.update({
+        'Data Inicial (Start Time)': start,
+        'Data Final (End Time)': '02/01/2024',
+        'Container (Equipment ID)': container,
+        'CNPJ / CPF (ID)': cnpj,
+        'Observacoes (Notes)': notes,
+        'Moeda (Currency)': 'BRL',
+        'Valor (Unit Value)': value,
+    })
+    return row
+
+
+class TestCoordinateParser(unittest.TestCase):
+    """Test section and row extraction of the coordinate parser"""
+
+    def test_blue_color_constant(self):
+        """Test section color matches the string form of pdfplumber colors"""
+        self.assertEqual(str((0.098, 0.098, 0.439)), BLUE_COLOR)
+
+    def test_sections_and_rows(self):
+        """Test sections, continuation lines, reading order and page boundaries"""
+        result = parse(first_page(), second_page())
+
+        self.assertEqual([section['Title'] for section in result], ['Armazenagem 1 periodo', 'Scanner', 'Repasse'])
+        self.assertEqual(result[0]['Quantidade (Quantity)'], 2)
+        self.assertEqual(result[0]['Total'], 1234.56)
+        self.assertEqual(result[1]['Total'], 10.0)
+        self.assertEqual(result[0]['fields'], [
+            expected_row('01/01/2024', 'ABCU1234567', '12345678000199', 'Primeira linhadois', '100,00'),
+            expected_row('03/01/2024 Outros', 'MSCU7654321', '98765432000155', 'Segunda', '50,00'),
+        ])
+        self.assertEqual(result[1]['fields'], [
+            expected_row('04/01/2024 05/01/2024', 'TGHU0000001 XXXU0000002', '11222333000181', 'Scanner', '10,00'),
+        ])
+        self.assertEqual(result[2]['fields'], [
+            expected_row('06/01/2024', 'CAIU1111111', '55666777000199', 'Repasse', '5,00'),
+        ])
+        self.assertIsInstance(result[0]['fields'][0], ContainerRow)
+
+    def test_line_records(self):
+        """Test lines are grouped by rounded top and materialized once in reading order"""
+        chars = word('cd', 20.0, 10.04) + word('AB', 5.0, 9.96) + word('x', 1.0, 30.0)
+        page_chars = PageChars(chars)
+
+        self.assertEqual([(line.y, line.text) for line in page_chars.lines],
+                         [(10.0, 'ABcd'), (30.0, 'x')])
+        self.assertEqual(page_chars.text_between(0, 20.0, 23.0), 'cd')
+        with self.assertRaises(AttributeError):
+            page_chars.lines[0].text = 'changed'
+
+    def test_classify_line(self):
+        """Test header keywords: case-sensitive per language, case-insensitive for header lines"""
+        self.assertEqual(classify_line('Data Inicial Container'), (True, False, True))
+        self.assertEqual(classify_line('Start Time Equipment'), (False, True, True))
+        self.assertEqual(classify_line('TOTAL GERAL'), (False, False, True))
+        self.assertEqual(classify_line('AmountTotal 1.234,56'), (False, False, False))
+        self.assertEqual(classify_line('01/01/2024 ABCU1234567'), (False, False, False))
+
+    def test_page_regions(self):
+        """Test the data region of the layout profile, per page"""
+        char_bbox, shape_bbox = page_regions(0)
+        self.assertEqual(char_bbox[1:], (159.0, 856.0, 515.0))
+        self.assertEqual(shape_bbox[1::2], (154.0, 520.0))
+        self.assertEqual(page_regions(1)[0][1], 67.5)
+        self.assertEqual(page_regions(1, LAYOUT_PROFILE._replace(other_pages_top=90.0))[0][1], 90.0)
+
+    def test_cropped_objects(self):
+        """Test letterhead, footer and right margin objects are left out without changing rows"""
+        test_page = first_page()
+        test_page.chars += word('Letterhead Container', 7.2, 20.0) + word('Total', 860.0, 200.04)
+        test_page.rects.append(blue_rect(530.0))
+
+        chars, lines, rects = crop_objects(test_page, *page_regions(0))
+
+        self.assertEqual(min(char['top'] for char in chars), 170.0)
+        self.assertEqual(max(char['top'] for char in chars), 300.0)
+        self.assertLessEqual(max(char['x0'] for char in chars), 856.0)
+        self.assertEqual([rect['top'] for rect in rects], [170.0, 240.0, 290.0])
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(parse(test_page), parse(first_page()))
+
+    def test_page_without_sections(self):
+        """Test pages without blue section rows produce no data"""
+        self.assertEqual(parse(page(word('CLIENTE: ACME', 7.2, 100.0), [])), [])
+
+
+def shifted(chars, dx):
+    """Characters moved dx points to the right"""
+    return [dict(char, x0=char['x0'] + dx, x1=char['x1'] + dx) for char in chars]
+
+
+# Labels centred over their columns, as on templates whose labels do not start at the column x0
+CENTRED_LABELS = {'Data Inicial (Start Time)': 4.8, 'Container (Equipment ID)': 5.9, 'Valor (Unit Value)': 7.0}
+
+
+def template_page(dx, label_offsets=None):
+    """One section of a template whose columns moved dx points to the right"""
+    chars = word('Armazenagem', 7.2, 170.0) + word('Total 100,00', 705.0, 170.0)
+    chars += shifted(word('Data Inicial', 7.2, 180.0) + word('Container', 86.1, 180.0), dx)
+    for field_name, coords in HEADER_MAPPING.items():
+        if '(' in field_name:
+            label_x0 = coords['x0'] + (label_offsets or {}).get(field_name, 0.0) + dx
+            chars += word(field_name.split('(')[1].rstrip(')'), label_x0, 190.0)
+    chars += shifted(data_row(200.0, '01/01/2024', 'ABCU1234567', '12345678000199', 'Nota', '100,00'), dx)
+    return page(chars, [blue_rect(170.0)])
+
+
+class TestColumnCalibration(unittest.TestCase):
+    """Test columns derived from the English header row of the template"""
+
+    def test_reference_template(self):
+        """Test the reference template keeps the hand-tuned columns"""
+        page_chars = PageChars(template_page(0).chars)
+        self.assertIs(column_layout(page_chars, 2, (842, 595)), DEFAULT_LAYOUT)
+
+    def test_disabled_by_default(self):
+        """Test labels away from the column x0 do not move the columns unless calibration is on"""
+        expected = [expected_row('01/01/2024', 'ABCU1234567', '12345678000199', 'Nota', '100,00')]
+
+        self.assertEqual(parse(template_page(0, CENTRED_LABELS))[0]['fields'], expected)
+        self.assertNotEqual(parse(template_page(0, CENTRED_LABELS), calibrate=True)[0]['fields'], expected)
+
+    def test_recorded_reference(self):
+        """Test shifts are measured against the recorded label positions, not the column x0"""
+        reference = reference_labels(PageChars(template_page(0, CENTRED_LABELS).chars), 2)
+
+        self.assertEqual(reference[0], 12.0)
+        self.assertIsNone(reference[5])
+        self.assertIs(column_layout(PageChars(template_page(0, CENTRED_LABELS).chars), 2, (842, 595), reference),
+                      DEFAULT_LAYOUT)
+        layout = column_layout(PageChars(template_page(8, CENTRED_LABELS).chars), 2, (842, 595), reference)
+        self.assertEqual(layout.x0.tolist()[:3], [15.2, 55.0, 94.1])
+
+    def test_moved_template(self):
+        """Test rows of a template moved to the right still fill their columns"""
+        result = parse(template_page(8), calibrate=True)
+
+        self.assertEqual(result[0]['fields'], [
+            expected_row('01/01/2024', 'ABCU1234567', '12345678000199', 'Nota', '100,00')
+        ])
+        layout = column_layout(PageChars(template_page(8).chars), 2, (842, 595))
+        self.assertEqual(layout.x0.tolist()[:3], [15.2, 55.0, 94.1])
+        # Columns without an English label move with the column on their left
+        self.assertEqual(layout.x0.tolist()[5], 207.5)
+
+    def test_far_labels_ignored(self):
+        """Test labels far from any column leave the layout unchanged"""
+        self.assertIs(column_layout(PageChars(template_page(60).chars), 2, (842, 595)), DEFAULT_LAYOUT)
+
+    def test_layout_cache(self):
+        """Test calibration runs once per template"""
+        calibrate_columns.cache_clear()
+        parse(template_page(8), template_page(8), calibrate=True)
+        parse(template_page(8), calibrate=True)
+
+        info = calibrate_columns.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+
+class TestPageParallelParsing(unittest.TestCase):
+    """Test parsing page ranges of one document in worker processes"""
+
+    def test_page_ranges(self):
+        """Test contiguous ranges, with small documents kept serial"""
+        self.assertEqual(page_ranges(400, 4), [(0, 100), (100, 200), (200, 300), (300, 400)])
+        self.assertEqual(page_ranges(25, 4), [(0, 12), (12, 25)])
+        self.assertEqual(page_ranges(9, 4), [(0, 9)])
+        self.assertEqual(page_ranges(0, 4), [(0, 0)])
+
+    def test_parallel_matches_serial(self):
+        """Test page ranges are merged back in page order"""
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(build_pdf([statement_page(page_num) for page_num in range(24)]))
+        self.addCleanup(os.unlink, pdf_file.name)
+
+        serial = extract_data_with_header_mapping(pdf_file.name)
+        parallel = extract_data_with_header_mapping(pdf_file.name, workers=2)
+
+        self.assertEqual(len(serial), 24)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(extract_data_with_header_mapping(pdf_file.name, workers=2), serial)
+
+    def test_pool_is_reused(self):
+        """Test documents share one worker pool, replaced only when more workers are requested"""
+        pool = page_pool(2)
+
+        self.assertIs(page_pool(2), pool)
+        self.assertIs(page_pool(1), pool)
+        self.assertIsNot(page_pool(3), pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import patch
+
+from db.document_cache import DocumentCache
+
+
+class FakeRedis:
+    """In-memory stand-in for a shared Redis cache"""
+
+    def __init__(self):
+        self.values = {}
+        self.results = []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def sadd(self, key, member):
+        self.values.setdefault(key, set()).add(member.encode('utf-8'))
+
+    def smembers(self, key):
+        self.results.append(set(self.values.get(key, set())))
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+    def scan_iter(self, match):
+        raise AssertionError("invalidation must not scan the keyspace")
+
+    def unlink(self, *keys):
+        for key in keys:
+            self.values.pop(key.decode('utf-8') if isinstance(key, bytes) else key, None)
+
+
+class TestDocumentCache(unittest.TestCase):
+    """Test document response cache"""
+
+    def test_set_and_get(self):
+        """Test cached body and stable ETag"""
+        cache = DocumentCache(max_entries=2)
+        stored = cache.set(1, b'{"id":1}')
+
+        cached = cache.get(1)
+        self.assertEqual(cached.body, b'{"id":1}')
+        self.assertEqual(cached.etag, stored.etag)
+        self.assertIsNone(cache.get(1, 'columnar'))
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted"""
+        cache = DocumentCache(max_entries=2)
+        cache.set(1, b'1')
+        cache.set(2, b'2')
+        cache.get(1)
+        cache.set(3, b'3')
+
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(3))
+
+    def test_ttl_expiry(self):
+        """Test local entries expire after TTL"""
+        cache = DocumentCache(ttl=10)
+        with patch('db.document_cache.time.monotonic', return_value=100.0):
+            cache.set(1, b'1')
+        with patch('db.document_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get(1))
+
+    def test_shared_cache_and_invalidation(self):
+        """Test entries are shared between processes and invalidated everywhere"""
+        shared = FakeRedis()
+        writer = DocumentCache(shared_client=shared)
+        reader = DocumentCache(shared_client=shared)
+        stored = writer.set(12, b'{"id":12}')
+        writer.set(120, b'{"id":120}')
+
+        self.assertEqual(reader.get(12).etag, stored.etag)
+
+        writer.invalidate(12)
+        reader.clear()
+        self.assertIsNone(reader.get(12))
+        self.assertIsNotNone(reader.get(120))
+
+    def test_invalidate_many(self):
+        """Test bulk invalidation drops only the given documents"""
+        shared = FakeRedis()
+        cache = DocumentCache(shared_client=shared)
+        for document_id in (1, 2, 10):
+            cache.set(document_id, b'{}')
+            cache.set(document_id, b'{}', 'columnar')
+
+        cache.invalidate_many([1, 2])
+        cache.clear()
+
+        self.assertIsNone(cache.get(1))
+        self.assertIsNone(cache.get(2, 'columnar'))
+        self.assertIsNotNone(cache.get(10))
+        self.assertIsNotNone(cache.get(10, 'columnar'))
+        self.assertEqual(sorted(shared.values), [
+            'pdftojson:document-variants:10', 'pdftojson:document:10:columnar', 'pdftojson:document:10:json'
+        ])
+
+    def test_untracked_default_variant(self):
+        """Test the default variant cached before variant tracking is still invalidated"""
+        shared = FakeRedis()
+        shared.values['pdftojson:document:5:json'] = b'etag\n{}'
+        cache = DocumentCache(shared_client=shared)
+
+        cache.invalidate_many([5])
+
+        self.assertEqual(shared.values, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
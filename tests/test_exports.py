@@ -0,0 +1,120 @@
+import unittest
+import os
+import io
+import csv
+from datetime import datetime
+from unittest.mock import Mock
+
+import oracledb
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+from db.exports import (
+    EXPORT_QUERIES, export_filters, stream_export, encode_csv, encode_ndjson, encode_parquet, parquet_schema, pq
+)
+from pdf2json.serialization import loads
+
+DESCRIPTION = [
+    ('ID', oracledb.DB_TYPE_NUMBER, None, None, 10, 0, False),
+    ('DATE_CREATED', oracledb.DB_TYPE_TIMESTAMP, None, None, None, None, True),
+    ('VALOR', oracledb.DB_TYPE_NUMBER, None, None, 0, -127, True),
+    ('DESCRICAO', oracledb.DB_TYPE_VARCHAR, None, None, None, None, True),
+]
+
+BATCHES = [
+    [(1, datetime(2024, 3, 1, 10, 30), 1.5, 'Pesagem'), (1, datetime(2024, 3, 1, 10, 30), None, 'Lavagem')],
+    [(2, datetime(2024, 4, 2), 3.25, 'Armazenagem, 1º período')],
+]
+
+
+class TestExports(unittest.TestCase):
+    """Test streaming export query and encoders (no database needed)"""
+
+    def test_filters(self):
+        """Test date and type filters become bound conditions on PDFTOJSON"""
+        where, params = export_filters(datetime(2024, 1, 1), datetime(2024, 2, 1), '001')
+
+        self.assertIn("d.DATE_CREATED >= :date_from", where)
+        self.assertIn("d.DATE_CREATED < :date_to", where)
+        self.assertIn("d.DOCUMENT_TYPE = :document_type", where)
+        self.assertEqual(params, {
+            'date_from': datetime(2024, 1, 1),
+            'date_to': datetime(2024, 2, 1),
+            'document_type': '001'
+        })
+        self.assertEqual(export_filters(), ('', {}))
+
+    def test_stream_export_batches(self):
+        """Test rows are fetched in arraysize batches and the connection is closed"""
+        connection = Mock()
+        cursor = Mock(description=DESCRIPTION)
+        cursor.fetchmany.side_effect = BATCHES + [[]]
+        manager = Mock()
+        manager.get_connection.return_value = connection
+        manager.read_cursor.return_value = cursor
+
+        chunks = list(stream_export(manager, 'fields', 5000, document_type='001'))
+
+        self.assertEqual(chunks, [DESCRIPTION] + BATCHES)
+        self.assertEqual(cursor.arraysize, 5000)
+        self.assertEqual(cursor.execute.call_args[0][1], {'document_type': '001'})
+        connection.close.assert_called_once()
+
+    def test_ndjson(self):
+        """Test one JSON object per row with lowercase column names"""
+        body = b''.join(encode_ndjson(DESCRIPTION, iter(BATCHES)))
+        rows = [loads(line) for line in body.splitlines()]
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], {'id': 1, 'date_created': '2024-03-01T10:30:00', 'valor': 1.5, 'descricao': 'Pesagem'})
+        self.assertIsNone(rows[1]['valor'])
+
+    def test_csv(self):
+        """Test CSV header and one chunk per batch"""
+        chunks = list(encode_csv(DESCRIPTION, iter(BATCHES)))
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(rows[0], ['id', 'date_created', 'valor', 'descricao'])
+        self.assertEqual(rows[3], ['2', '2024-04-02T00:00:00', '3.25', 'Armazenagem, 1º período'])
+
+    @unittest.skipUnless(pq is not None, "pyarrow not installed")
+    def test_parquet_row_groups(self):
+        """Test one Parquet row group per fetched batch with typed columns"""
+        body = b''.join(encode_parquet(DESCRIPTION, iter(BATCHES)))
+        parquet = pq.ParquetFile(io.BytesIO(body))
+        table = parquet.read()
+
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(str(table.schema.field('id').type), 'int64')
+        self.assertEqual(str(table.schema.field('valor').type), 'double')
+        self.assertEqual(table.column('descricao').to_pylist()[2], 'Armazenagem, 1º período')
+
+    @unittest.skipUnless(pq is not None, "pyarrow not installed")
+    def test_parquet_integer_columns(self):
+        """Test identity IDs and ordinality indexes stay integers although their NUMBER is unconstrained"""
+        description = [
+            ('ID', oracledb.DB_TYPE_NUMBER, None, None, 0, -127, False),
+            ('SECTION_INDEX', oracledb.DB_TYPE_NUMBER, None, None, 0, -127, True),
+            ('QTD', oracledb.DB_TYPE_NUMBER, None, None, 38, 0, True),
+            ('TOTAL', oracledb.DB_TYPE_NUMBER, None, None, 0, -127, True),
+        ]
+
+        types = [str(field.type) for field in parquet_schema(description)]
+
+        self.assertEqual(types, ['int64', 'int64', 'int64', 'double'])
+
+    def test_fields_export_reads_whole_content(self):
+        """Test the fields export runs JSON_TABLE over the CONTENT CLOB, not the 32 KB view"""
+        query = EXPORT_QUERIES['fields']
+
+        self.assertNotIn('VW_PDFTOJSON_FIELDS', query)
+        self.assertNotIn('get_json_varchar', query)
+        self.assertEqual(query.count('d.CONTENT FORMAT JSON'), 2)
+        self.assertEqual(query.count('{where}'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+from unittest.mock import Mock, patch
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+from scripts import init_database
+
+
+def mock_connection(compression, partitioned=0):
+    """Connection whose cursor answers table, LOB and partitioning lookups"""
+    cursor = Mock()
+    cursor.fetchone.side_effect = [(1,), (compression,), (partitioned,)]
+    connection = Mock()
+    connection.cursor.return_value = cursor
+    return connection
+
+
+class TestEnsureTable(unittest.TestCase):
+    """Test the PDFTOJSON ledger entry against an existing table (no database needed)"""
+
+    def test_matching_table_is_applied(self):
+        """Test an existing table with the configured storage is reported as applied"""
+        with patch.object(init_database, 'CONTENT_LOB_COMPRESSION', 'MEDIUM'):
+            self.assertIs(init_database.ensure_table(mock_connection('MEDIUM')), True)
+
+    def test_compression_drift_is_not_applied(self):
+        """Test a changed CONTENT_LOB_COMPRESSION on an existing table is reported, not applied"""
+        with patch.object(init_database, 'CONTENT_LOB_COMPRESSION', 'HIGH'), \
+                self.assertLogs(init_database.logger, level='WARNING') as logs:
+            result = init_database.ensure_table(mock_connection('NO'))
+
+        self.assertEqual(result, init_database.NOT_APPLIED)
+        self.assertIn('CONTENT compression is NONE, CONTENT_LOB_COMPRESSION=HIGH', logs.output[0])
+
+    def test_partitioned_table_without_partitioning(self):
+        """Test a partitioned table is reported when partitioning is no longer configured"""
+        with patch.object(init_database, 'PDFTOJSON_PARTITIONING', 'none'):
+            result = init_database.ensure_table(mock_connection(None, partitioned=1))
+
+        self.assertEqual(result, init_database.NOT_APPLIED)
+
+    def test_drift_is_not_recorded(self):
+        """Test main leaves the ledger checksum unchanged for objects that were not applied"""
+        apply = Mock(return_value=init_database.NOT_APPLIED)
+        pending = [('PDFTOJSON', 2, 'new-checksum', apply)]
+
+        with patch.object(init_database, 'get_oracle_connection', return_value=Mock()), \
+                patch.object(init_database, 'read_ledger', return_value={'PDFTOJSON': (1, 'old-checksum')}), \
+                patch.object(init_database, 'pending_objects', return_value=pending), \
+                patch.object(init_database, 'record_migration') as record:
+            init_database.main()
+
+        apply.assert_called_once()
+        record.assert_not_called()
+
+
+class TestViewFull(unittest.TestCase):
+    """Test the vw_pdftojson_full definition"""
+
+    def test_keeps_every_document(self):
+        """Test the view has no row filter, so documents without line-parser sections are still returned"""
+        sql = ' '.join(init_database.VIEW_FULL_SQL.split())
+
+        self.assertNotIn('WHERE', sql.upper())
+        # The root row path matches every document, so each one yields at least one row
+        self.assertIn("JSON_TABLE( p.content, '$' COLUMNS (", sql)
+
+    def test_collections_are_siblings(self):
+        """Test storage periods and operation lines are sibling NESTED PATHs of a single JSON_TABLE"""
+        sql = init_database.VIEW_FULL_SQL
+
+        self.assertEqual(sql.count('JSON_TABLE('), 1)
+        self.assertIn("NESTED PATH '$.armazenagem.fields[*]'", sql)
+        self.assertIn("NESTED PATH '$.operacao_servicos.fields[*]'", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
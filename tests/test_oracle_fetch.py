@@ -0,0 +1,54 @@
+import unittest
+import os
+from unittest.mock import Mock
+
+import oracledb
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+from db.oracle_connection import OracleManager, fetch_lobs_as_strings, parse_content
+
+
+class TestFetchSettings(unittest.TestCase):
+    """Test read path fetch tuning (no database needed)"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.manager = OracleManager()
+        self.connection = Mock()
+
+    def test_lobs_fetched_inline(self):
+        """Test CLOB columns are fetched as LONG strings, other columns untouched"""
+        cursor = Mock(arraysize=25)
+        clob = Mock(type_code=oracledb.DB_TYPE_CLOB)
+        varchar = Mock(type_code=oracledb.DB_TYPE_VARCHAR)
+
+        fetch_lobs_as_strings(cursor, clob)
+        cursor.var.assert_called_once_with(oracledb.DB_TYPE_LONG, arraysize=25)
+        self.assertIsNone(fetch_lobs_as_strings(cursor, varchar))
+
+    def test_single_row_cursor(self):
+        """Test lookups by ID fetch the row and end-of-fetch in one round trip"""
+        cursor = self.manager.read_cursor(self.connection, rows=1)
+
+        self.assertEqual(cursor.arraysize, 1)
+        self.assertEqual(cursor.prefetchrows, 2)
+        self.assertIs(cursor.outputtypehandler, fetch_lobs_as_strings)
+
+    def test_page_sized_cursor(self):
+        """Test list queries fetch the requested page at once"""
+        cursor = self.manager.read_cursor(self.connection, rows=50)
+
+        self.assertEqual(cursor.arraysize, 50)
+        self.assertEqual(cursor.prefetchrows, 51)
+
+    def test_parse_content(self):
+        """Test content fetched as text, bytes or native JSON"""
+        self.assertEqual(parse_content('{"a": 1}'), {'a': 1})
+        self.assertEqual(parse_content(b'{"a": 1}'), {'a': 1})
+        self.assertEqual(parse_content({'a': 1}), {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
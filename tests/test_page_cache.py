@@ -0,0 +1,143 @@
+import unittest
+import os
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from pdf2json import document_001
+from pdf2json.document_001 import extract_data_with_header_mapping
+from pdf2json.document_002 import PDFLineParser
+from pdf2json.page_cache import PageCache, page_fingerprints
+from tests.sample_pdf import build_pdf, page_content, statement_page
+
+
+class FakeRedis:
+    """In-memory stand-in for a shared Redis cache"""
+
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def execute(self):
+        pass
+
+
+def statement(revised_pages=()):
+    """Six page statement; revised pages get one more container line"""
+    return build_pdf([statement_page(page_num, rows=3 if page_num in revised_pages else 2) for page_num in range(6)])
+
+
+class TestPageFingerprints(unittest.TestCase):
+    """Test page fingerprints follow page content"""
+
+    def test_changed_pages(self):
+        """Test only revised pages get a new fingerprint"""
+        original = page_fingerprints(statement())
+        revised = page_fingerprints(BytesIO(statement(revised_pages=(2,))))
+
+        self.assertEqual(len(original), 6)
+        self.assertEqual([a == b for a, b in zip(original, revised)], [True, True, False, True, True, True])
+        self.assertEqual(len(set(original)), 6)
+
+    def test_inherited_attributes(self):
+        """Test resources inherited from the page tree are part of the fingerprint"""
+        pages = [statement_page(0)]
+        direct = page_fingerprints(build_pdf(pages))
+        inherited = page_fingerprints(build_pdf(pages, inherited=True))
+        other_font = page_fingerprints(build_pdf(pages, inherited=True, base_font=b'Courier'))
+
+        self.assertEqual(inherited, direct)
+        self.assertNotEqual(other_font, inherited)
+
+    def test_stream_position(self):
+        """Test the stream is left where it was for the parser"""
+        stream = BytesIO(statement())
+        page_fingerprints(stream)
+        self.assertEqual(stream.tell(), 0)
+
+
+class TestPageCache(unittest.TestCase):
+    """Test parsed page cache"""
+
+    def test_keys(self):
+        """Test keys depend on parser, version and options"""
+        cache = PageCache()
+        key = cache.keys(['abc'], 'document_001', 1, 'pdfplumber')[0]
+
+        self.assertTrue(key.startswith('pdftojson:page:document_001:1:'))
+        self.assertTrue(key.endswith(':abc'))
+        self.assertNotEqual(cache.keys(['abc'], 'document_001', 2, 'pdfplumber')[0], key)
+        self.assertNotEqual(cache.keys(['abc'], 'document_001', 1, 'pdfium')[0], key)
+
+    def test_lru_eviction(self):
+        """Test least recently used pages are evicted"""
+        cache = PageCache(max_entries=2)
+        cache.set_many([('a', [1]), ('b', [2])])
+        cache.get_many(['a'])
+        cache.set_many([('c', [3])])
+
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), [[1], None, [3]])
+
+    def test_shared_cache(self):
+        """Test pages are shared between replicas and kept locally after a shared hit"""
+        shared = FakeRedis()
+        PageCache(shared_client=shared).set_many([('a', [{'Title': 'Scanner'}])])
+        cache = PageCache(shared_client=shared)
+
+        self.assertEqual(cache.get_many(['a', 'b']), [[{'Title': 'Scanner'}], None])
+        shared.values.clear()
+        self.assertEqual(cache.get_many(['a']), [[{'Title': 'Scanner'}]])
+
+
+class TestCachedParsing(unittest.TestCase):
+    """Test parsers only extract pages missing from the cache"""
+
+    def test_revised_statement(self):
+        """Test a revised statement only re-parses its changed page"""
+        cache = PageCache()
+        revised = statement(revised_pages=(4,))
+        expected = extract_data_with_header_mapping(BytesIO(revised))
+
+        extract_data_with_header_mapping(BytesIO(statement()), page_cache=cache)
+        with patch('pdf2json.document_001.extract_page', wraps=document_001.extract_page) as extract_page:
+            result = extract_data_with_header_mapping(BytesIO(revised), page_cache=cache)
+
+        self.assertEqual([call.args[0] for call in extract_page.call_args_list], [4])
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result[4]['fields']), 3)
+
+    def test_first_page_region(self):
+        """Test a first page is not reused as another page with the same content"""
+        cache = PageCache()
+        pdf_bytes = build_pdf([statement_page(1), statement_page(1)])
+
+        keys = document_001.page_cache_keys(cache, BytesIO(pdf_bytes), 'pdfplumber')
+        result = extract_data_with_header_mapping(BytesIO(pdf_bytes), page_cache=cache)
+
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result, extract_data_with_header_mapping(BytesIO(pdf_bytes)))
+
+    def test_line_parser(self):
+        """Test the line parser reuses cached page lines"""
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(build_pdf([page_content([('Linha A', 40, 30)]), page_content([('Linha B', 40, 30)])]))
+        self.addCleanup(os.unlink, pdf_file.name)
+        parser = PDFLineParser(page_cache=PageCache())
+
+        self.assertEqual(parser.extract_text_by_lines(pdf_file.name), ['Linha A', 'Linha B'])
+        with patch('pdf2json.document_002.open_pdf') as mock_open:
+            mock_open.return_value.__enter__.return_value.pages = [object(), object()]
+            self.assertEqual(parser.extract_text_by_lines(pdf_file.name), ['Linha A', 'Linha B'])
+
+
+if __name__ == '__main__':
+    unittest.main()
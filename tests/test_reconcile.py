@@ -0,0 +1,156 @@
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import MagicMock, Mock, patch
+
+from scripts import reconcile_documents
+from storage.reconcile import walk_sorted, merge_sorted, ReconcileCheckpoint
+
+
+class TestWalkSorted(unittest.TestCase):
+    """Test sorted streaming of the documents folder"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, 'documents')
+        for relative in ('1/a.pdf', '10/b.pdf', '1.pdf', '2/c.pdf.zst', '.queue/queue.sqlite3',
+                         'ab/cd/x.pdf.1f2e.tmp'):
+            path = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+        os.makedirs(os.path.join(self.root, '3'))
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.root) + ('/' if path.endswith('/') else '') for path in paths]
+
+    def test_binary_path_order(self):
+        """Test paths come out in the same order as ORDER BY DOCUMENT_PATH"""
+        paths = list(walk_sorted(self.root))
+
+        self.assertEqual(paths, sorted(paths))
+        self.assertEqual(self.relative(paths), ['1.pdf', '1/a.pdf', '10/b.pdf', '2/c.pdf.zst', '3/'])
+
+    def test_resume_skips_processed_subtrees(self):
+        """Test walk restarts after the checkpointed path"""
+        paths = list(walk_sorted(self.root, start_after=os.path.join(self.root, '1', 'a.pdf')))
+
+        self.assertEqual(self.relative(paths), ['10/b.pdf', '2/c.pdf.zst', '3/'])
+
+
+class TestMergeSorted(unittest.TestCase):
+    """Test merge of stored files with database rows"""
+
+    def test_orphans_and_dangling_rows(self):
+        """Test differences on both sides, with files shared by several rows"""
+        stored = ['d/a.pdf', 'd/b.pdf', 'd/e/']
+        rows = [('d/a.pdf', 1), ('d/a.pdf', 4), ('d/c.pdf', 2)]
+
+        result = list(merge_sorted(stored, rows))
+
+        self.assertEqual(result, [
+            ('ok', 'd/a.pdf', [1, 4]),
+            ('orphan', 'd/b.pdf', None),
+            ('dangling', 'd/c.pdf', [2]),
+            ('orphan', 'd/e/', None)
+        ])
+
+    def test_streams_lazily(self):
+        """Test neither side is read ahead of the merge"""
+        consumed = []
+
+        def stored():
+            for index in range(1000000):
+                consumed.append(index)
+                yield f"d/{index:07d}.pdf"
+
+        merged = merge_sorted(stored(), iter([('d/0000000.pdf', 1)]))
+        self.assertEqual(next(merged), ('ok', 'd/0000000.pdf', [1]))
+        self.assertLess(len(consumed), 3)
+
+
+class TestReconcileCheckpoint(unittest.TestCase):
+    """Test resumable progress file"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'checkpoint.json')
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_load_clear(self):
+        """Test checkpoint round trip"""
+        checkpoint = ReconcileCheckpoint(self.path, interval=2)
+        self.assertIsNone(checkpoint.load())
+
+        checkpoint.advance('documents/1/a.pdf')
+        self.assertIsNone(checkpoint.load())
+        checkpoint.advance('documents/2/b.pdf')
+        self.assertEqual(checkpoint.load(), 'documents/2/b.pdf')
+
+        checkpoint.clear()
+        self.assertIsNone(ReconcileCheckpoint(self.path).load())
+
+
+class TestReconcileScript(unittest.TestCase):
+    """Test the reconciliation script fixes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, 'documents')
+        for relative in ('a.pdf', 'b.pdf'):
+            path = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+            os.utime(path, (0, 0))
+        os.makedirs(os.path.join(self.root, 'e'))
+        os.utime(os.path.join(self.root, 'e'), (0, 0))
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def run_script(self, oracle_manager, document_cache):
+        checkpoint = os.path.join(self.temp_dir, 'checkpoint.json')
+        argv = ['reconcile_documents.py', '--fix', '--delete-dangling', '--checkpoint', checkpoint]
+        with patch.object(reconcile_documents, 'OracleManager', return_value=oracle_manager), \
+                patch.object(reconcile_documents, 'create_document_cache', return_value=document_cache), \
+                patch.object(reconcile_documents, 'DOCUMENTS_PATH', self.root), \
+                patch.object(reconcile_documents.sys, 'argv', argv):
+            reconcile_documents.main()
+
+    def test_fix_rechecks_references_and_invalidates(self):
+        """Test orphans are removed through the reference re-check and deleted rows leave the cache"""
+        read_cursor = MagicMock()
+        read_cursor.__iter__.return_value = iter([
+            (os.path.join(self.root, 'b.pdf'), 1), (os.path.join(self.root, 'c.pdf'), 5)
+        ])
+        oracle_manager = Mock()
+        oracle_manager.read_cursor.return_value = read_cursor
+        oracle_manager.store.resolve.return_value = None
+        # An insert deduplicated onto a.pdf after the walk classed it as an orphan
+        oracle_manager.remove_unreferenced_files.return_value = 0
+        document_cache = Mock()
+
+        self.run_script(oracle_manager, document_cache)
+
+        cursor = oracle_manager.get_connection.return_value.cursor.return_value
+        oracle_manager.remove_unreferenced_files.assert_called_once_with(cursor, [os.path.join(self.root, 'a.pdf')])
+        oracle_manager.store.delete.assert_not_called()
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'a.pdf')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'e')))
+        cursor.executemany.assert_called_once_with("DELETE FROM PDFTOJSON WHERE ID = :id", [{'id': 5}])
+        document_cache.invalidate_many.assert_called_once_with([5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import json
+import pickle
+from unittest.mock import patch
+
+from pdf2json.columnar import to_columnar, to_rows
+from pdf2json.document_001 import HEADER_MAPPING
+from pdf2json.records import ArmazenagemItem, ContainerRow, OperacaoItem
+from pdf2json.serialization import dumps
+from pdf2json.tables import iter_rows
+
+
+def container_row():
+    """Container line record"""
+    return ContainerRow(start_time='01/01/2024', equipment_id='ABCU1234567', tax_id='12345678000199',
+                        unit_value='100,00')
+
+
+class TestRecords(unittest.TestCase):
+    """Test slotted row records and their mapping view"""
+
+    def test_keys_match_parsers(self):
+        """Test record keys are the published row keys"""
+        self.assertEqual(ContainerRow.KEYS, tuple(HEADER_MAPPING))
+        self.assertEqual(ArmazenagemItem.KEYS[6], '%_armaz')
+
+    def test_mapping_view(self):
+        """Test rows read like the dicts the parsers used to return"""
+        row = container_row()
+
+        self.assertEqual(row['Container (Equipment ID)'], 'ABCU1234567')
+        self.assertIsNone(row.get('DT / DTA'))
+        self.assertIsNone(row.get('missing'))
+        self.assertEqual(list(row), list(HEADER_MAPPING))
+        self.assertEqual(row, dict.fromkeys(HEADER_MAPPING) | row.to_dict())
+        self.assertEqual(ContainerRow.from_mapping(row.to_dict()), row)
+        with self.assertRaises(KeyError):
+            row['missing']
+
+    def test_slots(self):
+        """Test records have no per-instance dict and survive worker processes"""
+        row = container_row()
+
+        self.assertFalse(hasattr(row, '__dict__'))
+        self.assertEqual(pickle.loads(pickle.dumps(row)), row)
+
+    def test_json(self):
+        """Test records serialize as objects with their keys, with and without orjson"""
+        document = {'armazenagem': {'fields': [ArmazenagemItem('01/01', '10/01', '1', '2', '3', '4', '5.5', 10.0)]}}
+        expected = {'armazenagem': {'fields': [{
+            'inicio': '01/01', 'final': '10/01', 'periodo': '1', 'qtde_pecas': '2', 'carregado': '3',
+            'saldo': '4', '%_armaz': '5.5', 'total_armaz_rs': 10.0
+        }]}}
+
+        self.assertEqual(json.loads(dumps(document)), expected)
+        with patch('pdf2json.serialization.orjson', None):
+            self.assertEqual(json.loads(dumps(document)), expected)
+
+    def test_columnar(self):
+        """Test columnar output takes record values in column order"""
+        document = {'sections': [{'Title': 'Scanner', 'fields': [container_row()]}]}
+
+        columnar = to_columnar(document)
+
+        self.assertEqual(columnar['sections'][0]['columns'], list(HEADER_MAPPING))
+        self.assertEqual(columnar['sections'][0]['rows'][0][:3], ['01/01/2024', None, 'ABCU1234567'])
+        self.assertEqual(to_rows(columnar)['sections'][0]['fields'], [container_row()])
+
+    def test_tables(self):
+        """Test typed table rows read records"""
+        result = {'operacao_servicos': {'fields': [OperacaoItem('01 - Pesagem', '1.00', 10.0, 10.0)]}}
+
+        self.assertEqual(list(iter_rows(result, 'operacao_servicos', 7)), [(7, 1, '01 - Pesagem', '1.00', 10.0, 10.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+from db.oracle_connection import OracleManager
+from scripts import retention
+
+
+class TestDropPartitions(unittest.TestCase):
+    """Test retention by partition drop (no database needed)"""
+
+    def test_returns_dropped_documents(self):
+        """Test dropped partitions report their document IDs and paths and release the files"""
+        manager = OracleManager()
+        cursor = Mock()
+        cursor.fetchall.side_effect = [
+            [('SYS_P1', "TIMESTAMP' 2023-02-01 00:00:00'"), ('SYS_P2', "TIMESTAMP' 2030-01-01 00:00:00'")],
+            [(1, 'documents/1/a.pdf'), (2, 'documents/2/b.pdf')],
+        ]
+        connection = Mock()
+        connection.cursor.return_value = cursor
+
+        with patch.object(manager, 'get_connection', return_value=connection), \
+                patch.object(manager, 'remove_unreferenced_files', return_value=2) as remove:
+            result = manager.drop_partitions_before(datetime(2024, 1, 1))
+
+        self.assertEqual(result, {
+            'partitions': 1, 'ids': [1, 2], 'paths': ['documents/1/a.pdf', 'documents/2/b.pdf'], 'files_removed': 2
+        })
+        self.assertEqual(remove.call_args.args[1], ['documents/1/a.pdf', 'documents/2/b.pdf'])
+        cursor.execute.assert_any_call('ALTER TABLE PDFTOJSON DROP PARTITION "SYS_P1" UPDATE GLOBAL INDEXES')
+
+
+class TestRetentionScript(unittest.TestCase):
+    """Test the retention script"""
+
+    def test_invalidates_removed_documents(self):
+        """Test documents removed by partition drops and batch deletes leave the document cache"""
+        oracle_manager = Mock()
+        oracle_manager.drop_partitions_before.return_value = {
+            'partitions': 1, 'ids': [1, 2], 'paths': ['a', 'b'], 'files_removed': 2
+        }
+        oracle_manager.delete_documents_before.return_value = {'ids': [3], 'files_removed': 1}
+        document_cache = Mock()
+
+        with patch.object(retention, 'OracleManager', return_value=oracle_manager), \
+                patch.object(retention, 'create_document_cache', return_value=document_cache), \
+                patch.object(retention.sys, 'argv', ['retention.py', '12']):
+            retention.main()
+
+        self.assertEqual([call.args[0] for call in document_cache.invalidate_many.call_args_list], [[1, 2], [3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
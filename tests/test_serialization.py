@@ -0,0 +1,39 @@
+import unittest
+import json
+
+from pdf2json.serialization import dumps, loads, splice_fields
+
+
+class TestSerialization(unittest.TestCase):
+    """Test single-pass JSON serialization"""
+
+    def test_dumps_keeps_utf8(self):
+        """Test output is compact UTF-8 without ASCII escapes"""
+        body = dumps({'document_type': 'DEMONSTRATIVO DE CÁLCULO', 'sections': []})
+
+        self.assertIsInstance(body, bytes)
+        self.assertIn('CÁLCULO'.encode('utf-8'), body)
+        self.assertEqual(json.loads(body), {'document_type': 'DEMONSTRATIVO DE CÁLCULO', 'sections': []})
+
+    def test_splice_fields(self):
+        """Test metadata is appended to serialized bytes"""
+        body = dumps({'header': {'a': 1}, 'sections': [{}]})
+
+        spliced = splice_fields(body, {'database_id': 7, 'file_path': 'documents/7/a.pdf'})
+
+        self.assertEqual(loads(spliced), {
+            'header': {'a': 1},
+            'sections': [{}],
+            'database_id': 7,
+            'file_path': 'documents/7/a.pdf'
+        })
+        self.assertTrue(spliced.startswith(body[:-1]))
+
+    def test_splice_into_empty_object(self):
+        """Test splicing into an empty object"""
+        self.assertEqual(loads(splice_fields(b'{}', {'queue_id': 'x'})), {'queue_id': 'x'})
+        self.assertEqual(splice_fields(b'{"a":1}', {}), b'{"a":1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
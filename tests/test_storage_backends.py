@@ -0,0 +1,279 @@
+import unittest
+import tempfile
+import shutil
+import os
+import io
+import time
+import threading
+from datetime import datetime, timezone
+
+from storage.backends import (
+    LocalDocumentStore, FlatDocumentStore, ShardedDocumentStore, S3DocumentStore,
+    create_document_store, file_sha256, shard_lock
+)
+from storage.compression import zstd_available, zstandard
+
+
+class FakeClientError(Exception):
+    """botocore ClientError stand-in: the error code is in response['Error']['Code']"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for an S3-compatible service (MinIO)"""
+
+    def __init__(self):
+        self.objects = {}
+        self.modified = {}
+        self.headers = {}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError('404')
+        return {'ContentLength': len(self.objects[(Bucket, Key)]), 'LastModified': self.modified[(Bucket, Key)],
+                **self.headers[(Bucket, Key)]}
+
+    def put_object(self, Bucket, Key, Body, **headers):
+        self.objects[(Bucket, Key)] = Body.read()
+        self.modified[(Bucket, Key)] = datetime.now(timezone.utc)
+        self.headers[(Bucket, Key)] = headers
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective, **headers):
+        source = (CopySource['Bucket'], CopySource['Key'])
+        self.objects[(Bucket, Key)] = self.objects[source]
+        self.modified[(Bucket, Key)] = datetime.now(timezone.utc)
+        # REPLACE drops whatever the request does not pass again
+        self.headers[(Bucket, Key)] = headers if MetadataDirective == 'REPLACE' else self.headers[source]
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[(Bucket, Key)]
+        if Range:
+            start, _, end = Range[len('bytes='):].partition('-')
+            data = data[int(start):int(end) + 1]
+        return {'Body': io.BytesIO(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+class StoreTestCase(unittest.TestCase):
+    """Shared fixtures for document store tests"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, 'documents')
+        self.content = b'%PDF-1.4\n' + b'BT /F1 8 Tf (DEMONSTRATIVO) Tj ET\n' * 200
+        self.source = os.path.join(self.temp_dir, 'upload.pdf')
+        with open(self.source, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def read_back(self, store, path):
+        with store.open(store.resolve(path)) as f:
+            return f.read()
+
+
+class TestLocalDocumentStore(unittest.TestCase):
+    """Test the base store"""
+
+    def test_layout_is_abstract(self):
+        """Test the base store cannot be used without a layout"""
+        with self.assertRaises(TypeError):
+            LocalDocumentStore()
+
+
+class TestFlatDocumentStore(StoreTestCase):
+    """Test legacy per-ID layout"""
+
+    def test_save_and_delete(self):
+        """Test file is saved under its ID and removed with its directory"""
+        store = FlatDocumentStore(self.root)
+        path = store.save(12.0, 'statement.pdf', self.source)
+
+        self.assertEqual(path, os.path.join(self.root, '12', 'statement.pdf'))
+        self.assertEqual(self.read_back(store, path), self.content)
+
+        self.assertTrue(store.delete(path))
+        self.assertFalse(os.path.exists(os.path.join(self.root, '12')))
+        self.assertTrue(os.path.exists(self.root))
+
+
+class TestShardedDocumentStore(StoreTestCase):
+    """Test content-addressed sharded layout"""
+
+    def test_save_uses_hash_shards(self):
+        """Test file is stored as ab/cd/<sha256>.pdf"""
+        store = ShardedDocumentStore(self.root)
+        content_hash = file_sha256(self.source)
+
+        path = store.save(1, 'statement.pdf', self.source)
+
+        expected = os.path.join(self.root, content_hash[:2], content_hash[2:4], f"{content_hash}.pdf")
+        self.assertEqual(path, expected)
+        self.assertEqual(self.read_back(store, path), self.content)
+
+    def test_identical_uploads_are_deduplicated(self):
+        """Test identical uploads share a single file"""
+        store = ShardedDocumentStore(self.root)
+
+        first = store.save(1, 'a.pdf', self.source)
+        second = store.save(2, 'b.pdf', self.source)
+
+        self.assertEqual(first, second)
+        files = [name for _, _, names in os.walk(self.root) for name in names]
+        self.assertEqual(len(files), 1)
+
+    @unittest.skipUnless(zstd_available(), "zstandard not installed")
+    def test_compressed_copy_is_reused(self):
+        """Test a compressed copy deduplicates plain uploads too"""
+        compressed_store = ShardedDocumentStore(self.root, compression='zstd')
+        plain_store = ShardedDocumentStore(self.root)
+
+        first = compressed_store.save(1, 'a.pdf', self.source)
+        second = plain_store.save(2, 'b.pdf', self.source)
+
+        self.assertTrue(first.endswith('.pdf.zst'))
+        self.assertEqual(first, second)
+        self.assertEqual(self.read_back(plain_store, second), self.content)
+
+    @unittest.skipUnless(zstd_available(), "zstandard not installed")
+    def test_content_length(self):
+        """Test original size of plain and compressed files, with or without a recorded frame size"""
+        store = ShardedDocumentStore(self.root, compression='zstd')
+        compressed = store.save(1, 'a.pdf', self.source)
+        plain = FlatDocumentStore(self.root).save(2, 'b.pdf', self.source)
+        legacy = os.path.join(self.temp_dir, 'legacy.pdf.zst')
+        with open(self.source, 'rb') as source, open(legacy, 'wb') as dest:
+            zstandard.ZstdCompressor().copy_stream(source, dest)
+
+        for path in (compressed, plain, legacy):
+            self.assertEqual(store.content_length(path), len(self.content))
+
+    def test_delete_prunes_empty_shards(self):
+        """Test shard directories are removed when empty"""
+        store = ShardedDocumentStore(self.root)
+        path = store.save(1, 'a.pdf', self.source)
+
+        store.delete(path)
+
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_recently_reused_file_is_kept(self):
+        """Test a delete keeps a shared file an upload just deduplicated onto"""
+        store = ShardedDocumentStore(self.root)
+        path = store.save(1, 'a.pdf', self.source)
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+        self.assertEqual(store.save(2, 'b.pdf', self.source), path)
+
+        self.assertFalse(store.delete(path, min_age=3600))
+        self.assertTrue(os.path.exists(path))
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+        self.assertTrue(store.delete(path, min_age=3600))
+        self.assertFalse(os.path.exists(path))
+
+    def test_delete_waits_for_shard_lock(self):
+        """Test a delete of shared content waits for a deduplicating save holding the shard lock"""
+        store = ShardedDocumentStore(self.root)
+        path = store.save(1, 'a.pdf', self.source)
+
+        with shard_lock(path):
+            deleter = threading.Thread(target=store.delete, args=(path,))
+            deleter.start()
+            deleter.join(0.2)
+            self.assertTrue(os.path.exists(path))
+        deleter.join()
+
+        self.assertFalse(os.path.exists(path))
+
+
+class TestS3DocumentStore(StoreTestCase):
+    """Test S3-compatible store against an in-memory MinIO stand-in"""
+
+    def test_save_open_delete(self):
+        """Test upload, download and removal of an object"""
+        client = FakeS3Client()
+        store = S3DocumentStore('pdfs', client=client, prefix='prod/', root=self.root)
+        content_hash = file_sha256(self.source)
+
+        path = store.save(1, 'a.pdf', self.source)
+
+        self.assertEqual(path, f"s3://pdfs/prod/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.pdf")
+        self.assertEqual(self.read_back(store, path), self.content)
+        self.assertEqual(store.save(2, 'b.pdf', self.source), path)
+        self.assertEqual(len(client.objects), 1)
+        self.assertFalse(store.delete(path, min_age=3600))
+
+        store.delete(path)
+        self.assertIsNone(store.resolve(path))
+
+    @unittest.skipUnless(zstd_available(), "zstandard not installed")
+    def test_content_length(self):
+        """Test original size of objects without downloading them"""
+        client = FakeS3Client()
+        plain = S3DocumentStore('pdfs', client=client, root=self.root).save(1, 'a.pdf', self.source)
+        compressed_store = S3DocumentStore('pdfs', client=client, prefix='zstd/', root=self.root, compression='zstd')
+        compressed = compressed_store.save(2, 'b.pdf', self.source)
+
+        self.assertTrue(compressed.endswith('.pdf.zst'))
+        for path in (plain, compressed):
+            self.assertEqual(compressed_store.content_length(path), len(self.content))
+
+    def test_dedup_keeps_object_metadata(self):
+        """Test refreshing a reused object keeps its user metadata and headers"""
+        client = FakeS3Client()
+        store = S3DocumentStore('pdfs', client=client, root=self.root)
+        path = store.save(1, 'a.pdf', self.source)
+        _, key = store._split(path)
+        client.headers[('pdfs', key)] = {'Metadata': {'origin': 'erp'}, 'ContentType': 'application/pdf'}
+
+        self.assertEqual(store.save(2, 'b.pdf', self.source), path)
+
+        head = client.head_object(Bucket='pdfs', Key=key)
+        self.assertEqual(head['Metadata'], {'origin': 'erp'})
+        self.assertEqual(head['ContentType'], 'application/pdf')
+
+    def test_head_errors_are_not_missing_objects(self):
+        """Test access and network errors are raised instead of treated as a missing object"""
+        client = FakeS3Client()
+        store = S3DocumentStore('pdfs', client=client, root=self.root)
+        path = store.save(1, 'a.pdf', self.source)
+
+        def denied(Bucket, Key):
+            raise FakeClientError('AccessDenied')
+        client.head_object = denied
+
+        with self.assertRaises(FakeClientError):
+            store.save(2, 'b.pdf', self.source)
+        with self.assertRaises(FakeClientError):
+            store.resolve(path)
+        self.assertEqual(len(client.objects), 1)
+
+    def test_local_paths_still_readable(self):
+        """Test documents stored before switching to S3 remain readable"""
+        legacy_path = FlatDocumentStore(self.root).save(3, 'old.pdf', self.source)
+        store = S3DocumentStore('pdfs', client=FakeS3Client(), root=self.root)
+
+        self.assertEqual(self.read_back(store, legacy_path), self.content)
+
+
+class TestCreateDocumentStore(unittest.TestCase):
+    """Test store factory"""
+
+    def test_backends(self):
+        """Test configured backend names"""
+        self.assertIsInstance(create_document_store('flat'), FlatDocumentStore)
+        self.assertIsInstance(create_document_store('sharded'), ShardedDocumentStore)
+        with self.assertRaises(ValueError):
+            create_document_store('ftp')
+
+
+if __name__ == '__main__':
+    unittest.main()
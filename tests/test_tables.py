@@ -0,0 +1,87 @@
+import unittest
+
+from pdf2json.columnar import to_columnar
+from pdf2json.document_001 import HEADER_MAPPING
+from pdf2json.tables import (
+    TABLE_SCHEMAS, document_tables, flatten, iter_rows, to_record_batch, to_record_batches,
+    arrow_available
+)
+
+
+class TestTables(unittest.TestCase):
+    """Test flattening of parse results into typed tables"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.coordinate_result = {
+            'header': {},
+            'sections': [
+                {'Title': 'ARMAZENAGEM', 'fields': [{'Container (Equipment ID)': 'MSCU1234567'}]},
+                {'Title': 'ENERGIA', 'fields': [{'Container (Equipment ID)': 'TGHU7654321',
+                                                 'Valor (Unit Value)': '12,50'}]}
+            ]
+        }
+        self.line_result = {
+            'armazenagem': {'fields': [
+                {'inicio': '01/01/2024', 'final': '10/01/2024', 'periodo': '1', 'qtde_pecas': '2',
+                 'carregado': 'S', 'saldo': '0', '%_armaz': '0,5', 'total_armaz_rs': 100.5},
+                {'inicio': '11/01/2024', 'total_armaz_rs': 'n/a'}
+            ]},
+            'operacao_servicos': {'fields': [
+                {'descricao': '01 - PESAGEM', 'qtd': '1.00', 'rs_unitario': 10.0, 'total_oper_rs': 10.0}
+            ]}
+        }
+
+    def test_document_tables(self):
+        """Test tables offered by each parser's result"""
+        self.assertEqual(document_tables(self.coordinate_result), ['fields'])
+        self.assertEqual(document_tables(self.line_result), ['armazenagem', 'operacao_servicos'])
+
+    def test_fields_rows(self):
+        """Test section rows carry document, section and row indexes"""
+        columns = flatten(self.coordinate_result, 'fields', document_id=9)
+
+        self.assertEqual(list(columns), [name for name, _ in TABLE_SCHEMAS['fields']])
+        self.assertEqual(columns['document_id'], [9, 9])
+        self.assertEqual(columns['section_index'], [1, 2])
+        self.assertEqual(columns['section_title'], ['ARMAZENAGEM', 'ENERGIA'])
+        self.assertEqual(columns['Container (Equipment ID)'], ['MSCU1234567', 'TGHU7654321'])
+        self.assertEqual(columns['Valor (Unit Value)'], [None, '12,50'])
+        self.assertEqual(len(columns), 4 + len(HEADER_MAPPING))
+
+    def test_columnar_input(self):
+        """Test columnar documents flatten to the same rows"""
+        self.assertEqual(
+            list(iter_rows(to_columnar(self.coordinate_result), 'fields')),
+            list(iter_rows(self.coordinate_result, 'fields'))
+        )
+
+    def test_numeric_coercion(self):
+        """Test typed numeric columns with unparseable values as nulls"""
+        columns = flatten(self.line_result, 'armazenagem')
+
+        self.assertEqual(columns['total_armaz_rs'], [100.5, None])
+        self.assertEqual(columns['field_index'], [1, 2])
+
+    def test_thousands_separator(self):
+        """Test Brazilian amounts with thousands separators, and plain decimals"""
+        result = {'armazenagem': {'fields': [{'total_armaz_rs': value} for value in
+                                             ('1.234,56', '1.234.567,8', '0,5', '100.5', '1234')]}}
+
+        self.assertEqual(flatten(result, 'armazenagem')['total_armaz_rs'], [1234.56, 1234567.8, 0.5, 100.5, 1234.0])
+
+    @unittest.skipUnless(arrow_available(), "pyarrow not installed")
+    def test_record_batches(self):
+        """Test Arrow record batches have the fixed schema"""
+        batches = to_record_batches(self.line_result, document_id=3)
+
+        self.assertEqual(set(batches), {'armazenagem', 'operacao_servicos'})
+        batch = batches['operacao_servicos']
+        self.assertEqual(batch.num_rows, 1)
+        self.assertEqual(str(batch.schema.field('rs_unitario').type), 'double')
+        self.assertEqual(batch.column('document_id').to_pylist(), [3])
+        self.assertEqual(to_record_batch(self.coordinate_result, 'fields').num_rows, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,243 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import time
+import sqlite3
+from unittest.mock import Mock, patch
+
+# config.py requires ORACLE_PORT at import time
+os.environ.setdefault('ORACLE_PORT', '1521')
+
+from db.oracle_connection import OracleManager
+from db.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    """Test write-behind persistence queue"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.queue_dir = os.path.join(self.temp_dir, '.queue')
+        self.pdf_path = os.path.join(self.temp_dir, 'upload.pdf')
+        with open(self.pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 dummy')
+
+        self.oracle_manager = Mock()
+        self.queue = WriteBehindQueue(self.oracle_manager, self.queue_dir, batch_size=2, poll_interval=0.01)
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_enqueue_is_durable_before_drain(self):
+        """Test that enqueue stores content and spools the PDF"""
+        queue_id = self.queue.enqueue('TYPE', 'a.pdf', {'header': {'x': 'ç'}}, self.pdf_path)
+
+        status = self.queue.get_status(queue_id)
+        self.assertEqual(status['status'], 'pending')
+        self.assertEqual(status['document_filename'], 'a.pdf')
+        self.assertEqual(self.queue.pending_count(), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.queue.spool_dir, f"{queue_id}.pdf")))
+        self.oracle_manager.insert_pdf_documents.assert_not_called()
+
+    def test_drain_once_stores_batch_in_order(self):
+        """Test that a drain inserts a batch and marks entries stored"""
+        first = self.queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        second = self.queue.enqueue('TYPE', 'b.pdf', {'n': 2}, self.pdf_path)
+        third = self.queue.enqueue('TYPE', 'c.pdf', {'n': 3}, self.pdf_path)
+        self.oracle_manager.insert_pdf_documents.return_value = [(10, 'documents/10/a.pdf'), (11, 'documents/11/b.pdf')]
+
+        stored = self.queue.drain_once()
+
+        self.assertEqual(stored, 2)
+        batch = self.oracle_manager.insert_pdf_documents.call_args[0][0]
+        self.assertEqual([doc['filename'] for doc in batch], ['a.pdf', 'b.pdf'])
+        self.assertEqual([doc['queue_id'] for doc in batch], [first, second])
+        self.assertEqual(json.loads(batch[0]['json_content']), {'n': 1})
+        self.assertEqual(self.queue.get_status(first)['database_id'], 10)
+        self.assertEqual(self.queue.get_status(second)['status'], 'stored')
+        self.assertEqual(self.queue.get_status(third)['status'], 'pending')
+        self.assertFalse(os.path.exists(os.path.join(self.queue.spool_dir, f"{first}.pdf")))
+
+    def test_drain_once_failure_backs_off(self):
+        """Test that a failed batch returns to pending with backoff"""
+        queue_id = self.queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        self.oracle_manager.insert_pdf_documents.side_effect = Exception("ORA-12170")
+
+        self.assertEqual(self.queue.drain_once(), 0)
+
+        status = self.queue.get_status(queue_id)
+        self.assertEqual(status['status'], 'pending')
+        self.assertEqual(status['attempts'], 1)
+        self.assertIn('ORA-12170', status['last_error'])
+        # Entry is not ready again until backoff expires
+        self.oracle_manager.insert_pdf_documents.side_effect = None
+        self.oracle_manager.insert_pdf_documents.reset_mock()
+        self.queue.drain_once()
+        self.oracle_manager.insert_pdf_documents.assert_not_called()
+
+    def retry_now(self):
+        """Make entries waiting for backoff ready"""
+        connection = self.queue._connect()
+        connection.execute("UPDATE write_queue SET next_attempt_at = 0")
+        connection.close()
+
+    def test_failed_batch_retried_one_at_a_time(self):
+        """Test that a bad document does not hold back the rest of its batch"""
+        good = self.queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        bad = self.queue.enqueue('TYPE', 'b.pdf', {'n': 2}, self.pdf_path)
+
+        def insert(documents):
+            if any(doc['filename'] == 'b.pdf' for doc in documents):
+                raise Exception("ORA-01400")
+            return [(10, 'documents/10/a.pdf')]
+        self.oracle_manager.insert_pdf_documents.side_effect = insert
+
+        self.assertEqual(self.queue.drain_once(), 0)
+        self.retry_now()
+        self.assertEqual(self.queue.drain_once(), 1)
+        self.assertEqual(self.queue.drain_once(), 0)
+
+        batches = [[doc['filename'] for doc in call.args[0]]
+                   for call in self.oracle_manager.insert_pdf_documents.call_args_list]
+        self.assertEqual(batches, [['a.pdf', 'b.pdf'], ['a.pdf'], ['b.pdf']])
+        self.assertEqual(self.queue.get_status(good)['status'], 'stored')
+        self.assertEqual(self.queue.get_status(bad)['attempts'], 2)
+
+    def test_max_attempts_marks_failed(self):
+        """Test that an entry is dead-lettered after max attempts and can be requeued"""
+        queue = WriteBehindQueue(self.oracle_manager, self.queue_dir, batch_size=2, poll_interval=0.01,
+                                 max_attempts=2)
+        queue_id = queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        self.oracle_manager.insert_pdf_documents.side_effect = Exception("ORA-01400")
+
+        queue.drain_once()
+        self.retry_now()
+        queue.drain_once()
+
+        status = queue.get_status(queue_id)
+        self.assertEqual((status['status'], status['attempts']), ('failed', 2))
+        self.assertEqual(queue.pending_count(), 0)
+        self.assertTrue(os.path.exists(os.path.join(queue.spool_dir, f"{queue_id}.pdf")))
+        self.assertEqual(queue.requeue_failed(), 1)
+        self.assertEqual(queue.get_status(queue_id)['status'], 'pending')
+
+    def test_recover_inflight(self):
+        """Test that only entries whose claim lease expired are retried"""
+        queue_id = self.queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        connection = self.queue._connect()
+        self.queue._claim_batch(connection)
+        connection.close()
+        self.assertEqual(self.queue.get_status(queue_id)['status'], 'inflight')
+
+        # Another process starting on the same queue leaves the live claim alone
+        WriteBehindQueue(self.oracle_manager, self.queue_dir).recover_inflight()
+        self.assertEqual(self.queue.get_status(queue_id)['status'], 'inflight')
+
+        connection = self.queue._connect()
+        connection.execute("UPDATE write_queue SET lease_expires_at = 0")
+        connection.close()
+        self.queue.recover_inflight()
+
+        self.assertEqual(self.queue.get_status(queue_id)['status'], 'pending')
+
+    def test_lease_taken_over_is_left_to_new_owner(self):
+        """Test that a batch whose lease was recovered by a peer is not marked stored by the old owner"""
+        queue_id = self.queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+
+        def insert(documents):
+            connection = self.queue._connect()
+            connection.execute("UPDATE write_queue SET claimed_by = 'peer'")
+            connection.close()
+            return [(10, 'documents/10/a.pdf')]
+        self.oracle_manager.insert_pdf_documents.side_effect = insert
+
+        self.queue.drain_once()
+
+        self.assertEqual(self.queue.get_status(queue_id)['status'], 'inflight')
+        self.assertTrue(os.path.exists(os.path.join(self.queue.spool_dir, f"{queue_id}.pdf")))
+
+    def test_lease_renewed_during_insert(self):
+        """Test that a slow insert keeps its lease"""
+        queue = WriteBehindQueue(self.oracle_manager, self.queue_dir, lease_seconds=0.3)
+        queue.enqueue('TYPE', 'a.pdf', {'n': 1}, self.pdf_path)
+        leases = []
+
+        def lease():
+            connection = queue._connect()
+            try:
+                return connection.execute("SELECT lease_expires_at FROM write_queue").fetchone()[0]
+            finally:
+                connection.close()
+
+        def insert(documents):
+            leases.append(lease())
+            time.sleep(0.35)
+            leases.append(lease())
+            return [(10, 'documents/10/a.pdf')]
+        self.oracle_manager.insert_pdf_documents.side_effect = insert
+
+        self.assertEqual(queue.drain_once(), 1)
+        self.assertGreater(leases[1], leases[0])
+        self.assertGreater(leases[1], time.time() - 0.1)
+
+    def test_legacy_queue_gets_lease_columns(self):
+        """Test that a queue created before claim leases is migrated"""
+        queue_dir = os.path.join(self.temp_dir, 'legacy')
+        os.makedirs(queue_dir)
+        connection = sqlite3.connect(os.path.join(queue_dir, 'queue.sqlite3'))
+        connection.execute("""
+            CREATE TABLE write_queue (queue_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, status TEXT NOT NULL,
+                document_type TEXT NOT NULL, filename TEXT NOT NULL, content TEXT NOT NULL, spool_path TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, last_error TEXT,
+                record_id INTEGER, file_path TEXT, created_at REAL NOT NULL, stored_at REAL)
+        """)
+        connection.execute("""
+            INSERT INTO write_queue (queue_id, seq, status, document_type, filename, content, next_attempt_at,
+                                     created_at)
+            VALUES ('old', 1, 'inflight', 'TYPE', 'a.pdf', '{}', 0, 0)
+        """)
+        connection.commit()
+        connection.close()
+
+        queue = WriteBehindQueue(self.oracle_manager, queue_dir)
+        queue.recover_inflight()
+
+        self.assertEqual(queue.get_status('old')['status'], 'pending')
+
+    def test_get_status_unknown(self):
+        """Test status of unknown queue ID"""
+        self.assertIsNone(self.queue.get_status('missing'))
+
+
+class TestQueuedInsert(unittest.TestCase):
+    """Test Oracle batch inserts of write-behind entries (no database needed)"""
+
+    def test_stored_entries_are_not_inserted_again(self):
+        """Test that entries with a row for their queue ID are returned instead of inserted"""
+        manager = OracleManager()
+        connection = Mock()
+        cursor = connection.cursor.return_value
+        cursor.fetchall.return_value = [('q1', 5, 'documents/5/a.pdf')]
+        documents = [
+            {'document_type': 'TYPE', 'filename': name, 'json_content': '{}', 'temp_file_path': 'x.pdf',
+             'queue_id': queue_id}
+            for name, queue_id in (('a.pdf', 'q1'), ('b.pdf', 'q2'))
+        ]
+
+        with patch.object(manager, 'get_connection', return_value=connection), \
+                patch.object(manager, 'ensure_documents_directory'), \
+                patch.object(manager, '_insert_document_row', return_value=(6, 'documents/6/b.pdf')) as insert:
+            stored = manager.insert_pdf_documents(documents)
+
+        self.assertEqual(stored, [(5, 'documents/5/a.pdf'), (6, 'documents/6/b.pdf')])
+        insert.assert_called_once_with(cursor, 'TYPE', 'b.pdf', '{}', 'x.pdf', 'q2')
+        self.assertEqual(cursor.execute.call_args.args[1], {'q0': 'q1', 'q1': 'q2'})
+        connection.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()